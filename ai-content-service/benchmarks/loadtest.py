@@ -0,0 +1,446 @@
+"""
+Load-test harness for the generation endpoints.
+Drives /v1/generate/text, /generate/image, /generate/video and /v1/jobs/{job_id}
+against the local Poe stand-in (devtools/fake_poe.py), at a fixed concurrency
+(closed loop) or arrival rate (open loop, Poisson), and reports throughput,
+latency percentiles, event-loop lag and RSS. Results are saved as JSON so runs
+can be compared across commits.
+
+Usage:
+    python -m benchmarks.loadtest --scenario text --concurrency 50 --duration 30
+    python -m benchmarks.loadtest --scenario mixed --rate 40 --duration 60 \\
+        --fake-profile benchmarks/profiles/slow_upstream.json
+    python -m benchmarks.loadtest --scenario text --baseline benchmarks/results/main.json
+
+By default the service runs in-process (ASGI transport) so event-loop lag and
+RSS describe the service itself (plus the load generator, which is light).
+Use --target to drive an already-running service instead; lag/RSS then only
+describe the harness.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import random
+import asyncio
+import argparse
+import platform
+import threading
+import subprocess
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+SCENARIOS = ("text", "image", "video", "jobs")
+TERMINAL_STATUSES = ("completed", "failed")
+AUTH_HEADERS = {"Authorization": "Bearer loadtest"}
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of values (None if empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return round(ordered[rank], 2)
+
+
+def summarize(values: List[float]) -> dict:
+    """Latency summary in milliseconds"""
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 2) if values else None,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": round(max(values), 2) if values else None,
+    }
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MB"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024, 1)
+    except (OSError, ValueError):
+        import resource
+        # ru_maxrss is KB on Linux, bytes on macOS; this is the peak, not current
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class ScenarioStats:
+    """Per-scenario latency and outcome counters"""
+
+    def __init__(self):
+        self.latencies_ms: List[float] = []
+        self.completion_ms: List[float] = []
+        self.errors: Dict[str, int] = {}
+        self.ok = 0
+
+    def record(self, latency_ms: float, status: Optional[int], error: Optional[str] = None) -> None:
+        if error is None and status is not None and status < 400:
+            self.ok += 1
+            self.latencies_ms.append(latency_ms)
+        else:
+            key = error or str(status)
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    def report(self, elapsed: float) -> dict:
+        report = {
+            "ok": self.ok,
+            "errors": self.errors,
+            "throughput_rps": round(self.ok / elapsed, 2) if elapsed else 0.0,
+            "latency_ms": summarize(self.latencies_ms),
+        }
+        if self.completion_ms:
+            report["job_completion_ms"] = summarize(self.completion_ms)
+        return report
+
+
+class LoopLagMonitor:
+    """Measures event-loop lag as the overshoot of a periodic sleep"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples_ms: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples_ms.append(max(0.0, (loop.time() - started - self.interval) * 1000))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def report(self) -> dict:
+        return summarize(self.samples_ms)
+
+
+class RssMonitor:
+    """Samples RSS periodically and keeps start/peak/end"""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.start_mb = rss_mb()
+        self.peak_mb = self.start_mb
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            self.peak_mb = max(self.peak_mb, rss_mb())
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def report(self) -> dict:
+        end = rss_mb()
+        return {"start": self.start_mb, "peak": max(self.peak_mb, end), "end": end}
+
+
+def start_fake_poe(profile: Optional[str], seed: Optional[int]) -> str:
+    """Run devtools.fake_poe on a free port in a background thread; return its bot base URL"""
+    import uvicorn
+
+    if profile:
+        os.environ["FAKE_POE_PROFILE"] = profile
+    if seed is not None:
+        os.environ["FAKE_POE_SEED"] = str(seed)
+    from devtools.fake_poe import app as fake_app
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(fake_app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("Fake Poe server did not start")
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}/bot/"
+
+
+class LoadTest:
+    """Generates requests for the selected scenarios and collects stats"""
+
+    def __init__(self, client: httpx.AsyncClient, args: argparse.Namespace):
+        self.client = client
+        self.args = args
+        self.scenarios = list(SCENARIOS) if args.scenario == "mixed" else args.scenario.split(",")
+        self.stats = {name: ScenarioStats() for name in self.scenarios}
+        self.rng = random.Random(args.seed)
+        self.job_ids: List[str] = []
+        self.status_polls = 0
+        self._counter = 0
+
+    def _prompt(self, kind: str) -> str:
+        # A share of requests repeat one prompt to exercise cache/coalescing
+        if self.rng.random() < self.args.duplicate_ratio:
+            return f"Shared {kind} prompt for load testing"
+        self._counter += 1
+        return f"Unique {kind} prompt #{self._counter} for load testing"
+
+    async def _timed(self, name: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=AUTH_HEADERS, **kwargs)
+        except httpx.HTTPError as e:
+            self.stats[name].record((time.perf_counter() - started) * 1000, None, type(e).__name__)
+            return None
+        self.stats[name].record((time.perf_counter() - started) * 1000, response.status_code)
+        return response
+
+    async def text(self) -> None:
+        await self._timed("text", "POST", "/v1/generate/text", json={
+            "prompt": self._prompt("text"),
+            "model": "gpt-4o",
+            "system_prompt_type": "social-post",
+            "temperature": self.args.temperature,
+            "tenant_id": f"tenant_{self.rng.randrange(self.args.tenants)}",
+        })
+
+    async def image(self) -> None:
+        await self._timed("image", "POST", "/v1/generate/image", json={
+            "prompt": self._prompt("image"),
+            "model": "dall-e-3",
+            "tenant_id": f"tenant_{self.rng.randrange(self.args.tenants)}",
+        })
+
+    async def video(self) -> None:
+        started = time.perf_counter()
+        response = await self._timed("video", "POST", "/v1/generate/video", json={
+            "prompt": self._prompt("video"),
+            "model": "sora-2",
+            "duration_seconds": 8,
+            "tenant_id": f"tenant_{self.rng.randrange(self.args.tenants)}",
+        })
+        if response is None or response.status_code >= 400:
+            return
+        job_id = response.json()["job_id"]
+        self.job_ids.append(job_id)
+        if not self.args.follow_jobs:
+            return
+        # Poll like a client would until the job is terminal
+        while True:
+            if self.args.long_poll:
+                url = f"/v1/jobs/{job_id}?wait={self.args.long_poll}"
+            else:
+                await asyncio.sleep(self.args.poll_interval)
+                url = f"/v1/jobs/{job_id}"
+            self.status_polls += 1
+            status = await self.client.get(url, headers=AUTH_HEADERS)
+            if status.json().get("status") in TERMINAL_STATUSES:
+                self.stats["video"].completion_ms.append((time.perf_counter() - started) * 1000)
+                return
+
+    async def seed_jobs(self, count: int) -> None:
+        """Submit video jobs outside the measured window"""
+        for _ in range(count):
+            response = await self.client.post("/v1/generate/video", headers=AUTH_HEADERS, json={
+                "prompt": self._prompt("video"),
+                "model": "sora-2",
+                "tenant_id": "tenant_0",
+            })
+            if response.status_code < 400:
+                self.job_ids.append(response.json()["job_id"])
+
+    async def jobs(self) -> None:
+        job_id = self.rng.choice(self.job_ids) if self.job_ids else "vid_missing"
+        await self._timed("jobs", "GET", f"/v1/jobs/{job_id}")
+
+    async def one(self) -> None:
+        await getattr(self, self.rng.choice(self.scenarios))()
+
+    async def run_closed_loop(self, deadline: float) -> None:
+        """Fixed number of virtual users issuing requests back to back"""
+        async def user() -> None:
+            while time.monotonic() < deadline:
+                await self.one()
+
+        await asyncio.gather(*(user() for _ in range(self.args.concurrency)))
+
+    async def run_open_loop(self, deadline: float) -> None:
+        """Poisson arrivals at --rate regardless of response times"""
+        pending = set()
+        while time.monotonic() < deadline:
+            task = asyncio.create_task(self.one())
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            await asyncio.sleep(self.rng.expovariate(self.args.rate))
+        if pending:
+            await asyncio.gather(*pending)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    if args.target:
+        client = httpx.AsyncClient(base_url=args.target, timeout=args.timeout)
+        lifespan = None
+    else:
+        os.environ["POE_BASE_URL"] = start_fake_poe(args.fake_profile, args.seed)
+        os.environ.setdefault("POE_API_KEY", "loadtest")
+        if args.no_cache:
+            os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+        from main import app
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=args.timeout
+        )
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+
+    test = LoadTest(client, args)
+    lag = LoopLagMonitor()
+    rss = RssMonitor()
+    try:
+        if "jobs" in test.scenarios:
+            # Seed job ids so the status scenario has something to look up
+            await test.seed_jobs(5)
+
+        if args.warmup > 0:
+            await test.run_closed_loop(time.monotonic() + args.warmup)
+            test.stats = {name: ScenarioStats() for name in test.scenarios}
+
+        lag.start()
+        rss.start()
+        started = time.monotonic()
+        deadline = started + args.duration
+        if args.rate:
+            await test.run_open_loop(deadline)
+        else:
+            await test.run_closed_loop(deadline)
+        elapsed = time.monotonic() - started
+        await lag.stop()
+        await rss.stop()
+
+        metrics = None
+        if not args.target:
+            metrics = (await client.get("/metrics")).json()
+    finally:
+        await client.aclose()
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+
+    total_ok = sum(stats.ok for stats in test.stats.values())
+    return {
+        "meta": {
+            "git_commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "mode": "open" if args.rate else "closed",
+            "args": vars(args),
+        },
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(total_ok / elapsed, 2) if elapsed else 0.0,
+        "scenarios": {name: stats.report(elapsed) for name, stats in test.stats.items()},
+        "job_status_polls": test.status_polls,
+        "event_loop_lag_ms": lag.report(),
+        "rss_mb": rss.report(),
+        "service_metrics": metrics,
+    }
+
+
+def compare(baseline: dict, current: dict) -> str:
+    """Human-readable deltas between two result files"""
+    lines = [f"Comparing {baseline['meta'].get('git_commit')} -> {current['meta'].get('git_commit')}"]
+
+    def delta(label: str, old, new) -> None:
+        if old is None or new is None:
+            return
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+        lines.append(f"  {label:<32} {old:>10} -> {new:>10}  ({change})")
+
+    delta("throughput_rps", baseline["throughput_rps"], current["throughput_rps"])
+    for name, report in current["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if old is None:
+            continue
+        for pct in ("p50", "p95", "p99"):
+            delta(f"{name}.latency_ms.{pct}", old["latency_ms"][pct], report["latency_ms"][pct])
+    delta("event_loop_lag_ms.p99", baseline["event_loop_lag_ms"]["p99"], current["event_loop_lag_ms"]["p99"])
+    delta("rss_mb.peak", baseline["rss_mb"]["peak"], current["rss_mb"]["peak"])
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test the AI content service")
+    parser.add_argument("--scenario", default="text",
+                        help="text, image, video, jobs, a comma list, or mixed")
+    parser.add_argument("--concurrency", type=int, default=20, help="Virtual users (closed loop)")
+    parser.add_argument("--rate", type=float, default=0.0, help="Arrivals per second (open loop)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=0.0, help="Unmeasured warm-up seconds")
+    parser.add_argument("--tenants", type=int, default=5, help="Distinct tenant ids")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.0,
+                        help="Share of requests repeating a fixed prompt")
+    parser.add_argument("--temperature", type=float, default=0.7, help="Text temperature")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the response cache")
+    parser.add_argument("--follow-jobs", action="store_true",
+                        help="Poll each video job to completion and report completion time")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="Job poll interval (s)")
+    parser.add_argument("--long-poll", type=float, default=0.0,
+                        help="Follow jobs with ?wait=N long-polls instead of interval polling")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout (s)")
+    parser.add_argument("--fake-profile", help="FAKE_POE_PROFILE for the stand-in (path or JSON)")
+    parser.add_argument("--seed", type=int, default=1, help="RNG seed")
+    parser.add_argument("--target", help="Base URL of a running service (skips in-process mode)")
+    parser.add_argument("--output", help="Result JSON path (default benchmarks/results/<commit>-<time>.json)")
+    parser.add_argument("--baseline", help="Previous result JSON to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    result = asyncio.run(run(args))
+
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"{result['meta']['git_commit'] or 'local'}-{int(time.time())}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2, default=str)
+
+    print(json.dumps({key: result[key] for key in ("throughput_rps", "scenarios", "event_loop_lag_ms", "rss_mb")}, indent=2))
+    print(f"Results saved to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            print(compare(json.load(f), result))
+
+
+if __name__ == "__main__":
+    main()
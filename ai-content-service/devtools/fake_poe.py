@@ -0,0 +1,238 @@
+"""
+Local stand-in for the Poe bot API.
+Speaks the server-sent-events protocol consumed by fastapi_poe.get_bot_response,
+with configurable per-bot latency, token streaming rate, error/429 injection
+and canned image/video URLs. Point the service at it with POE_BASE_URL.
+
+Run:
+    uvicorn devtools.fake_poe:app --port 8100
+    POE_BASE_URL=http://localhost:8100/bot/ uvicorn main:app
+
+Profiles (FAKE_POE_PROFILE: path to a JSON file, or inline JSON) are merged
+over DEFAULT_PROFILE. Each bot entry overrides "default":
+    {
+        "default": {"first_token_ms": {"dist": "lognormal", "median_ms": 400, "sigma": 0.5}},
+        "bots": {
+            "GPT-4o": {"tokens_per_second": 80, "rate_limit_rate": 0.05},
+            "Sora-2": {"video_mode": "job_id"}
+        }
+    }
+
+Latency distributions:
+    {"dist": "fixed", "ms": 200}
+    {"dist": "uniform", "min_ms": 100, "max_ms": 500}
+    {"dist": "lognormal", "median_ms": 400, "sigma": 0.5}
+"""
+
+import os
+import json
+import copy
+import uuid
+import random
+import asyncio
+import logging
+from typing import AsyncIterator, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE = {
+    "default": {
+        "kind": "text",
+        "first_token_ms": {"dist": "lognormal", "median_ms": 400, "sigma": 0.4},
+        "tokens_per_second": 60,
+        "tokens_per_chunk": 3,
+        "response_tokens": 120,
+        "error_rate": 0.0,
+        "rate_limit_rate": 0.0,
+        "image_url": "https://fake-poe.local/images/{id}.png",
+        "video_url": "https://fake-poe.local/videos/{id}.mp4",
+        "video_mode": "url",
+        "render_ms": {"dist": "uniform", "min_ms": 3000, "max_ms": 6000},
+        "status_interval_ms": 1000,
+    },
+    "bots": {
+        "DALL-E-3": {
+            "kind": "image",
+            "first_token_ms": {"dist": "lognormal", "median_ms": 800, "sigma": 0.3},
+            "render_ms": {"dist": "uniform", "min_ms": 1500, "max_ms": 4000},
+        },
+        "Sora-2": {"kind": "video"},
+        "Veo-3.1": {"kind": "video"},
+        "Runway-Gen3": {"kind": "video"},
+    },
+}
+
+WORDS = (
+    "bold fresh launch campaign audience brand story value simple clear "
+    "engage share create modern bright smart daily trusted growth"
+).split()
+
+
+def load_profile() -> dict:
+    """Merge FAKE_POE_PROFILE (file path or inline JSON) over the defaults"""
+    profile = copy.deepcopy(DEFAULT_PROFILE)
+    raw = os.getenv("FAKE_POE_PROFILE")
+    if not raw:
+        return profile
+    if os.path.exists(raw):
+        with open(raw) as f:
+            overrides = json.load(f)
+    else:
+        overrides = json.loads(raw)
+    profile["default"].update(overrides.get("default", {}))
+    for bot, settings in overrides.get("bots", {}).items():
+        profile["bots"].setdefault(bot, {}).update(settings)
+    return profile
+
+
+class FakePoe:
+    """Generates protocol events for a bot according to its profile"""
+
+    def __init__(self, profile: dict, seed: Optional[int] = None):
+        self.profile = profile
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.injected_errors = 0
+        self.injected_rate_limits = 0
+
+    def settings_for(self, bot_name: str) -> dict:
+        settings = dict(self.profile["default"])
+        settings.update(self.profile["bots"].get(bot_name, {}))
+        return settings
+
+    def sample_ms(self, spec) -> float:
+        """Draw a latency in milliseconds from a distribution spec"""
+        if isinstance(spec, (int, float)):
+            return float(spec)
+        dist = spec.get("dist", "fixed")
+        if dist == "uniform":
+            return self.rng.uniform(spec["min_ms"], spec["max_ms"])
+        if dist == "lognormal":
+            return spec["median_ms"] * self.rng.lognormvariate(0, spec.get("sigma", 0.5))
+        return float(spec.get("ms", 0))
+
+    async def events(self, bot_name: str, query: dict) -> AsyncIterator[str]:
+        """Yield SSE frames for one query"""
+        settings = self.settings_for(bot_name)
+        self.requests += 1
+
+        await asyncio.sleep(self.sample_ms(settings["first_token_ms"]) / 1000)
+
+        roll = self.rng.random()
+        if roll < settings["rate_limit_rate"]:
+            self.injected_rate_limits += 1
+            yield sse("error", {
+                "allow_retry": True,
+                "text": "Rate limit exceeded (429)",
+                "error_type": "rate_limit_exceeded",
+            })
+            return
+        if roll < settings["rate_limit_rate"] + settings["error_rate"]:
+            self.injected_errors += 1
+            yield sse("error", {"allow_retry": True, "text": "Injected upstream error"})
+            return
+
+        yield sse("meta", {"content_type": "text/markdown", "linkify": True})
+
+        kind = settings["kind"]
+        if kind == "image":
+            async for frame in self._image(settings):
+                yield frame
+        elif kind == "video":
+            async for frame in self._video(settings, query):
+                yield frame
+        else:
+            async for frame in self._text(settings, query):
+                yield frame
+
+        yield sse("done", {})
+
+    async def _text(self, settings: dict, query: dict) -> AsyncIterator[str]:
+        tokens = int(settings["response_tokens"])
+        per_chunk = max(1, int(settings["tokens_per_chunk"]))
+        delay = per_chunk / max(float(settings["tokens_per_second"]), 0.001)
+        for sent in range(0, tokens, per_chunk):
+            words = [self.rng.choice(WORDS) for _ in range(min(per_chunk, tokens - sent))]
+            yield sse("text", {"text": " ".join(words) + " "})
+            await asyncio.sleep(delay)
+
+    async def _image(self, settings: dict) -> AsyncIterator[str]:
+        yield sse("text", {"text": "Generating image...\n\n"})
+        await asyncio.sleep(self.sample_ms(settings["render_ms"]) / 1000)
+        url = settings["image_url"].format(id=uuid.uuid4().hex[:16])
+        yield sse("text", {"text": f"![image]({url})\n"})
+
+    async def _video(self, settings: dict, query: dict) -> AsyncIterator[str]:
+        follow_up = sum(1 for message in query.get("query", []) if message.get("role") == "user") > 1
+        if follow_up:
+            # Status check on an earlier request: job ids are ready by now,
+            # "status" mode never finishes
+            if settings["video_mode"] == "status":
+                yield sse("text", {"text": "Generating... "})
+                return
+            url = settings["video_url"].format(id=uuid.uuid4().hex[:16])
+            yield sse("text", {"text": f"Your video is ready: {url}\n"})
+            return
+
+        if settings["video_mode"] == "job_id":
+            yield sse("text", {"text": f"Video queued. job_id: fake-{uuid.uuid4().hex[:12]}\n"})
+            return
+
+        render_s = self.sample_ms(settings["render_ms"]) / 1000
+        interval_s = max(settings["status_interval_ms"], 1) / 1000
+        elapsed = 0.0
+        while elapsed < render_s:
+            yield sse("text", {"text": "Generating... "})
+            await asyncio.sleep(min(interval_s, render_s - elapsed))
+            elapsed += interval_s
+
+        if settings["video_mode"] == "status":
+            # Never produce a URL (exercises follow-up polling)
+            return
+        url = settings["video_url"].format(id=uuid.uuid4().hex[:16])
+        yield sse("text", {"text": f"\n{url}\n"})
+
+
+def sse(event: str, data: dict) -> str:
+    """Encode one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+fake = FakePoe(load_profile(), seed=int(os.environ["FAKE_POE_SEED"]) if os.getenv("FAKE_POE_SEED") else None)
+
+app = FastAPI(title="Fake Poe", description="Local stand-in for the Poe bot API")
+
+
+@app.post("/bot/{bot_name}")
+async def bot(bot_name: str, request: Request):
+    """Bot protocol endpoint (query, settings and report_* requests)"""
+    body = await request.json()
+    if body.get("type") != "query":
+        # report_error / report_feedback / settings: acknowledge
+        return JSONResponse({})
+    return StreamingResponse(fake.events(bot_name, body), media_type="text/event-stream")
+
+
+@app.get("/stats")
+async def stats():
+    """Injected-fault counters"""
+    return {
+        "requests": fake.requests,
+        "injected_errors": fake.injected_errors,
+        "injected_rate_limits": fake.injected_rate_limits,
+    }
+
+
+@app.get("/health")
+async def health():
+    """Health check endpoint"""
+    return {"status": "healthy", "service": "fake-poe"}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=os.getenv("HOST", "0.0.0.0"), port=int(os.getenv("FAKE_POE_PORT", 8100)))
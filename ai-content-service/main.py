@@ -4,6 +4,7 @@ FastAPI application for text, image, and video generation with tenant isolation.
 """
 
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import os
@@ -12,6 +13,8 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+from providers.poe_provider import get_provider
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -19,8 +22,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan: owns the shared provider and its connection pool"""
+    logger.info("AI Content Generation Service starting up...")
+    logger.info(f"Environment: {os.getenv('ENV', 'development')}")
+    provider = get_provider()
+    await provider.startup()
+    
+    yield
+    
+    logger.info("AI Content Generation Service shutting down...")
+    await provider.aclose()
+
+
 # Initialize FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
     title="AI Content Generation Service",
     description="Microservice for text, image, and video generation with tenant isolation",
     version="1.0.0",
@@ -39,25 +58,16 @@ app.add_middleware(
 )
 
 # Import and register route modules
-from routes import text, images, videos, jobs
+from routes import text, images, videos, jobs, bulk, bundle, pipeline
+from routes.cancellation import cancellations
 
 app.include_router(text.router)
 app.include_router(images.router)
 app.include_router(videos.router)
 app.include_router(jobs.router)
-
-
-@app.on_event("startup")
-async def startup_event():
-    """Application startup event"""
-    logger.info("AI Content Generation Service starting up...")
-    logger.info(f"Environment: {os.getenv('ENV', 'development')}")
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Application shutdown event"""
-    logger.info("AI Content Generation Service shutting down...")
+app.include_router(bulk.router)
+app.include_router(bundle.router)
+app.include_router(pipeline.router)
 
 
 @app.get("/")
@@ -81,6 +91,12 @@ async def health():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Provider runtime counters (cache, coalescing, concurrency, breakers) and cancelled requests"""
+    return {**get_provider().get_stats(), "cancelled_requests": cancellations.stats()}
+
+
 if __name__ == "__main__":
     import uvicorn
     
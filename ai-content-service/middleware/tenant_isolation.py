@@ -4,12 +4,28 @@ Enforces tenant context and access control at the service level.
 """
 
 from fastapi import Request, HTTPException
-from typing import Optional
+from typing import Dict, Optional
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
 
+def parse_tenant_plans(raw: str) -> Dict[str, str]:
+    """Parse "tenant_id=plan,..." into a dict"""
+    plans: Dict[str, str] = {}
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        tenant_id, _, plan = item.partition("=")
+        plans[tenant_id.strip()] = plan.strip()
+    return plans
+
+
+# Plan per tenant from server config (TENANT_PLANS="tenant_a=enterprise,...")
+TENANT_PLANS = parse_tenant_plans(os.getenv("TENANT_PLANS", ""))
+
+
 class TenantContext:
     """Thread-local tenant context for request isolation"""
     _tenant_id: Optional[str] = None
@@ -85,6 +101,23 @@ async def enforce_tenant_isolation(tenant_id: str, resource_tenant_id: str):
         )
 
 
+def get_tenant_plan(tenant_id: Optional[str]) -> Optional[str]:
+    """
+    Resolve a validated tenant's plan (enterprise, pro, free).
+    
+    The plan sets the tenant's fair-share scheduling weight, so it is never
+    taken from the request body. In production it would come from the
+    tenant's verified JWT claims; for now it is read from TENANT_PLANS.
+    
+    Args:
+        tenant_id: Tenant ID that passed validate_tenant_access
+    
+    Returns:
+        The tenant's plan, or None (default weight) if not configured
+    """
+    return TENANT_PLANS.get(tenant_id)
+
+
 class TenantMiddleware:
     """ASGI middleware for tenant context management"""
     
@@ -4,7 +4,18 @@ Unified schema for text, image, and video generation.
 """
 
 from typing import Literal, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+# Max job ids per POST /v1/jobs/status call
+MAX_JOB_STATUS_BATCH = 100
+# Max assets per POST /v1/generate/bulk call
+MAX_BULK_ITEMS = 200
+# Max prompts per POST /v1/generate/text/batch call
+MAX_TEXT_BATCH_ITEMS = 50
+# Max variants per text/image request (n)
+MAX_VARIANTS = 8
+# Max stop sequences per text request
+MAX_STOP_SEQUENCES = 4
 
 
 class BaseGenerationRequest(BaseModel):
@@ -20,10 +31,22 @@ class BaseGenerationRequest(BaseModel):
         str_strip_whitespace = True
 
 
-class TextGenerationRequest(BaseGenerationRequest):
+class VariantOptions(BaseModel):
+    """Best-of-N options shared by text and image requests"""
+    n: int = Field(default=1, ge=1, le=MAX_VARIANTS, description="Variants to generate concurrently")
+    first_k: Optional[int] = Field(None, ge=1, description="Return once this many variants are ready, cancelling the rest")
+    budget_ms: Optional[int] = Field(None, ge=1, description="Return the variants ready after this long, cancelling the rest")
+
+
+class TextGenerationRequest(BaseGenerationRequest, VariantOptions):
     """Request for text content generation"""
-    max_tokens: int = Field(default=2000, ge=1, le=4000)
+    max_tokens: int = Field(default=2000, ge=1, le=4000, description="Output is cut at this many tokens")
     temperature: float = Field(default=0.7, ge=0.0, le=2.0)
+    stop_sequences: Optional[list[str]] = Field(
+        None,
+        max_length=MAX_STOP_SEQUENCES,
+        description="Output is cut before the first of these (not included)",
+    )
     system_prompt_type: Optional[Literal[
         "creative-copy",
         "social-post",
@@ -32,9 +55,10 @@ class TextGenerationRequest(BaseGenerationRequest):
         "prompt-improver"
     ]] = Field(None, description="Predefined prompt type")
     context: Optional[str] = Field(None, description="Additional context for prompt improvement")
+    cache: bool = Field(default=True, description="Allow cached responses (false to always call the model)")
 
 
-class ImageGenerationRequest(BaseGenerationRequest):
+class ImageGenerationRequest(BaseGenerationRequest, VariantOptions):
     """Request for image generation"""
     resolution: str = Field(default="1024x1024", description="Resolution (e.g., 1024x1024)")
     style: Optional[Literal["vivid", "natural"]] = Field(None, description="Image style")
@@ -49,8 +73,177 @@ class VideoGenerationRequest(BaseGenerationRequest):
     reference_images: Optional[list[str]] = Field(None, description="Reference image URLs")
 
 
+class TextBatchItem(BaseModel):
+    """One prompt of a batch text request; unset fields use the batch's values"""
+    prompt: str = Field(..., description="Generation prompt")
+    model: Optional[str] = Field(None, description="Model override")
+    system_prompt_type: Optional[Literal[
+        "creative-copy",
+        "social-post",
+        "ad-script",
+        "campaign-strategy",
+        "prompt-improver"
+    ]] = Field(None, description="Prompt type override")
+    max_tokens: Optional[int] = Field(None, ge=1, le=4000, description="Max tokens override")
+    temperature: Optional[float] = Field(None, ge=0.0, le=2.0, description="Temperature override")
+    stop_sequences: Optional[list[str]] = Field(None, max_length=MAX_STOP_SEQUENCES, description="Stop sequences override")
+
+    class Config:
+        """Pydantic config"""
+        str_strip_whitespace = True
+
+
+class TextBatchRequest(BaseModel):
+    """Request for several text generations streamed back as they finish"""
+    items: list[TextBatchItem] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_TEXT_BATCH_ITEMS,
+        description=f"Prompts to generate (max {MAX_TEXT_BATCH_ITEMS})",
+    )
+    model: str = Field(..., description="Model to use")
+    tenant_id: str = Field(..., description="Tenant ID for isolation")
+    system_prompt_type: Optional[Literal[
+        "creative-copy",
+        "social-post",
+        "ad-script",
+        "campaign-strategy",
+        "prompt-improver"
+    ]] = Field(None, description="Predefined prompt type")
+    max_tokens: int = Field(default=2000, ge=1, le=4000)
+    temperature: float = Field(default=0.7, ge=0.0, le=2.0)
+    stop_sequences: Optional[list[str]] = Field(
+        None,
+        max_length=MAX_STOP_SEQUENCES,
+        description="Output is cut before the first of these (not included)",
+    )
+    concurrency: Optional[int] = Field(None, ge=1, description="Max items generated at once (capped by the server)")
+    cache: bool = Field(default=True, description="Allow cached responses (false to always call the model)")
+    metadata: Optional[dict] = Field(None, description="Additional metadata")
+
+
 class PromptImprovementRequest(BaseModel):
     """Request to improve an existing prompt"""
     prompt: str = Field(..., description="Prompt to improve")
     content_type: Literal["text", "image", "video"] = Field(..., description="Type of content")
     tenant_id: str = Field(..., description="Tenant ID")
+
+
+class PipelineGenerationRequest(BaseModel):
+    """Request to improve a prompt and generate an image or video from the result"""
+    prompt: str = Field(..., description="Draft prompt to improve")
+    target: Literal["image", "video"] = Field(..., description="Asset generated from the improved prompt")
+    model: str = Field(..., description="Model for the asset (e.g., dall-e-3, sora-2)")
+    tenant_id: str = Field(..., description="Tenant ID for isolation")
+    improver_model: str = Field(default="gpt-4o", description="Model that improves the prompt")
+    cache: bool = Field(default=True, description="Allow a cached prompt improvement")
+    # Image
+    resolution: str = Field(default="1024x1024", description="Resolution (image)")
+    style: Optional[Literal["vivid", "natural"]] = Field(None, description="Image style (image)")
+    # Video
+    duration_seconds: int = Field(default=8, ge=1, le=60, description="Duration (video)")
+    aspect_ratio: str = Field(default="16:9", description="Aspect ratio (video)")
+    webhook_url: Optional[str] = Field(None, description="Notified when the video job finishes (video)")
+    metadata: Optional[dict] = Field(None, description="Additional metadata")
+
+    class Config:
+        """Pydantic config"""
+        str_strip_whitespace = True
+
+
+class JobStatusBatchRequest(BaseModel):
+    """Request for the status of several jobs at once"""
+    job_ids: list[str] = Field(..., min_length=1, max_length=MAX_JOB_STATUS_BATCH, description="Job IDs to look up")
+    tenant_id: str = Field(..., description="Tenant ID (only this tenant's jobs are returned)")
+
+
+class BulkGenerationItem(BaseModel):
+    """One asset of a bulk generation request"""
+    type: Literal["text", "image", "video"] = Field(..., description="Asset type")
+    prompt: str = Field(..., description="Generation prompt")
+    model: str = Field(..., description="Model to use")
+    # Text
+    system_prompt_type: Optional[Literal[
+        "creative-copy",
+        "social-post",
+        "ad-script",
+        "campaign-strategy",
+        "prompt-improver"
+    ]] = Field(None, description="Predefined prompt type (text)")
+    max_tokens: int = Field(default=2000, ge=1, le=4000, description="Max tokens (text)")
+    temperature: float = Field(default=0.7, ge=0.0, le=2.0, description="Temperature (text)")
+    # Image
+    resolution: str = Field(default="1024x1024", description="Resolution (image)")
+    style: Optional[Literal["vivid", "natural"]] = Field(None, description="Image style (image)")
+    # Video
+    duration_seconds: int = Field(default=8, ge=1, le=60, description="Duration (video)")
+    aspect_ratio: str = Field(default="16:9", description="Aspect ratio (video)")
+
+    class Config:
+        """Pydantic config"""
+        str_strip_whitespace = True
+
+
+class BulkGenerationRequest(BaseModel):
+    """Request to generate many assets as one job"""
+    items: list[BulkGenerationItem] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BULK_ITEMS,
+        description=f"Assets to generate (max {MAX_BULK_ITEMS})",
+    )
+    tenant_id: str = Field(..., description="Tenant ID for isolation")
+    webhook_url: Optional[str] = Field(None, description="Notified once when all items have finished")
+    metadata: Optional[dict] = Field(None, description="Additional metadata")
+
+
+class BundleTextPart(BaseModel):
+    """Copy of a campaign bundle"""
+    prompt: Optional[str] = Field(None, description="Prompt (defaults to the brief)")
+    model: str = Field(default="gpt-4o", description="Model to use")
+    system_prompt_type: Optional[Literal[
+        "creative-copy",
+        "social-post",
+        "ad-script",
+        "campaign-strategy",
+        "prompt-improver"
+    ]] = Field(None, description="Predefined prompt type")
+    max_tokens: int = Field(default=2000, ge=1, le=4000)
+    temperature: float = Field(default=0.7, ge=0.0, le=2.0)
+
+
+class BundleImagePart(BaseModel):
+    """Hero image of a campaign bundle"""
+    prompt: Optional[str] = Field(None, description="Prompt (defaults to the brief)")
+    model: str = Field(default="dall-e-3", description="Model to use")
+    resolution: str = Field(default="1024x1024", description="Resolution (e.g., 1024x1024)")
+    style: Optional[Literal["vivid", "natural"]] = Field(None, description="Image style")
+
+
+class BundleVideoPart(BaseModel):
+    """Teaser video of a campaign bundle"""
+    prompt: Optional[str] = Field(None, description="Prompt (defaults to the brief)")
+    model: str = Field(default="sora-2", description="Model to use")
+    duration_seconds: int = Field(default=8, ge=1, le=60)
+    aspect_ratio: str = Field(default="16:9", description="Aspect ratio (16:9, 9:16, 1:1)")
+
+
+class BundleGenerationRequest(BaseModel):
+    """Request to generate a campaign's copy, image and video from one brief"""
+    brief: str = Field(..., description="Campaign brief, used as every part's prompt unless overridden")
+    tenant_id: str = Field(..., description="Tenant ID for isolation")
+    text: Optional[BundleTextPart] = Field(None, description="Generate copy")
+    image: Optional[BundleImagePart] = Field(None, description="Generate a hero image")
+    video: Optional[BundleVideoPart] = Field(None, description="Submit a video job")
+    webhook_url: Optional[str] = Field(None, description="Notified when the video job finishes")
+    metadata: Optional[dict] = Field(None, description="Additional metadata")
+
+    class Config:
+        """Pydantic config"""
+        str_strip_whitespace = True
+
+    @model_validator(mode="after")
+    def require_part(self) -> "BundleGenerationRequest":
+        if self.text is None and self.image is None and self.video is None:
+            raise ValueError("Request at least one of text, image or video")
+        return self
@@ -3,16 +3,28 @@ Pydantic response models for AI content generation.
 Unified response structure for all generation endpoints.
 """
 
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field
 from datetime import datetime
 
 
+class VariantResult(BaseModel):
+    """One variant of a best-of-N request"""
+    index: int = Field(..., description="Variant index")
+    status: str = Field(..., description="completed, failed, or cancelled (cut by first_k / budget_ms)")
+    content: Optional[str] = Field(None, description="Generated text (text)")
+    url: Optional[str] = Field(None, description="Generated image URL (image)")
+    error: Optional[str] = Field(None, description="Error message if failed")
+    duration_ms: Optional[float] = Field(None, description="Time until the variant finished")
+
+
 class TextGenerationResponse(BaseModel):
     """Response for text generation"""
     content: str = Field(..., description="Generated text content")
     model: str = Field(..., description="Model used")
-    tokens_used: Optional[int] = Field(None, description="Tokens consumed")
+    tokens_used: Optional[int] = Field(None, description="Estimated prompt + completion tokens (local tokenizer)")
+    queue_time_ms: Optional[float] = Field(None, description="Time spent waiting for an upstream slot")
+    variants: Optional[List[VariantResult]] = Field(None, description="Every variant when n > 1 (content is the first completed)")
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
@@ -21,6 +33,8 @@ class ImageGenerationResponse(BaseModel):
     url: str = Field(..., description="Generated image URL (in R2)")
     model: str = Field(..., description="Model used")
     resolution: str = Field(..., description="Image resolution")
+    queue_time_ms: Optional[float] = Field(None, description="Time spent waiting for an upstream slot")
+    variants: Optional[List[VariantResult]] = Field(None, description="Every variant when n > 1 (url is the first completed)")
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
@@ -44,6 +58,55 @@ class JobStatusResponse(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
 
+class JobStatusBatchResponse(BaseModel):
+    """Response for batch job status queries"""
+    jobs: List[JobStatusResponse] = Field(..., description="Statuses in request order")
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+
+class BulkGenerationResponse(BaseModel):
+    """Response for bulk generation submissions"""
+    job_id: str = Field(..., description="Bulk job ID")
+    status: str = Field(default="processing", description="Job status")
+    total: int = Field(..., description="Number of items")
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+
+class BulkJobStatusResponse(BaseModel):
+    """Response for bulk job status queries"""
+    job_id: str = Field(..., description="Bulk job ID")
+    status: str = Field(..., description="Current status: processing, completed, failed")
+    total: int = Field(..., description="Number of items")
+    finished: int = Field(..., description="Items that have completed or failed")
+    progress: int = Field(default=0, description="Progress percentage (0-100)")
+    result: Optional[dict] = Field(None, description="Per-item results once finished")
+    error: Optional[str] = Field(None, description="Error message if failed")
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+
+class BundlePartResponse(BaseModel):
+    """Outcome of one part of a campaign bundle"""
+    status: str = Field(..., description="completed, processing (video job submitted) or failed")
+    model: str = Field(..., description="Model used")
+    content: Optional[str] = Field(None, description="Generated copy (text)")
+    url: Optional[str] = Field(None, description="Generated image URL (image)")
+    job_id: Optional[str] = Field(None, description="Video job ID, track with /v1/jobs (video)")
+    duration_seconds: Optional[int] = Field(None, description="Video duration (video)")
+    error: Optional[str] = Field(None, description="Error message if failed")
+    duration_ms: float = Field(..., description="Time taken by this part")
+    queue_time_ms: Optional[float] = Field(None, description="Time spent waiting for an upstream slot")
+
+
+class BundleGenerationResponse(BaseModel):
+    """Response for campaign bundle generation"""
+    status: str = Field(..., description="completed, or partial if some parts failed")
+    text: Optional[BundlePartResponse] = Field(None, description="Copy, if requested")
+    image: Optional[BundlePartResponse] = Field(None, description="Hero image, if requested")
+    video: Optional[BundlePartResponse] = Field(None, description="Video job, if requested")
+    duration_ms: float = Field(..., description="Total time (about the slowest part)")
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+
 class ErrorResponse(BaseModel):
     """Standard error response"""
     error: str = Field(..., description="Error message")
@@ -4,7 +4,7 @@ Defines interface for all provider implementations.
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 
 class BaseProvider(ABC):
@@ -23,6 +23,25 @@ class BaseProvider(ABC):
         """Generate text content"""
         pass
     
+    async def stream_text(
+        self,
+        prompt: str,
+        model: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 2000,
+        temperature: float = 0.7,
+        tenant_id: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Stream text content (defaults to a single chunk from generate_text)"""
+        yield await self.generate_text(
+            prompt=prompt,
+            model=model,
+            system_prompt=system_prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            tenant_id=tenant_id,
+        )
+    
     @abstractmethod
     async def generate_image(
         self,
@@ -42,7 +61,9 @@ class BaseProvider(ABC):
         model: str,
         duration_seconds: int = 8,
         aspect_ratio: str = "16:9",
-        tenant_id: Optional[str] = None
+        tenant_id: Optional[str] = None,
+        plan: Optional[str] = None,
+        webhook_url: Optional[str] = None,
     ) -> str:
         """Generate video content (returns job_id for async)"""
         pass
@@ -0,0 +1,241 @@
+"""
+Tenant-scoped response cache for generation calls.
+In-process LRU+TTL tier in front of an optional shared tier (Redis).
+"""
+
+import os
+import time
+import json
+import hashlib
+import logging
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "aics:cache"
+
+
+def make_cache_key(kind: str, tenant_id: Optional[str], **fields) -> str:
+    """
+    Build a tenant-scoped cache key from normalized request fields.
+
+    Args:
+        kind: Request kind (e.g., text, image)
+        tenant_id: Tenant ID (keys never collide across tenants)
+        **fields: Request fields that determine the response
+
+    Returns:
+        Key of the form "aics:cache:{tenant}:{kind}:{sha256}"
+    """
+    payload = json.dumps(fields, sort_keys=True, default=str, separators=(",", ":"))
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}:{tenant_id or '-'}:{kind}:{digest}"
+
+
+class LocalCache:
+    """In-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached value, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[float] = None) -> None:
+        """Store value, evicting least recently used entries past capacity"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SharedCacheBackend(ABC):
+    """Abstract shared cache tier (visible to all workers/replicas)"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """Get value for key"""
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        """Set value for key with TTL"""
+        pass
+
+    async def close(self) -> None:
+        """Release backend resources"""
+        pass
+
+
+class InMemorySharedCache(SharedCacheBackend):
+    """Local stand-in for the shared tier (tests and single-process dev)"""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[float, str]] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    async def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+
+
+class RedisSharedCache(SharedCacheBackend):
+    """Redis-backed shared tier"""
+
+    def __init__(self, url: str):
+        # Imported lazily so redis is only required when this tier is enabled
+        import redis.asyncio as redis
+        self._client = redis.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: str, ttl_seconds: float) -> None:
+        await self._client.set(key, value, ex=max(1, int(ttl_seconds)))
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class ResponseCache:
+    """
+    Two-tier response cache.
+
+    Lookups check the local tier first, then the shared tier (promoting hits
+    into the local tier). Shared-tier failures are logged and treated as misses
+    so a cache outage never fails a generation.
+    """
+
+    def __init__(
+        self,
+        local: Optional[LocalCache] = None,
+        shared: Optional[SharedCacheBackend] = None,
+        ttl_seconds: float = 3600,
+        enabled: bool = True,
+    ):
+        self.local = local or LocalCache(ttl_seconds=ttl_seconds)
+        self.shared = shared
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.hits_local = 0
+        self.hits_shared = 0
+        self.misses = 0
+        self.stores = 0
+        self.shared_errors = 0
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        """
+        Build cache from environment.
+
+        RESPONSE_CACHE_ENABLED: true/false (default true)
+        RESPONSE_CACHE_TTL_SECONDS: entry TTL (default 3600)
+        RESPONSE_CACHE_MAX_ENTRIES: local tier capacity (default 1024)
+        RESPONSE_CACHE_SHARED: none, memory or redis (default none)
+        RESPONSE_CACHE_REDIS_URL: Redis URL (defaults to REDIS_URL)
+        """
+        enabled = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+        ttl = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+        max_entries = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+        shared_kind = os.getenv("RESPONSE_CACHE_SHARED", "none").lower()
+
+        shared: Optional[SharedCacheBackend] = None
+        if shared_kind == "memory":
+            shared = InMemorySharedCache()
+        elif shared_kind == "redis":
+            url = os.getenv("RESPONSE_CACHE_REDIS_URL") or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+            try:
+                shared = RedisSharedCache(url)
+            except ImportError:
+                logger.warning("redis package not installed, shared response cache disabled")
+
+        return cls(
+            local=LocalCache(max_entries=max_entries, ttl_seconds=ttl),
+            shared=shared,
+            ttl_seconds=ttl,
+            enabled=enabled,
+        )
+
+    async def get(self, key: str) -> Optional[str]:
+        """Look up key in local then shared tier"""
+        value = self.local.get(key)
+        if value is not None:
+            self.hits_local += 1
+            return value
+
+        if self.shared is not None:
+            try:
+                value = await self.shared.get(key)
+            except Exception as e:
+                self.shared_errors += 1
+                logger.warning(f"Shared cache lookup failed: {str(e)}")
+                value = None
+            if value is not None:
+                self.hits_shared += 1
+                self.local.set(key, value)
+                return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        """Store value in both tiers"""
+        self.local.set(key, value)
+        self.stores += 1
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, value, self.ttl_seconds)
+            except Exception as e:
+                self.shared_errors += 1
+                logger.warning(f"Shared cache store failed: {str(e)}")
+
+    async def close(self) -> None:
+        """Close shared tier connections"""
+        if self.shared is not None:
+            await self.shared.close()
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits_local + self.hits_shared + self.misses
+        return {
+            "enabled": self.enabled,
+            "shared_tier": type(self.shared).__name__ if self.shared else None,
+            "entries": len(self.local),
+            "hits_local": self.hits_local,
+            "hits_shared": self.hits_shared,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits_local + self.hits_shared) / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.local.evictions,
+            "expirations": self.local.expirations,
+            "shared_errors": self.shared_errors,
+        }
@@ -0,0 +1,261 @@
+"""
+Per-bot adaptive concurrency control for upstream Poe calls.
+Additive-increase / multiplicative-decrease (AIMD) admission with a bounded wait queue.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+
+from .context import current_trace
+from .errors import ProviderOverloadedError, is_overload_error
+
+logger = logging.getLogger(__name__)
+
+# Long-running video bots start with fewer slots so they cannot crowd out text bots
+DEFAULT_BOT_LIMITS: Dict[str, Tuple[int, int]] = {
+    "Sora-2": (2, 4),
+    "Veo-3.1": (2, 4),
+    "Runway-Gen3": (2, 4),
+}
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter for a single bot.
+
+    The limit grows by roughly one slot per "window" of successful calls
+    (increase / limit per success) and is multiplied by `decrease` when the
+    upstream signals congestion (429 or timeout). Callers over the limit wait
+    in a FIFO queue bounded by `max_queue` and `queue_timeout`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        max_queue: int = 100,
+        queue_timeout: float = 30.0,
+        decrease_cooldown: float = 1.0,
+    ):
+        self.name = name
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.decrease_cooldown = decrease_cooldown
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.successes = 0
+        self.overloads = 0
+        self.total_queue_time = 0.0
+
+    @property
+    def allowed(self) -> int:
+        """Current integer number of concurrent calls allowed"""
+        return max(self.min_limit, int(self.limit))
+
+    async def acquire(self) -> float:
+        """
+        Wait for a slot.
+
+        Returns:
+            Seconds spent waiting in the queue
+
+        Raises:
+            ProviderOverloadedError: If the queue is full or the wait timed out
+        """
+        if self.in_flight < self.allowed and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return 0.0
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise ProviderOverloadedError(f"Upstream queue for {self.name} is full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was granted as we gave up; hand it back
+                self._release_slot()
+            else:
+                waiter.cancel()
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected += 1
+                raise ProviderOverloadedError(
+                    f"Timed out after {self.queue_timeout}s waiting for an upstream slot for {self.name}"
+                ) from None
+            raise
+
+        waited = time.monotonic() - started
+        self.admitted += 1
+        self.total_queue_time += waited
+        return waited
+
+    def release(self, overloaded: bool = False, succeeded: bool = False) -> None:
+        """
+        Release a slot and feed the outcome into the AIMD controller.
+
+        Args:
+            overloaded: Call failed with a congestion signal (429/timeout)
+            succeeded: Call completed successfully
+        """
+        if overloaded:
+            self.overloads += 1
+            now = time.monotonic()
+            # One burst of 429s should shrink the limit once, not once per call
+            if now - self._last_decrease >= self.decrease_cooldown:
+                self.limit = max(float(self.min_limit), self.limit * self.decrease)
+                self._last_decrease = now
+                logger.warning(f"Upstream congestion for {self.name}, limit reduced to {self.allowed}")
+        elif succeeded:
+            self.successes += 1
+            self.limit = min(float(self.max_limit), self.limit + self.increase / max(self.limit, 1.0))
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        """Grant slots to queued callers while under the limit"""
+        while self._waiters and self.in_flight < self.allowed:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def stats(self) -> dict:
+        """Limiter counters for monitoring"""
+        return {
+            "limit": self.allowed,
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "successes": self.successes,
+            "overloads": self.overloads,
+            "avg_queue_time_ms": round(self.total_queue_time / self.queued * 1000, 1) if self.queued else 0.0,
+        }
+
+
+class ConcurrencyGovernor:
+    """Registry of per-bot adaptive limiters"""
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        max_queue: int = 100,
+        queue_timeout: float = 30.0,
+        bot_limits: Optional[Dict[str, Tuple[int, int]]] = None,
+    ):
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.bot_limits = dict(DEFAULT_BOT_LIMITS)
+        self.bot_limits.update(bot_limits or {})
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
+
+    @classmethod
+    def from_env(cls) -> "ConcurrencyGovernor":
+        """
+        Build governor from environment.
+
+        POE_CONCURRENCY_INITIAL: starting limit per bot (default 8)
+        POE_CONCURRENCY_MIN / POE_CONCURRENCY_MAX: limit bounds (default 1 / 32)
+        POE_QUEUE_MAX: max callers waiting per bot (default 100)
+        POE_QUEUE_TIMEOUT_SECONDS: max wait for a slot (default 30)
+        POE_CONCURRENCY_OVERRIDES: per-bot "initial:max", e.g. "Sora-2=1:2,GPT-4o=16:64"
+        """
+        overrides: Dict[str, Tuple[int, int]] = {}
+        for item in os.getenv("POE_CONCURRENCY_OVERRIDES", "").split(","):
+            if "=" not in item:
+                continue
+            bot, _, limits = item.partition("=")
+            initial, _, maximum = limits.partition(":")
+            overrides[bot.strip()] = (int(initial), int(maximum or initial))
+
+        return cls(
+            initial_limit=int(os.getenv("POE_CONCURRENCY_INITIAL", "8")),
+            min_limit=int(os.getenv("POE_CONCURRENCY_MIN", "1")),
+            max_limit=int(os.getenv("POE_CONCURRENCY_MAX", "32")),
+            max_queue=int(os.getenv("POE_QUEUE_MAX", "100")),
+            queue_timeout=float(os.getenv("POE_QUEUE_TIMEOUT_SECONDS", "30")),
+            bot_limits=overrides,
+        )
+
+    def limiter(self, bot_name: str) -> AdaptiveLimiter:
+        """Get (or lazily create) the limiter for a bot"""
+        limiter = self._limiters.get(bot_name)
+        if limiter is None:
+            initial, maximum = self.bot_limits.get(bot_name, (self.initial_limit, self.max_limit))
+            limiter = AdaptiveLimiter(
+                name=bot_name,
+                initial_limit=initial,
+                min_limit=min(self.min_limit, initial),
+                max_limit=maximum,
+                max_queue=self.max_queue,
+                queue_timeout=self.queue_timeout,
+            )
+            self._limiters[bot_name] = limiter
+        return limiter
+
+    @asynccontextmanager
+    async def slot(self, bot_name: str) -> AsyncIterator[None]:
+        """
+        Hold an upstream slot for bot_name for the duration of the block.
+
+        Queue time is added to the current generation trace. The block's
+        outcome (success, congestion, other error) adjusts the limit.
+        """
+        limiter = self.limiter(bot_name)
+        waited = await limiter.acquire()
+        trace = current_trace()
+        if trace is not None:
+            trace.queue_time_ms += waited * 1000
+
+        try:
+            yield
+        except GeneratorExit:
+            # Consumer closed the stream early after getting what it needed
+            limiter.release(succeeded=True)
+            raise
+        except BaseException as e:
+            limiter.release(overloaded=isinstance(e, Exception) and is_overload_error(e))
+            raise
+        limiter.release(succeeded=True)
+
+    def stats(self) -> dict:
+        """Per-bot limiter counters"""
+        return {bot: limiter.stats() for bot, limiter in self._limiters.items()}
@@ -0,0 +1,33 @@
+"""
+Per-request generation trace.
+Routes start a trace; provider components record timings into it so routes
+can report them without changing provider return types.
+"""
+
+from contextvars import ContextVar
+from typing import Optional
+
+
+class GenerationTrace:
+    """Accounting for one client request across provider calls"""
+    __slots__ = ("queue_time_ms", "upstream_calls", "retries")
+
+    def __init__(self):
+        self.queue_time_ms = 0.0
+        self.upstream_calls = 0
+        self.retries = 0
+
+
+_current_trace: ContextVar[Optional[GenerationTrace]] = ContextVar("generation_trace", default=None)
+
+
+def start_trace() -> GenerationTrace:
+    """Start a new trace for the current request context"""
+    trace = GenerationTrace()
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[GenerationTrace]:
+    """Trace for the current request context, if one was started"""
+    return _current_trace.get()
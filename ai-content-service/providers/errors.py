@@ -0,0 +1,78 @@
+"""
+Provider error types and upstream error classification.
+Shared by concurrency control, retries and routes (which map them to HTTP status codes).
+"""
+
+import asyncio
+from typing import Iterator
+
+import httpx
+import fastapi_poe as fp
+
+
+class ProviderUnavailableError(Exception):
+    """Base class for failures where the service should answer 503"""
+    pass
+
+
+class ProviderOverloadedError(ProviderUnavailableError):
+    """Raised when a request cannot be admitted upstream (wait queue full or timed out)"""
+    pass
+
+
+class CircuitOpenError(ProviderUnavailableError):
+    """Raised when a bot's circuit breaker is open and calls fail fast"""
+    pass
+
+
+def _exception_chain(exc: BaseException) -> Iterator[BaseException]:
+    """Yield exc and its causes/contexts (fastapi_poe wraps transport errors in BotError)"""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc = exc.__cause__ or exc.__context__
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """True if the upstream rejected the call for rate limiting (HTTP 429)"""
+    for error in _exception_chain(exc):
+        if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 429:
+            return True
+        message = str(error).lower()
+        if "429" in message or "rate limit" in message or "rate_limit" in message or "too many requests" in message:
+            return True
+    return False
+
+
+def is_timeout_error(exc: BaseException) -> bool:
+    """True if the upstream call timed out"""
+    return any(
+        isinstance(error, (asyncio.TimeoutError, httpx.TimeoutException))
+        for error in _exception_chain(exc)
+    )
+
+
+def is_overload_error(exc: BaseException) -> bool:
+    """True if the error signals upstream congestion (429 or timeout)"""
+    return is_rate_limit_error(exc) or is_timeout_error(exc)
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """
+    True if retrying the upstream call may succeed.
+
+    Retryable: congestion (429/timeouts), transport failures, 5xx responses and
+    bot errors the bot marked allow_retry. Not retryable: BotErrorNoRetry, 4xx
+    responses and local admission failures.
+    """
+    if isinstance(exc, (ProviderUnavailableError, fp.BotErrorNoRetry)):
+        return False
+    if is_overload_error(exc):
+        return True
+    for error in _exception_chain(exc):
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code >= 500
+        if isinstance(error, httpx.TransportError):
+            return True
+    return isinstance(exc, fp.BotError)
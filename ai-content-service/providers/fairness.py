@@ -0,0 +1,64 @@
+"""
+Tenant weights for fair scheduling.
+Shared by the in-process video worker pool and the Celery task router: a
+tenant's share of capacity under contention is proportional to its weight.
+"""
+
+import os
+from typing import Dict, Optional
+
+DEFAULT_PLAN_WEIGHTS: Dict[str, float] = {
+    "enterprise": 4,
+    "pro": 2,
+    "free": 1,
+}
+DEFAULT_WEIGHT = 1.0
+
+
+def parse_weights(raw: str) -> Dict[str, float]:
+    """Parse "name=weight,..." into a dict"""
+    weights: Dict[str, float] = {}
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        name, _, weight = item.partition("=")
+        weights[name.strip()] = float(weight)
+    return weights
+
+
+class TenantWeights:
+    """Resolves a tenant's scheduling weight: tenant override, then plan, then default"""
+
+    def __init__(
+        self,
+        plan_weights: Optional[Dict[str, float]] = None,
+        tenant_weights: Optional[Dict[str, float]] = None,
+        default_weight: float = DEFAULT_WEIGHT,
+    ):
+        self.plan_weights = dict(DEFAULT_PLAN_WEIGHTS)
+        self.plan_weights.update(plan_weights or {})
+        self.tenant_weights = tenant_weights or {}
+        self.default_weight = default_weight
+
+    @classmethod
+    def from_env(cls, prefix: str) -> "TenantWeights":
+        """
+        Build weights from environment.
+
+        {prefix}_PLAN_WEIGHTS: "plan=weight,..." merged over enterprise=4, pro=2, free=1
+        {prefix}_TENANT_WEIGHTS: "tenant_id=weight,..." overrides
+        {prefix}_DEFAULT_WEIGHT: weight without plan/tenant match (default 1)
+        """
+        return cls(
+            plan_weights=parse_weights(os.getenv(f"{prefix}_PLAN_WEIGHTS", "")),
+            tenant_weights=parse_weights(os.getenv(f"{prefix}_TENANT_WEIGHTS", "")),
+            default_weight=float(os.getenv(f"{prefix}_DEFAULT_WEIGHT", str(DEFAULT_WEIGHT))),
+        )
+
+    def weight_for(self, tenant_id: Optional[str], plan: Optional[str]) -> float:
+        if tenant_id in self.tenant_weights:
+            weight = self.tenant_weights[tenant_id]
+        else:
+            weight = self.plan_weights.get(plan, self.default_weight)
+        # A zero weight would never be scheduled
+        return max(weight, 0.01)
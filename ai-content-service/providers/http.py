@@ -0,0 +1,70 @@
+"""
+Pooled HTTP client for upstream Poe calls.
+One keep-alive (HTTP/2 when available) client per process, shared by all requests.
+"""
+
+import os
+import asyncio
+import logging
+import importlib.util
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# httpx only speaks HTTP/2 when the optional h2 package is installed
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Build the shared upstream client from environment.
+
+    POE_HTTP2: negotiate HTTP/2 when h2 is installed (default true)
+    POE_HTTP_MAX_CONNECTIONS: pool size (default 100)
+    POE_HTTP_MAX_KEEPALIVE: idle connections kept open (default 20)
+    POE_HTTP_KEEPALIVE_EXPIRY_SECONDS: idle connection lifetime (default 60)
+    POE_HTTP_CONNECT_TIMEOUT_SECONDS: connect timeout (default 10)
+    POE_HTTP_TIMEOUT_SECONDS: read/write timeout, long for video bots (default 600)
+    """
+    http2 = HTTP2_AVAILABLE and os.getenv("POE_HTTP2", "true").lower() == "true"
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("POE_HTTP_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("POE_HTTP_MAX_KEEPALIVE", "20")),
+        keepalive_expiry=float(os.getenv("POE_HTTP_KEEPALIVE_EXPIRY_SECONDS", "60")),
+    )
+    timeout = httpx.Timeout(
+        float(os.getenv("POE_HTTP_TIMEOUT_SECONDS", "600")),
+        connect=float(os.getenv("POE_HTTP_CONNECT_TIMEOUT_SECONDS", "10")),
+    )
+    logger.info(f"Creating upstream HTTP client (http2={http2}, max_connections={limits.max_connections})")
+    return httpx.AsyncClient(http2=http2, limits=limits, timeout=timeout)
+
+
+async def prewarm(client: httpx.AsyncClient, url: str, connections: int = 2) -> int:
+    """
+    Open connections to the upstream ahead of the first request.
+
+    Issues lightweight HEAD requests so TCP and TLS handshakes happen at
+    startup instead of on a user's request. Any HTTP status counts as warm.
+
+    Args:
+        client: Shared client
+        url: Upstream URL to connect to
+        connections: Number of concurrent warm-up requests
+
+    Returns:
+        Number of warm-up requests that reached the upstream
+    """
+    async def warm() -> bool:
+        try:
+            await client.head(url, timeout=5)
+            return True
+        except httpx.HTTPError as e:
+            logger.warning(f"Connection pre-warm to {url} failed: {str(e)}")
+            return False
+
+    results = await asyncio.gather(*(warm() for _ in range(max(0, connections))))
+    warmed = sum(results)
+    logger.info(f"Pre-warmed {warmed}/{connections} upstream connections to {url}")
+    return warmed
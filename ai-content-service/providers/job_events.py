@@ -0,0 +1,143 @@
+"""
+In-process pub/sub for job state transitions.
+All subscribers to a job share one watcher, which re-reads the job store when the
+job changes locally and periodically to pick up changes made by other processes.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from .job_store import JobRecord, JobStore
+
+logger = logging.getLogger(__name__)
+
+
+class _JobWatch:
+    """Latest known state of one job, shared by its subscribers"""
+    __slots__ = ("job_id", "record", "fingerprint", "version", "changed", "wake", "subscribers", "task")
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.record: Optional[JobRecord] = None
+        self.fingerprint: Optional[Tuple] = None
+        # Bumped on every observed transition; 0 until the first load
+        self.version = 0
+        self.changed = asyncio.Event()
+        self.wake = asyncio.Event()
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def observe(self, record: Optional[JobRecord]) -> None:
+        """Record a store read, signalling subscribers if the job changed"""
+        fingerprint = (record.status, record.updated_at) if record is not None else None
+        if self.version and fingerprint == self.fingerprint:
+            return
+        self.record = record
+        self.fingerprint = fingerprint
+        self.version += 1
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+
+class JobSubscription:
+    """One subscriber's view of a shared job watch"""
+
+    def __init__(self, watch: _JobWatch):
+        self._watch = watch
+        self._version = 0
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[JobRecord]:
+        """
+        Wait for a job state newer than the last one returned.
+
+        The first call returns the current state.
+
+        Args:
+            timeout: Max seconds to wait (None waits indefinitely)
+
+        Returns:
+            Job record, or None if the job does not exist
+
+        Raises:
+            asyncio.TimeoutError: If no newer state arrived within timeout
+        """
+        watch = self._watch
+        if watch.version == self._version:
+            await asyncio.wait_for(watch.changed.wait(), timeout)
+        self._version = watch.version
+        return watch.record
+
+
+class JobEventBus:
+    """
+    Fan-out of job state changes to local subscribers.
+
+    A watcher task exists only while a job has subscribers. It stops reading
+    once the job is finished or unknown; subscribers then keep the final state.
+    """
+
+    def __init__(self, store: JobStore, poll_interval: float = 1.0):
+        self.store = store
+        self.poll_interval = poll_interval
+        self._watches: Dict[str, _JobWatch] = {}
+        self.subscriptions = 0
+        self.store_reads = 0
+
+    def notify(self, job_id: str) -> None:
+        """Signal that job_id changed in this process (no-op without subscribers)"""
+        watch = self._watches.get(job_id)
+        if watch is not None:
+            watch.wake.set()
+
+    async def _watch_job(self, watch: _JobWatch) -> None:
+        while True:
+            # Cleared before reading so a notify() during the read is not lost
+            watch.wake.clear()
+            try:
+                record = await self.store.get(watch.job_id)
+                self.store_reads += 1
+            except Exception as e:
+                logger.warning(f"Job watch read failed for {watch.job_id}: {str(e)}")
+            else:
+                watch.observe(record)
+                if record is None or record.is_terminal:
+                    return
+            try:
+                await asyncio.wait_for(watch.wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    @asynccontextmanager
+    async def subscribe(self, job_id: str) -> AsyncIterator[JobSubscription]:
+        """Subscribe to job_id's transitions for the duration of the block"""
+        watch = self._watches.get(job_id)
+        if watch is None:
+            watch = _JobWatch(job_id)
+            watch.task = asyncio.create_task(self._watch_job(watch))
+            self._watches[job_id] = watch
+        watch.subscribers += 1
+        self.subscriptions += 1
+        try:
+            yield JobSubscription(watch)
+        finally:
+            watch.subscribers -= 1
+            if watch.subscribers == 0:
+                del self._watches[job_id]
+                watch.task.cancel()
+
+    async def close(self) -> None:
+        """Stop all watchers"""
+        for watch in list(self._watches.values()):
+            watch.task.cancel()
+        self._watches.clear()
+
+    def stats(self) -> dict:
+        """Pub/sub counters for monitoring"""
+        return {
+            "watched_jobs": len(self._watches),
+            "subscribers": sum(watch.subscribers for watch in self._watches.values()),
+            "subscriptions": self.subscriptions,
+            "store_reads": self.store_reads,
+        }
@@ -0,0 +1,222 @@
+"""
+Follow-up poller for jobs still running at the upstream provider.
+Due jobs are refreshed from the job store in one batch and checked upstream
+concurrently; each job backs off exponentially and fails at its deadline or
+after a fixed number of checks.
+"""
+
+import os
+import time
+import random
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .job_store import JobRecord, JobStore
+
+logger = logging.getLogger(__name__)
+
+
+class _FollowUp:
+    """Polling state of one tracked job"""
+    __slots__ = ("job_id", "deadline", "next_poll_at", "attempts")
+
+    def __init__(self, job_id: str, deadline: float, next_poll_at: float):
+        self.job_id = job_id
+        self.deadline = deadline
+        self.next_poll_at = next_poll_at
+        self.attempts = 0
+
+
+class FollowUpPoller:
+    """
+    Periodically checks unfinished upstream jobs until they finish or time out.
+
+    `check(record)` asks upstream about a job and returns True once it has
+    recorded a final status; `expire(record)` is called for jobs past their
+    deadline or still unfinished after max_attempts checks. Jobs finished or claimed elsewhere are dropped on the next
+    batch read. Tracked jobs are also the registry of leases to renew.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        store: JobStore,
+        check: Callable[[JobRecord], Awaitable[bool]],
+        expire: Callable[[JobRecord], Awaitable[None]],
+        owner: str,
+        interval: float = 5.0,
+        batch_size: int = 10,
+        base_delay: float = 10.0,
+        max_delay: float = 120.0,
+        deadline: float = 1800.0,
+        max_attempts: int = 6,
+    ):
+        self.name = name
+        self.store = store
+        self.check = check
+        self.expire = expire
+        self.owner = owner
+        self.interval = interval
+        self.batch_size = batch_size
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.max_attempts = max_attempts
+        self._tracked: Dict[str, _FollowUp] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.polls = 0
+        self.completed = 0
+        self.expired = 0
+        self.dropped = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(
+        cls,
+        name: str,
+        store: JobStore,
+        check: Callable[[JobRecord], Awaitable[bool]],
+        expire: Callable[[JobRecord], Awaitable[None]],
+        owner: str,
+    ) -> "FollowUpPoller":
+        """
+        Build poller from environment.
+
+        VIDEO_FOLLOWUP_INTERVAL_SECONDS: scheduler tick (default 5)
+        VIDEO_FOLLOWUP_BATCH_SIZE: max jobs checked per tick (default 10)
+        VIDEO_FOLLOWUP_BASE_DELAY_SECONDS: first per-job backoff (default 10)
+        VIDEO_FOLLOWUP_MAX_DELAY_SECONDS: per-job backoff cap (default 120)
+        VIDEO_FOLLOWUP_DEADLINE_SECONDS: job age at which it is failed (default 1800)
+        VIDEO_FOLLOWUP_MAX_ATTEMPTS: checks before an unfinished job is failed (default 6)
+        """
+        return cls(
+            name=name,
+            store=store,
+            check=check,
+            expire=expire,
+            owner=owner,
+            interval=float(os.getenv("VIDEO_FOLLOWUP_INTERVAL_SECONDS", "5")),
+            batch_size=int(os.getenv("VIDEO_FOLLOWUP_BATCH_SIZE", "10")),
+            base_delay=float(os.getenv("VIDEO_FOLLOWUP_BASE_DELAY_SECONDS", "10")),
+            max_delay=float(os.getenv("VIDEO_FOLLOWUP_MAX_DELAY_SECONDS", "120")),
+            deadline=float(os.getenv("VIDEO_FOLLOWUP_DEADLINE_SECONDS", "1800")),
+            max_attempts=int(os.getenv("VIDEO_FOLLOWUP_MAX_ATTEMPTS", "6")),
+        )
+
+    def _delay(self, attempts: int) -> float:
+        """Exponential backoff with +/-20% jitter so batches spread out"""
+        return min(self.max_delay, self.base_delay * (2 ** attempts)) * random.uniform(0.8, 1.2)
+
+    def track(self, record: JobRecord) -> None:
+        """Start following up on a job (deadline counts from its creation)"""
+        if record.job_id in self._tracked:
+            return
+        self._tracked[record.job_id] = _FollowUp(
+            record.job_id,
+            deadline=record.created_at + self.deadline,
+            next_poll_at=time.time() + self._delay(0),
+        )
+
+    def job_ids(self) -> List[str]:
+        """Jobs being followed up"""
+        return list(self._tracked)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._tracked
+
+    def start(self) -> None:
+        """Start the scheduler (app lifespan)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> List[str]:
+        """
+        Stop the scheduler.
+
+        Returns:
+            IDs of jobs still being followed up (to be handed back)
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        unfinished = list(self._tracked)
+        self._tracked.clear()
+        return unfinished
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll_due()
+            except Exception as e:
+                logger.warning(f"{self.name} follow-up batch failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    async def poll_due(self) -> int:
+        """
+        Check the jobs whose backoff has elapsed, earliest first.
+
+        Returns:
+            Number of jobs checked upstream
+        """
+        now = time.time()
+        due = sorted(
+            (f for f in self._tracked.values() if f.next_poll_at <= now or f.deadline <= now),
+            key=lambda f: min(f.next_poll_at, f.deadline),
+        )[:self.batch_size]
+        if not due:
+            return 0
+
+        records = await self.store.get_many([f.job_id for f in due])
+        pending = []
+        for follow_up in due:
+            record = records.get(follow_up.job_id)
+            if record is None or record.is_terminal or record.owner != self.owner:
+                # Finished, expired or claimed by another process
+                self._tracked.pop(follow_up.job_id, None)
+                self.dropped += 1
+            elif follow_up.deadline <= now:
+                self._tracked.pop(follow_up.job_id, None)
+                self.expired += 1
+                logger.warning(f"{self.name} job {follow_up.job_id} passed its deadline")
+                await self.expire(record)
+            else:
+                pending.append((follow_up, record))
+
+        await asyncio.gather(*(self._check(follow_up, record) for follow_up, record in pending))
+        return len(pending)
+
+    async def _check(self, follow_up: _FollowUp, record: JobRecord) -> None:
+        self.polls += 1
+        try:
+            done = await self.check(record)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"{self.name} follow-up for job {follow_up.job_id} failed: {str(e)}")
+            done = False
+        if done:
+            self._tracked.pop(follow_up.job_id, None)
+            self.completed += 1
+            return
+        follow_up.attempts += 1
+        if follow_up.attempts >= self.max_attempts:
+            self._tracked.pop(follow_up.job_id, None)
+            self.expired += 1
+            logger.warning(f"{self.name} job {follow_up.job_id} unfinished after {follow_up.attempts} checks")
+            await self.expire(record)
+            return
+        follow_up.next_poll_at = time.time() + self._delay(follow_up.attempts)
+
+    def stats(self) -> dict:
+        """Poller counters for monitoring"""
+        return {
+            "tracked": len(self._tracked),
+            "polls": self.polls,
+            "completed": self.completed,
+            "expired": self.expired,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
@@ -0,0 +1,871 @@
+"""
+Stores for async generation jobs.
+Bounded in-process store plus shared SQLite / Redis / MongoDB backends so every
+worker and replica sees the same jobs. Unfinished jobs carry a lease held by the
+process running them; jobs whose lease lapses can be claimed and resumed elsewhere.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+PROCESSING = "processing"
+COMPLETED = "completed"
+FAILED = "failed"
+TERMINAL_STATUSES = frozenset((COMPLETED, FAILED))
+
+KEY_PREFIX = "aics:job"
+
+
+class JobRecord:
+    """
+    State of one async job.
+
+    `request` holds the parameters needed to resume an unfinished job after
+    its process died; it is dropped once the job completes or fails.
+    `webhook_url` is notified when the job completes or fails.
+    """
+    __slots__ = (
+        "job_id", "tenant_id", "model", "status", "result", "error", "request", "webhook_url",
+        "owner", "lease_expires_at", "recoveries", "created_at", "updated_at", "expires_at",
+    )
+
+    def __init__(
+        self,
+        job_id: str,
+        tenant_id: Optional[str],
+        model: str,
+        status: str = PENDING,
+        request: Optional[dict] = None,
+        webhook_url: Optional[str] = None,
+    ):
+        now = time.time()
+        self.job_id = job_id
+        self.tenant_id = tenant_id
+        self.model = model
+        self.status = status
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.request = request
+        self.webhook_url = webhook_url
+        # Process currently running the job and until when it holds it
+        self.owner: Optional[str] = None
+        self.lease_expires_at: Optional[float] = None
+        self.recoveries = 0
+        self.created_at = now
+        self.updated_at = now
+        # Set when the job reaches a terminal status
+        self.expires_at: Optional[float] = None
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def is_expired(self, now: float) -> bool:
+        return self.expires_at is not None and self.expires_at <= now
+
+    def is_orphaned(self, now: float) -> bool:
+        """Unfinished, leased, and the lease has lapsed"""
+        return not self.is_terminal and self.lease_expires_at is not None and self.lease_expires_at < now
+
+    def apply(self, status: str, result: Optional[dict], error: Optional[str], ttl_seconds: float) -> None:
+        """Apply a status update, starting the TTL and dropping recovery state if terminal"""
+        now = time.time()
+        self.status = status
+        if result is not None:
+            self.result = result
+        if error is not None:
+            self.error = error
+        self.updated_at = now
+        if self.is_terminal:
+            self.expires_at = now + ttl_seconds
+            self.request = None
+            self.owner = None
+            self.lease_expires_at = None
+
+    def to_dict(self) -> dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "JobRecord":
+        record = cls.__new__(cls)
+        for slot in cls.__slots__:
+            setattr(record, slot, data.get(slot))
+        record.recoveries = record.recoveries or 0
+        return record
+
+
+class JobStore(ABC):
+    """
+    Abstract job store.
+
+    Finished (completed/failed) jobs stay queryable for `ttl_seconds`.
+    Backends that cannot expire records natively are swept every
+    `sweep_interval` seconds once start() is called. `shared` tells whether
+    other processes (e.g. Celery workers) see the same jobs.
+    """
+
+    shared = True
+
+    def __init__(self, ttl_seconds: float = 3600, sweep_interval: float = 60):
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval = sweep_interval
+        self._sweeper: Optional[asyncio.Task] = None
+        self.created = 0
+        self.expired = 0
+        self.hits = 0
+        self.misses = 0
+        self.recovered = 0
+
+    @classmethod
+    def from_env(cls) -> "JobStore":
+        """
+        Build job store from environment.
+
+        JOB_STORE: memory, sqlite, redis or mongo (default memory)
+        JOB_TTL_SECONDS: how long finished jobs stay queryable (default 3600)
+        JOB_SWEEP_INTERVAL_SECONDS: expiry sweep period (default 60)
+        JOB_STORE_MAX_JOBS: max records held by the memory store (default 10000)
+        JOB_STORE_SQLITE_PATH: database file for the sqlite store (default jobs.db)
+        JOB_STORE_REDIS_URL: Redis URL (defaults to REDIS_URL)
+        JOB_STORE_MONGO_URI: MongoDB URI (defaults to MONGO_URI)
+        """
+        kind = os.getenv("JOB_STORE", "memory").lower()
+        ttl = float(os.getenv("JOB_TTL_SECONDS", "3600"))
+        sweep_interval = float(os.getenv("JOB_SWEEP_INTERVAL_SECONDS", "60"))
+
+        try:
+            if kind == "sqlite":
+                return SQLiteJobStore(
+                    os.getenv("JOB_STORE_SQLITE_PATH", "jobs.db"),
+                    ttl_seconds=ttl,
+                    sweep_interval=sweep_interval,
+                )
+            if kind == "redis":
+                url = os.getenv("JOB_STORE_REDIS_URL") or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+                return RedisJobStore(url, ttl_seconds=ttl)
+            if kind == "mongo":
+                uri = os.getenv("JOB_STORE_MONGO_URI") or os.getenv("MONGO_URI", "mongodb://localhost:27017/ai-content")
+                return MongoJobStore(uri, ttl_seconds=ttl)
+        except ImportError as e:
+            logger.warning(f"{kind} job store unavailable ({str(e)}), falling back to in-memory store")
+
+        return MemoryJobStore(
+            max_jobs=int(os.getenv("JOB_STORE_MAX_JOBS", "10000")),
+            ttl_seconds=ttl,
+            sweep_interval=sweep_interval,
+        )
+
+    @abstractmethod
+    async def create(self, record: JobRecord) -> None:
+        """Add a new job"""
+        pass
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[JobRecord]:
+        """Return the job, or None if unknown or expired"""
+        pass
+
+    @abstractmethod
+    async def get_many(self, job_ids: List[str]) -> Dict[str, JobRecord]:
+        """Return the jobs that exist (and have not expired) in one store round-trip"""
+        pass
+
+    @abstractmethod
+    async def update(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[dict] = None,
+        error: Optional[str] = None,
+    ) -> bool:
+        """
+        Set a job's status (and result/error), starting its TTL if terminal.
+
+        A job that already completed or failed keeps its final state.
+
+        Returns:
+            False if the job is no longer in the store or already finished
+        """
+        pass
+
+    @abstractmethod
+    async def renew_leases(self, job_ids: List[str], owner: str, lease_seconds: float) -> None:
+        """Extend leases held by owner (lease_seconds=0 hands them back for immediate recovery)"""
+        pass
+
+    @abstractmethod
+    async def release_lease(self, job_id: str, owner: str) -> None:
+        """Drop owner's lease on an unfinished job that must not be resumed"""
+        pass
+
+    @abstractmethod
+    async def claim_orphans(self, owner: str, lease_seconds: float, limit: int = 10) -> List[JobRecord]:
+        """
+        Atomically take over unfinished jobs whose lease has lapsed.
+
+        Returns:
+            Claimed records, now leased to owner with `recoveries` incremented
+        """
+        pass
+
+    async def sweep(self) -> int:
+        """Remove expired jobs; returns the number removed"""
+        return 0
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                removed = await self.sweep()
+            except Exception as e:
+                logger.warning(f"Job store sweep failed: {str(e)}")
+                continue
+            if removed:
+                logger.info(f"Expired {removed} finished jobs")
+
+    def start(self) -> None:
+        """Start the background sweeper if the backend needs one (app lifespan)"""
+        if self._sweeper is None and self.sweep_interval > 0:
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def close(self) -> None:
+        """Stop the background sweeper and release backend resources"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+
+    def stats(self) -> dict:
+        """Job store counters for monitoring"""
+        return {
+            "backend": type(self).__name__,
+            "ttl_seconds": self.ttl_seconds,
+            "created": self.created,
+            "expired": self.expired,
+            "hits": self.hits,
+            "misses": self.misses,
+            "recovered": self.recovered,
+        }
+
+
+class MemoryJobStore(JobStore):
+    """
+    In-process job store bounded by size and age.
+
+    Only visible to the current process. Never holds more than `max_jobs`
+    records; past that the least recently touched record is evicted.
+    """
+
+    shared = False
+
+    def __init__(self, max_jobs: int = 10000, ttl_seconds: float = 3600, sweep_interval: float = 60):
+        super().__init__(ttl_seconds=ttl_seconds, sweep_interval=sweep_interval)
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, JobRecord]" = OrderedDict()
+        self.evicted = 0
+        self.evicted_active = 0
+
+    async def create(self, record: JobRecord) -> None:
+        self._jobs[record.job_id] = record
+        self.created += 1
+        while len(self._jobs) > self.max_jobs:
+            _, evicted = self._jobs.popitem(last=False)
+            self.evicted += 1
+            if not evicted.is_terminal:
+                self.evicted_active += 1
+                logger.warning(f"Job store full, evicted unfinished job {evicted.job_id}")
+
+    async def get(self, job_id: str) -> Optional[JobRecord]:
+        record = self._jobs.get(job_id)
+        if record is not None and record.is_expired(time.time()):
+            del self._jobs[job_id]
+            self.expired += 1
+            record = None
+        if record is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._jobs.move_to_end(job_id)
+        return record
+
+    async def get_many(self, job_ids: List[str]) -> Dict[str, JobRecord]:
+        records = {}
+        for job_id in job_ids:
+            record = await self.get(job_id)
+            if record is not None:
+                records[job_id] = record
+        return records
+
+    async def update(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[dict] = None,
+        error: Optional[str] = None,
+    ) -> bool:
+        record = self._jobs.get(job_id)
+        if record is None:
+            logger.warning(f"Job {job_id} no longer in store, dropping {status} update")
+            return False
+        if record.is_terminal:
+            logger.warning(f"Job {job_id} already {record.status}, dropping {status} update")
+            return False
+        record.apply(status, result, error, self.ttl_seconds)
+        self._jobs.move_to_end(job_id)
+        return True
+
+    async def renew_leases(self, job_ids: List[str], owner: str, lease_seconds: float) -> None:
+        lease_expires_at = time.time() + lease_seconds
+        for job_id in job_ids:
+            record = self._jobs.get(job_id)
+            if record is not None and record.owner == owner and not record.is_terminal:
+                record.lease_expires_at = lease_expires_at
+
+    async def release_lease(self, job_id: str, owner: str) -> None:
+        record = self._jobs.get(job_id)
+        if record is not None and record.owner == owner:
+            record.owner = None
+            record.lease_expires_at = None
+
+    async def claim_orphans(self, owner: str, lease_seconds: float, limit: int = 10) -> List[JobRecord]:
+        now = time.time()
+        claimed = []
+        for record in self._jobs.values():
+            if len(claimed) >= limit:
+                break
+            if record.is_orphaned(now):
+                record.owner = owner
+                record.lease_expires_at = now + lease_seconds
+                record.recoveries += 1
+                claimed.append(record)
+        self.recovered += len(claimed)
+        return claimed
+
+    async def sweep(self) -> int:
+        now = time.time()
+        expired = [job_id for job_id, record in self._jobs.items() if record.is_expired(now)]
+        for job_id in expired:
+            del self._jobs[job_id]
+        self.expired += len(expired)
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats.update({
+            "size": len(self._jobs),
+            "max_jobs": self.max_jobs,
+            "evicted": self.evicted,
+            "evicted_active": self.evicted_active,
+        })
+        return stats
+
+
+class SQLiteJobStore(JobStore):
+    """
+    SQLite-backed store shared by all workers on one host.
+
+    Uses WAL mode so readers never block the writer; calls run in a thread
+    so the event loop is not blocked on disk I/O. Writes that must be atomic
+    across processes (updates, lease claims) use BEGIN IMMEDIATE.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            owner TEXT,
+            lease_expires_at REAL,
+            expires_at REAL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS jobs_expires_at ON jobs (expires_at);
+        CREATE INDEX IF NOT EXISTS jobs_lease_expires_at ON jobs (lease_expires_at);
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 3600, sweep_interval: float = 60):
+        super().__init__(ttl_seconds=ttl_seconds, sweep_interval=sweep_interval)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+
+    async def _run(self, fn, *args):
+        def locked():
+            with self._lock:
+                return fn(*args)
+        return await asyncio.to_thread(locked)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _write(self, record: JobRecord) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO jobs (job_id, status, owner, lease_expires_at, expires_at, data) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                record.job_id,
+                record.status,
+                record.owner,
+                record.lease_expires_at,
+                record.expires_at,
+                json.dumps(record.to_dict()),
+            ),
+        )
+
+    def _load(self, job_id: str) -> Optional[JobRecord]:
+        row = self._conn.execute(
+            "SELECT data, owner, lease_expires_at FROM jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        record = JobRecord.from_dict(json.loads(row[0]))
+        # Lease columns are updated in place and are authoritative
+        record.owner, record.lease_expires_at = row[1], row[2]
+        return record
+
+    def _load_many(self, job_ids: List[str]) -> List[JobRecord]:
+        placeholders = ",".join("?" * len(job_ids))
+        rows = self._conn.execute(
+            f"SELECT data, owner, lease_expires_at FROM jobs WHERE job_id IN ({placeholders})", job_ids
+        ).fetchall()
+        records = []
+        for data, owner, lease_expires_at in rows:
+            record = JobRecord.from_dict(json.loads(data))
+            record.owner, record.lease_expires_at = owner, lease_expires_at
+            records.append(record)
+        return records
+
+    def _update(self, job_id: str, status: str, result: Optional[dict], error: Optional[str]) -> bool:
+        with self._transaction():
+            record = self._load(job_id)
+            if record is None or record.is_terminal:
+                return False
+            record.apply(status, result, error, self.ttl_seconds)
+            self._write(record)
+            return True
+
+    def _claim(self, owner: str, lease_seconds: float, limit: int) -> List[JobRecord]:
+        now = time.time()
+        claimed = []
+        with self._transaction():
+            rows = self._conn.execute(
+                "SELECT job_id FROM jobs WHERE expires_at IS NULL AND lease_expires_at < ? LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            for (job_id,) in rows:
+                record = self._load(job_id)
+                record.owner = owner
+                record.lease_expires_at = now + lease_seconds
+                record.recoveries += 1
+                self._write(record)
+                claimed.append(record)
+        return claimed
+
+    async def create(self, record: JobRecord) -> None:
+        await self._run(self._write, record)
+        self.created += 1
+
+    async def get(self, job_id: str) -> Optional[JobRecord]:
+        record = await self._run(self._load, job_id)
+        if record is None or record.is_expired(time.time()):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return record
+
+    async def get_many(self, job_ids: List[str]) -> Dict[str, JobRecord]:
+        if not job_ids:
+            return {}
+        now = time.time()
+        records = {
+            record.job_id: record
+            for record in await self._run(self._load_many, list(job_ids))
+            if not record.is_expired(now)
+        }
+        self.hits += len(records)
+        self.misses += len(job_ids) - len(records)
+        return records
+
+    async def update(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[dict] = None,
+        error: Optional[str] = None,
+    ) -> bool:
+        updated = await self._run(self._update, job_id, status, result, error)
+        if not updated:
+            logger.warning(f"Job {job_id} no longer in store or already finished, dropping {status} update")
+        return updated
+
+    async def renew_leases(self, job_ids: List[str], owner: str, lease_seconds: float) -> None:
+        if not job_ids:
+            return
+        placeholders = ",".join("?" * len(job_ids))
+        await self._run(
+            self._conn.execute,
+            f"UPDATE jobs SET lease_expires_at = ? WHERE owner = ? AND expires_at IS NULL "
+            f"AND job_id IN ({placeholders})",
+            (time.time() + lease_seconds, owner, *job_ids),
+        )
+
+    async def release_lease(self, job_id: str, owner: str) -> None:
+        await self._run(
+            self._conn.execute,
+            "UPDATE jobs SET owner = NULL, lease_expires_at = NULL WHERE job_id = ? AND owner = ?",
+            (job_id, owner),
+        )
+
+    async def claim_orphans(self, owner: str, lease_seconds: float, limit: int = 10) -> List[JobRecord]:
+        claimed = await self._run(self._claim, owner, lease_seconds, limit)
+        self.recovered += len(claimed)
+        return claimed
+
+    async def sweep(self) -> int:
+        cursor = await self._run(self._conn.execute, "DELETE FROM jobs WHERE expires_at <= ?", (time.time(),))
+        self.expired += cursor.rowcount
+        return cursor.rowcount
+
+    async def close(self) -> None:
+        await super().close()
+        self._conn.close()
+
+
+class RedisJobStore(JobStore):
+    """
+    Redis-backed store shared by all workers and replicas.
+
+    Each job is a JSON string key; finished jobs get a native Redis TTL so no
+    sweeper is needed. Leases live in a sorted set scored by expiry, with
+    owners in a hash, and are renewed/claimed atomically via Lua scripts.
+    Records are rewritten under WATCH/MULTI, so a write based on a stale read
+    is retried, and a finished record is never overwritten.
+    """
+
+    LEASES_KEY = f"{KEY_PREFIX}s:leases"
+    OWNERS_KEY = f"{KEY_PREFIX}s:owners"
+
+    # KEYS: leases, owners. ARGV: owner, lease_expires_at, job ids...
+    RENEW_SCRIPT = """
+        for i = 3, #ARGV do
+            if redis.call('HGET', KEYS[2], ARGV[i]) == ARGV[1] then
+                redis.call('ZADD', KEYS[1], 'XX', ARGV[2], ARGV[i])
+            end
+        end
+        return 0
+    """
+
+    # KEYS: leases, owners. ARGV: now, lease_expires_at, owner, limit
+    CLAIM_SCRIPT = """
+        local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', '(' .. ARGV[1], 'LIMIT', 0, tonumber(ARGV[4]))
+        for _, id in ipairs(ids) do
+            redis.call('ZADD', KEYS[1], ARGV[2], id)
+            redis.call('HSET', KEYS[2], id, ARGV[3])
+        end
+        return ids
+    """
+
+    def __init__(self, url: str, ttl_seconds: float = 3600):
+        # Redis expires finished jobs itself
+        super().__init__(ttl_seconds=ttl_seconds, sweep_interval=0)
+        # Imported lazily so redis is only required when this backend is enabled
+        import redis.asyncio as redis
+        self._client = redis.from_url(url, decode_responses=True)
+        self._watch_error = redis.WatchError
+        self._renew = self._client.register_script(self.RENEW_SCRIPT)
+        self._claim = self._client.register_script(self.CLAIM_SCRIPT)
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"{KEY_PREFIX}:{job_id}"
+
+    async def _load(self, job_id: str) -> Optional[JobRecord]:
+        data = await self._client.get(self._key(job_id))
+        return JobRecord.from_dict(json.loads(data)) if data is not None else None
+
+    async def create(self, record: JobRecord) -> None:
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.set(self._key(record.job_id), json.dumps(record.to_dict()))
+            if record.owner is not None and record.lease_expires_at is not None:
+                pipe.zadd(self.LEASES_KEY, {record.job_id: record.lease_expires_at})
+                pipe.hset(self.OWNERS_KEY, record.job_id, record.owner)
+            await pipe.execute()
+        self.created += 1
+
+    async def get(self, job_id: str) -> Optional[JobRecord]:
+        record = await self._load(job_id)
+        if record is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return record
+
+    async def get_many(self, job_ids: List[str]) -> Dict[str, JobRecord]:
+        if not job_ids:
+            return {}
+        values = await self._client.mget([self._key(job_id) for job_id in job_ids])
+        records = {
+            job_id: JobRecord.from_dict(json.loads(data))
+            for job_id, data in zip(job_ids, values)
+            if data is not None
+        }
+        self.hits += len(records)
+        self.misses += len(job_ids) - len(records)
+        return records
+
+    async def update(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[dict] = None,
+        error: Optional[str] = None,
+    ) -> bool:
+        key = self._key(job_id)
+        async with self._client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    data = await pipe.get(key)
+                    if data is None:
+                        logger.warning(f"Job {job_id} no longer in store, dropping {status} update")
+                        return False
+                    record = JobRecord.from_dict(json.loads(data))
+                    if record.is_terminal:
+                        logger.warning(f"Job {job_id} already {record.status}, dropping {status} update")
+                        return False
+                    record.apply(status, result, error, self.ttl_seconds)
+                    pipe.multi()
+                    if record.is_terminal:
+                        pipe.set(key, json.dumps(record.to_dict()), ex=max(1, int(self.ttl_seconds)))
+                        pipe.zrem(self.LEASES_KEY, job_id)
+                        pipe.hdel(self.OWNERS_KEY, job_id)
+                    else:
+                        pipe.set(key, json.dumps(record.to_dict()))
+                    await pipe.execute()
+                    return True
+                except self._watch_error:
+                    # Record changed since it was read (claim or another update)
+                    continue
+
+    async def renew_leases(self, job_ids: List[str], owner: str, lease_seconds: float) -> None:
+        if job_ids:
+            await self._renew(
+                keys=[self.LEASES_KEY, self.OWNERS_KEY],
+                args=[owner, time.time() + lease_seconds, *job_ids],
+            )
+
+    async def release_lease(self, job_id: str, owner: str) -> None:
+        if await self._client.hget(self.OWNERS_KEY, job_id) == owner:
+            async with self._client.pipeline(transaction=True) as pipe:
+                pipe.zrem(self.LEASES_KEY, job_id)
+                pipe.hdel(self.OWNERS_KEY, job_id)
+                await pipe.execute()
+
+    async def claim_orphans(self, owner: str, lease_seconds: float, limit: int = 10) -> List[JobRecord]:
+        now = time.time()
+        lease_expires_at = now + lease_seconds
+        job_ids = await self._claim(
+            keys=[self.LEASES_KEY, self.OWNERS_KEY],
+            args=[now, lease_expires_at, owner, limit],
+        )
+        claimed = []
+        for job_id in job_ids:
+            record = await self._claim_record(job_id, owner, lease_expires_at)
+            if record is not None:
+                claimed.append(record)
+        self.recovered += len(claimed)
+        return claimed
+
+    async def _claim_record(self, job_id: str, owner: str, lease_expires_at: float) -> Optional[JobRecord]:
+        """Write a claimed lease into the job's record, unless it finished or vanished meanwhile"""
+        key = self._key(job_id)
+        async with self._client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    data = await pipe.get(key)
+                    record = JobRecord.from_dict(json.loads(data)) if data is not None else None
+                    if record is None or record.is_terminal:
+                        # Stale lease: drop it without touching the record
+                        await pipe.unwatch()
+                        await self.release_lease(job_id, owner)
+                        return None
+                    record.owner = owner
+                    record.lease_expires_at = lease_expires_at
+                    record.recoveries += 1
+                    pipe.multi()
+                    pipe.set(key, json.dumps(record.to_dict()))
+                    await pipe.execute()
+                    return record
+                except self._watch_error:
+                    continue
+
+    async def close(self) -> None:
+        await super().close()
+        await self._client.aclose()
+
+
+class MongoJobStore(JobStore):
+    """
+    MongoDB-backed store shared by all workers and replicas.
+
+    Finished jobs are removed by a TTL index on `expire_at`; lease claims
+    use find_one_and_update so each orphan is taken by exactly one process,
+    and status updates $set only their own fields so they never undo one.
+    """
+
+    def __init__(self, uri: str, ttl_seconds: float = 3600, collection: str = "jobs"):
+        # The TTL index expires finished jobs
+        super().__init__(ttl_seconds=ttl_seconds, sweep_interval=0)
+        # Imported lazily so motor is only required when this backend is enabled
+        from motor.motor_asyncio import AsyncIOMotorClient
+        from pymongo import ReturnDocument
+        self._return_after = ReturnDocument.AFTER
+        self._client = AsyncIOMotorClient(uri)
+        self._jobs = self._client.get_default_database(default="ai-content")[collection]
+        self._indexes_ready = False
+
+    async def _ensure_indexes(self) -> None:
+        if not self._indexes_ready:
+            await self._jobs.create_index("expire_at", expireAfterSeconds=0)
+            await self._jobs.create_index("lease_expires_at")
+            self._indexes_ready = True
+
+    @staticmethod
+    def _to_document(record: JobRecord) -> dict:
+        document = record.to_dict()
+        document["_id"] = document.pop("job_id")
+        # TTL indexes need a BSON date
+        document["expire_at"] = (
+            datetime.fromtimestamp(record.expires_at, tz=timezone.utc) if record.expires_at is not None else None
+        )
+        return document
+
+    @staticmethod
+    def _from_document(document: dict) -> JobRecord:
+        document = dict(document)
+        document["job_id"] = document.pop("_id")
+        document.pop("expire_at", None)
+        return JobRecord.from_dict(document)
+
+    async def create(self, record: JobRecord) -> None:
+        await self._ensure_indexes()
+        await self._jobs.insert_one(self._to_document(record))
+        self.created += 1
+
+    async def get(self, job_id: str) -> Optional[JobRecord]:
+        document = await self._jobs.find_one({"_id": job_id})
+        record = self._from_document(document) if document is not None else None
+        # The TTL monitor runs about once a minute
+        if record is None or record.is_expired(time.time()):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return record
+
+    async def get_many(self, job_ids: List[str]) -> Dict[str, JobRecord]:
+        if not job_ids:
+            return {}
+        now = time.time()
+        records = {}
+        async for document in self._jobs.find({"_id": {"$in": list(job_ids)}}):
+            record = self._from_document(document)
+            if not record.is_expired(now):
+                records[record.job_id] = record
+        self.hits += len(records)
+        self.misses += len(job_ids) - len(records)
+        return records
+
+    async def update(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[dict] = None,
+        error: Optional[str] = None,
+    ) -> bool:
+        # Set only the fields an update owns, in one atomic write: a lease
+        # renewal or orphan claim landing meanwhile keeps its owner, lease
+        # and recoveries. Only unfinished jobs match.
+        now = time.time()
+        fields = {"status": status, "updated_at": now}
+        if result is not None:
+            fields["result"] = result
+        if error is not None:
+            fields["error"] = error
+        if status in TERMINAL_STATUSES:
+            expires_at = now + self.ttl_seconds
+            fields.update(
+                expires_at=expires_at,
+                expire_at=datetime.fromtimestamp(expires_at, tz=timezone.utc),
+                request=None,
+                owner=None,
+                lease_expires_at=None,
+            )
+        updated = await self._jobs.update_one({"_id": job_id, "expires_at": None}, {"$set": fields})
+        if updated.matched_count > 0:
+            return True
+        document = await self._jobs.find_one({"_id": job_id}, {"status": 1})
+        if document is None:
+            logger.warning(f"Job {job_id} no longer in store, dropping {status} update")
+        else:
+            logger.warning(f"Job {job_id} already {document['status']}, dropping {status} update")
+        return False
+
+    async def renew_leases(self, job_ids: List[str], owner: str, lease_seconds: float) -> None:
+        if job_ids:
+            await self._jobs.update_many(
+                {"_id": {"$in": list(job_ids)}, "owner": owner, "expires_at": None},
+                {"$set": {"lease_expires_at": time.time() + lease_seconds}},
+            )
+
+    async def release_lease(self, job_id: str, owner: str) -> None:
+        await self._jobs.update_one(
+            {"_id": job_id, "owner": owner},
+            {"$set": {"owner": None, "lease_expires_at": None}},
+        )
+
+    async def claim_orphans(self, owner: str, lease_seconds: float, limit: int = 10) -> List[JobRecord]:
+        now = time.time()
+        claimed = []
+        for _ in range(limit):
+            document = await self._jobs.find_one_and_update(
+                {"expires_at": None, "lease_expires_at": {"$lt": now}},
+                {"$set": {"owner": owner, "lease_expires_at": now + lease_seconds}, "$inc": {"recoveries": 1}},
+                return_document=self._return_after,
+            )
+            if document is None:
+                break
+            claimed.append(self._from_document(document))
+        self.recovered += len(claimed)
+        return claimed
+
+    async def close(self) -> None:
+        await super().close()
+        self._client.close()
@@ -0,0 +1,102 @@
+"""
+Incremental parsing of streamed bot responses.
+Recognizes asset URLs and Poe job ids as partials arrive so callers can stop the stream early.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+# Poe image/video bots return markdown ![image](url) or a bare URL
+URL_PATTERN = re.compile(r'https?://[^\s\)]+')
+JOB_ID_PATTERN = re.compile(r'job[_-]?id["\']?\s*[:=]\s*["\']?([a-zA-Z0-9\-]+)["\']?', re.IGNORECASE)
+
+# Trailing characters kept between feeds so a token split across partials is still found
+SCAN_OVERLAP = 64
+
+
+class AssetMatch:
+    """An asset URL or upstream job id found in a bot response"""
+    __slots__ = ("kind", "value")
+
+    URL = "url"
+    JOB_ID = "job_id"
+
+    def __init__(self, kind: str, value: str):
+        self.kind = kind
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f"AssetMatch({self.kind}={self.value!r})"
+
+
+class AssetScanner:
+    """
+    Scan streamed text for the first complete asset URL (or Poe job id).
+
+    A match is only reported once it is terminated by a following character,
+    since a URL at the very end of the received text may still be growing.
+    Only a small window of recent text is rescanned on each feed, so the cost
+    per partial does not grow with the response length.
+    """
+
+    def __init__(self, detect_job_id: bool = False):
+        self.detect_job_id = detect_job_id
+        self._parts: List[str] = []
+        self._window = ""
+
+    @property
+    def text(self) -> str:
+        """Full text received so far"""
+        return "".join(self._parts)
+
+    def feed(self, chunk: str) -> Optional[AssetMatch]:
+        """
+        Add a partial and return a complete match, if one is now available.
+
+        Args:
+            chunk: Next partial text from the bot
+
+        Returns:
+            First complete AssetMatch, or None if none yet
+        """
+        if not chunk:
+            return None
+        self._parts.append(chunk)
+        self._window += chunk
+
+        match, pending_start = self._search(final=False)
+        if match is not None:
+            return match
+
+        # Keep an unterminated match whole so it can complete on the next feed
+        keep_from = len(self._window) - SCAN_OVERLAP
+        if pending_start is not None:
+            keep_from = min(keep_from, pending_start)
+        if keep_from > 0:
+            self._window = self._window[keep_from:]
+        return None
+
+    def finish(self) -> Optional[AssetMatch]:
+        """Stream ended: accept a match that runs to the end of the text"""
+        match, _ = self._search(final=True)
+        return match
+
+    def _search(self, final: bool) -> Tuple[Optional[AssetMatch], Optional[int]]:
+        """Return (complete match, start of an unterminated match)"""
+        window = self._window
+        pending_start = None
+
+        url = URL_PATTERN.search(window)
+        if url is not None:
+            if final or url.end() < len(window):
+                return AssetMatch(AssetMatch.URL, url.group(0)), None
+            pending_start = url.start()
+
+        if self.detect_job_id:
+            job = JOB_ID_PATTERN.search(window)
+            if job is not None:
+                if final or job.end() < len(window):
+                    return AssetMatch(AssetMatch.JOB_ID, job.group(1)), None
+                pending_start = job.start() if pending_start is None else min(pending_start, job.start())
+
+        return None, pending_start
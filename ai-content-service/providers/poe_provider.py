@@ -4,28 +4,237 @@ Handles text, image, and video generation via Poe API using fastapi_poe.
 """
 
 import os
+import time
+import socket
 import logging
-from typing import Optional, Dict
+from typing import AsyncIterator, Awaitable, Callable, Optional, Dict, List, Tuple
 import fastapi_poe as fp
+from fastapi_poe.client import PROTOCOL_VERSION
 import uuid
 import asyncio
+import httpx
+from contextlib import aclosing
 from .base import BaseProvider
+from .cache import ResponseCache, make_cache_key
+from .concurrency import ConcurrencyGovernor
+from .context import current_trace
+from .errors import ProviderUnavailableError, is_retryable_error
+from .http import create_http_client, prewarm
+from .job_events import JobEventBus
+from .job_poller import FollowUpPoller
+from .job_store import COMPLETED, FAILED, PENDING, PROCESSING, JobRecord, JobStore
+from .parsing import AssetMatch, AssetScanner
+from .resilience import CircuitBreakerRegistry, RetryPolicy
+from .singleflight import SingleFlight
+from .tokens import StreamLimiter
+from .webhooks import WebhookDispatcher
+from .worker_pool import WorkerPool
 
 logger = logging.getLogger(__name__)
 
-# In-memory job storage for demo purposes
-# In production, use a database or Redis
-JOB_STORAGE: Dict[str, dict] = {}
+# Concurrency pool of video status checks, separate from the bot's render
+# slots (e.g. "Sora-2:followup"; limits via POE_CONCURRENCY_OVERRIDES)
+FOLLOWUP_SLOT_SUFFIX = ":followup"
+
+POE_BASE_URL = "https://api.poe.com/bot/"
 
 
 class PoeProvider(BaseProvider):
     """Poe AI provider for content generation"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        cache: Optional[ResponseCache] = None,
+        governor: Optional[ConcurrencyGovernor] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        breakers: Optional[CircuitBreakerRegistry] = None,
+        jobs: Optional[JobStore] = None,
+        webhooks: Optional[WebhookDispatcher] = None,
+    ):
         """Initialize Poe provider"""
         self.poe_api_key = os.getenv("POE_API_KEY")
         if not self.poe_api_key:
             logger.warning("POE_API_KEY not configured")
+        # Override to target a local stand-in (see devtools/fake_poe.py)
+        self.base_url = os.getenv("POE_BASE_URL", POE_BASE_URL)
+        if self.base_url != POE_BASE_URL:
+            logger.warning(f"Using non-default Poe endpoint: {self.base_url}")
+        self.cache = cache or ResponseCache.from_env()
+        self.single_flight = SingleFlight()
+        self.governor = governor or ConcurrencyGovernor.from_env()
+        self.retry_policy = retry_policy or RetryPolicy.from_env()
+        self.breakers = breakers or CircuitBreakerRegistry.from_env()
+        self.jobs = jobs or JobStore.from_env()
+        self.webhooks = webhooks or WebhookDispatcher.from_env()
+        # Unfinished jobs are leased to this process while it runs them; if it
+        # dies, another process claims the job once the lease lapses
+        self.owner_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.job_lease_seconds = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+        self.job_max_recoveries = int(os.getenv("JOB_MAX_RECOVERIES", "2"))
+        # Bounded workers shared fairly between tenants; also the registry of
+        # jobs this process holds leases on
+        self.video_pool = WorkerPool.from_env("video", self._run_video_job)
+        # Jobs left running upstream (Poe job id or status text only) are
+        # checked again with backoff until they finish or hit their deadline
+        self.video_followups = FollowUpPoller.from_env(
+            "video",
+            self.jobs,
+            check=self._check_video_job,
+            expire=self._expire_video_job,
+            owner=self.owner_id,
+        )
+        # Shared watchers for long-poll and SSE job status subscribers
+        self.job_events = JobEventBus(
+            self.jobs,
+            poll_interval=float(os.getenv("JOB_WATCH_INTERVAL_SECONDS", "1")),
+        )
+        self._job_maintenance: Optional[asyncio.Task] = None
+        # Per job id prefix: summarizes a tracked job that passed its deadline
+        self._tracked_job_expiry: Dict[str, Callable[[JobRecord], Awaitable[Tuple[Optional[dict], str]]]] = {}
+        # Shared pooled client, created in startup(); None falls back to a
+        # per-call client inside fastapi_poe
+        self.session: Optional[httpx.AsyncClient] = None
+    
+    async def startup(self) -> None:
+        """Create the pooled upstream client, pre-warm connections and start job workers (app lifespan)"""
+        self.jobs.start()
+        self.webhooks.start()
+        self.video_pool.start()
+        self.video_followups.start()
+        if self._job_maintenance is None:
+            self._job_maintenance = asyncio.create_task(self._job_maintenance_loop())
+        if self.session is None:
+            self.session = create_http_client()
+        await prewarm(
+            self.session,
+            self.base_url,
+            connections=int(os.getenv("POE_PREWARM_CONNECTIONS", "2")),
+        )
+    
+    async def aclose(self) -> None:
+        """Drain job workers, hand back unfinished jobs and close pooled connections (app lifespan)"""
+        # Keep renewing leases while running jobs get a chance to finish
+        unfinished = await self.video_pool.drain()
+        unfinished += await self.video_followups.close()
+        if self._job_maintenance is not None:
+            self._job_maintenance.cancel()
+            self._job_maintenance = None
+        if unfinished:
+            # Expire our leases now so another process resumes these jobs right away
+            try:
+                await self.jobs.renew_leases(unfinished, self.owner_id, 0)
+                logger.info(f"Handed back {len(unfinished)} unfinished video jobs")
+            except Exception as e:
+                logger.warning(f"Failed to hand back unfinished jobs: {str(e)}")
+        await self.job_events.close()
+        await self.webhooks.close()
+        await self.jobs.close()
+        if self.session is not None:
+            await self.session.aclose()
+            self.session = None
+        await self.cache.close()
+    
+    def get_stats(self) -> dict:
+        """Runtime counters for monitoring"""
+        return {
+            "cache": self.cache.stats(),
+            "single_flight": self.single_flight.stats(),
+            "concurrency": self.governor.stats(),
+            "circuit_breakers": self.breakers.stats(),
+            "jobs": self.jobs.stats(),
+            "job_events": self.job_events.stats(),
+            "video_pool": self.video_pool.stats(),
+            "video_followups": self.video_followups.stats(),
+            "webhooks": self.webhooks.stats(),
+        }
+    
+    async def _stream_bot(
+        self,
+        bot_name: str,
+        messages: List[fp.ProtocolMessage],
+        stop_sequences: Optional[List[str]] = None,
+        slot: Optional[str] = None,
+    ) -> AsyncIterator[fp.PartialResponse]:
+        """
+        Stream a bot response through the resilience and admission layers.
+        
+        All upstream calls go through here. Each attempt checks the bot's
+        circuit breaker, then holds a per-bot concurrency slot until the
+        stream is exhausted or closed. Transient errors are retried with
+        jittered exponential backoff, but only before the first partial has
+        been yielded (a half-delivered stream cannot be replayed).
+        
+        Args:
+            bot_name: Poe bot name (see _map_model_to_bot)
+            messages: Conversation to send
+            stop_sequences: Sequences the bot should stop generating at
+                (a hint; bots may ignore it)
+            slot: Concurrency pool to admit the call through (default: the
+                bot's own; see FOLLOWUP_SLOT_SUFFIX)
+        
+        Yields:
+            Partial responses from the bot
+        
+        Raises:
+            ProviderOverloadedError: If no upstream slot became available
+            CircuitOpenError: If the bot's circuit breaker is open
+        """
+        breaker = self.breakers.breaker(bot_name)
+        trace = current_trace()
+        
+        for attempt in range(self.retry_policy.max_attempts):
+            breaker.before_call()
+            yielded = False
+            healthy = None
+            try:
+                async with self.governor.slot(slot or bot_name):
+                    if trace is not None:
+                        trace.upstream_calls += 1
+                    # aclosing() closes the upstream HTTP stream as soon as the
+                    # consumer stops iterating, not when the generator is GC'd.
+                    # num_tries=1: this loop is the only retry layer, so one
+                    # attempt here is one upstream request inside the slot.
+                    async with aclosing(fp.stream_request(
+                        self._query(messages, stop_sequences),
+                        bot_name=bot_name,
+                        api_key=self.poe_api_key,
+                        num_tries=1,
+                        base_url=self.base_url,
+                        session=self.session,
+                    )) as upstream:
+                        async for partial in upstream:
+                            yielded = True
+                            yield partial
+                healthy = True
+                return
+            except GeneratorExit:
+                # Consumer stopped early (e.g. asset URL found, token limit hit)
+                healthy = True
+                raise
+            except ProviderUnavailableError:
+                raise
+            except Exception as e:
+                retryable = is_retryable_error(e)
+                # Non-transient errors still mean the bot answered
+                healthy = not retryable
+                if yielded or not retryable or attempt == self.retry_policy.max_attempts - 1:
+                    raise
+                delay = self.retry_policy.delay(attempt)
+                if trace is not None:
+                    trace.retries += 1
+                logger.warning(
+                    f"Transient error from {bot_name} (attempt {attempt + 1}), "
+                    f"retrying in {delay:.2f}s: {str(e)}"
+                )
+            finally:
+                if healthy is True:
+                    breaker.record_success()
+                elif healthy is False:
+                    breaker.record_failure()
+                else:
+                    breaker.release()
+            
+            await asyncio.sleep(delay)
     
     async def generate_text(
         self,
@@ -34,7 +243,10 @@ class PoeProvider(BaseProvider):
         system_prompt: Optional[str] = None,
         max_tokens: int = 2000,
         temperature: float = 0.7,
-        tenant_id: Optional[str] = None
+        tenant_id: Optional[str] = None,
+        use_cache: Optional[bool] = None,
+        variant: int = 0,
+        stop_sequences: Optional[List[str]] = None
     ) -> str:
         """
         Generate text via Poe API.
@@ -46,15 +258,112 @@ class PoeProvider(BaseProvider):
             max_tokens: Maximum tokens to generate
             temperature: Temperature for randomness
             tenant_id: Tenant ID for isolation
+            use_cache: True/False to force/bypass the response cache,
+                None to cache only deterministic (temperature 0) calls
+            variant: Index of one of several alternatives for the same
+                request; variants are never coalesced or cached together
+            stop_sequences: Text is cut before the first of these
         
         Returns:
             Generated text content
         
+        Raises:
+            Exception: If API call fails
+        """
+        async def collect() -> str:
+            # Collect chunks and join once instead of repeated string concatenation
+            chunks = []
+            async for chunk in self.stream_text(
+                prompt=prompt,
+                model=model,
+                system_prompt=system_prompt,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                tenant_id=tenant_id,
+                use_cache=use_cache,
+                variant=variant,
+                stop_sequences=stop_sequences,
+            ):
+                chunks.append(chunk)
+            return "".join(chunks)
+        
+        # Identical concurrent requests share one upstream call
+        flight_key = make_cache_key(
+            "text",
+            tenant_id,
+            model=model,
+            system_prompt=system_prompt,
+            prompt=prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **self._variant_fields(variant),
+            **self._stop_fields(stop_sequences),
+        )
+        return await self.single_flight.do(flight_key, collect)
+    
+    async def stream_text(
+        self,
+        prompt: str,
+        model: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 2000,
+        temperature: float = 0.7,
+        tenant_id: Optional[str] = None,
+        use_cache: Optional[bool] = None,
+        variant: int = 0,
+        stop_sequences: Optional[List[str]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream text via Poe API, yielding partials as they arrive.
+        
+        A cache hit is yielded as a single chunk. Completed responses are
+        stored in the cache when caching applies (see use_cache).
+        
+        max_tokens and stop_sequences are enforced locally as the text
+        arrives (see providers.tokens): output is cut at the limit and the
+        upstream stream is closed right away, which stops paying for and
+        waiting on tokens nobody will read. A stop sequence split across
+        partials is held back until it can be told apart from normal text.
+        
+        Args:
+            prompt: User prompt
+            model: Model to use (e.g., GPT-4o)
+            system_prompt: System prompt for context
+            max_tokens: Maximum tokens to generate
+            temperature: Temperature for randomness
+            tenant_id: Tenant ID for isolation
+            use_cache: True/False to force/bypass the response cache,
+                None to cache only deterministic (temperature 0) calls
+            variant: Index of one of several alternatives (see generate_text)
+            stop_sequences: Text is cut before the first of these
+        
+        Yields:
+            Text chunks in the order received from the bot, within limits
+        
         Raises:
             Exception: If API call fails
         """
         logger.info(f"Generating text for tenant {tenant_id} with model {model}")
         
+        cache_key = None
+        if self._should_cache(temperature, use_cache):
+            cache_key = make_cache_key(
+                "text",
+                tenant_id,
+                model=model,
+                system_prompt=system_prompt,
+                prompt=prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **self._variant_fields(variant),
+                **self._stop_fields(stop_sequences),
+            )
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Text cache hit for tenant {tenant_id}, length: {len(cached)}")
+                yield cached
+                return
+        
         try:
             # Build messages
             messages = []
@@ -65,17 +374,30 @@ class PoeProvider(BaseProvider):
             # Map model names to Poe bot names
             bot_name = self._map_model_to_bot(model)
             
-            # Collect full response
-            full_response = ""
-            async for partial in fp.get_bot_response(
-                messages=messages,
-                bot_name=bot_name,
-                api_key=self.poe_api_key
-            ):
-                full_response += partial.text
+            limiter = StreamLimiter(max_tokens, stop_sequences)
+            chunks = []
+            async with aclosing(self._stream_bot(bot_name, messages, stop_sequences)) as stream:
+                async for partial in stream:
+                    text = limiter.feed(partial.text) if partial.text else ""
+                    if text:
+                        chunks.append(text)
+                        yield text
+                    if limiter.finish_reason is not None:
+                        # Leaving the block closes the upstream stream now
+                        break
+            text = limiter.flush()
+            if text:
+                chunks.append(text)
+                yield text
+            
+            length = sum(len(chunk) for chunk in chunks)
+            logger.info(
+                f"Text generation successful for tenant {tenant_id}, length: {length}"
+                f"{f' (stopped early: {limiter.finish_reason})' if limiter.finish_reason else ''}"
+            )
             
-            logger.info(f"Text generation successful for tenant {tenant_id}, length: {len(full_response)}")
-            return full_response
+            if cache_key and length:
+                await self.cache.set(cache_key, "".join(chunks))
         
         except Exception as e:
             logger.error(f"Text generation failed for tenant {tenant_id}: {str(e)}")
@@ -87,7 +409,8 @@ class PoeProvider(BaseProvider):
         model: str,
         resolution: str = "1024x1024",
         style: Optional[str] = None,
-        tenant_id: Optional[str] = None
+        tenant_id: Optional[str] = None,
+        variant: int = 0
     ) -> str:
         """
         Generate image via Poe API.
@@ -98,6 +421,8 @@ class PoeProvider(BaseProvider):
             resolution: Image resolution
             style: Image style (vivid, natural)
             tenant_id: Tenant ID for isolation
+            variant: Index of one of several alternatives; variants are
+                never coalesced together
         
         Returns:
             Generated image URL
@@ -105,6 +430,30 @@ class PoeProvider(BaseProvider):
         Raises:
             Exception: If API call fails
         """
+        # Identical concurrent requests share one upstream call
+        flight_key = make_cache_key(
+            "image",
+            tenant_id,
+            model=model,
+            prompt=prompt,
+            resolution=resolution,
+            style=style,
+            **self._variant_fields(variant),
+        )
+        return await self.single_flight.do(
+            flight_key,
+            lambda: self._generate_image_upstream(prompt, model, resolution, style, tenant_id),
+        )
+    
+    async def _generate_image_upstream(
+        self,
+        prompt: str,
+        model: str,
+        resolution: str,
+        style: Optional[str],
+        tenant_id: Optional[str],
+    ) -> str:
+        """Call the image bot and extract the image URL (see generate_image)"""
         logger.info(f"Generating image for tenant {tenant_id} with model {model}")
         
         try:
@@ -118,25 +467,17 @@ class PoeProvider(BaseProvider):
             # Map model to Poe bot
             bot_name = self._map_model_to_bot(model)
             
-            # Generate image
+            # Generate image, stopping the stream as soon as the URL is complete
             message = fp.ProtocolMessage(role="user", content=enhanced_prompt)
-            full_response = ""
-            async for partial in fp.get_bot_response(
-                messages=[message],
-                bot_name=bot_name,
-                api_key=self.poe_api_key
-            ):
-                full_response += partial.text
+            scanner = AssetScanner()
+            match = await self._scan_bot_response(bot_name, [message], scanner)
             
-            # Extract image URL from response (Poe returns markdown with image)
-            # Format: ![image](url) or just the URL
-            import re
-            url_match = re.search(r'https?://[^\s\)]+', full_response)
-            if url_match:
-                image_url = url_match.group(0)
+            # Poe returns markdown with image: ![image](url) or just the URL
+            if match is not None and match.kind == AssetMatch.URL:
                 logger.info(f"Image generation successful for tenant {tenant_id}")
-                return image_url
+                return match.value
             else:
+                full_response = scanner.text
                 logger.warning(f"No image URL found in response: {full_response[:200]}")
                 return full_response  # Return full response if no URL found
         
@@ -150,13 +491,15 @@ class PoeProvider(BaseProvider):
         model: str,
         duration_seconds: int = 8,
         aspect_ratio: str = "16:9",
-        tenant_id: Optional[str] = None
+        tenant_id: Optional[str] = None,
+        plan: Optional[str] = None,
+        webhook_url: Optional[str] = None,
     ) -> str:
         """
         Generate video via Poe API (async, non-blocking).
         
-        Returns immediately with a job_id. The actual generation happens in background.
-        Use get_job_status(job_id) to poll for completion.
+        Returns immediately with a job_id. The job is queued for the video
+        worker pool; use get_job_status(job_id) to poll for completion.
         
         Args:
             prompt: Video description prompt
@@ -164,11 +507,14 @@ class PoeProvider(BaseProvider):
             duration_seconds: Video duration
             aspect_ratio: Video aspect ratio
             tenant_id: Tenant ID for isolation
+            plan: Tenant plan, used for the tenant's fair-share weight
+            webhook_url: Notified when the job completes or fails
         
         Returns:
             Job ID for async tracking
         
         Raises:
+            ProviderOverloadedError: If the video queue is full or shutting down
             Exception: If job submission fails
         """
         logger.info(f"Submitting video generation for tenant {tenant_id} with model {model}, duration={duration_seconds}s")
@@ -176,39 +522,178 @@ class PoeProvider(BaseProvider):
         # Generate unique job ID immediately
         job_id = f"vid_{uuid.uuid4().hex[:12]}"
         
-        # Store job metadata
-        JOB_STORAGE[job_id] = {
-            "status": "pending",
-            "model": model,
-            "prompt": prompt,
-            "duration_seconds": duration_seconds,
-            "aspect_ratio": aspect_ratio,
-            "tenant_id": tenant_id,
-            "result": None,
-            "error": None,
-        }
+        # Store job metadata; request parameters are kept only until the job
+        # finishes, so it can be resumed elsewhere if this process dies
+        record = JobRecord(
+            job_id=job_id,
+            tenant_id=tenant_id,
+            model=model,
+            request={
+                "prompt": prompt,
+                "duration_seconds": duration_seconds,
+                "aspect_ratio": aspect_ratio,
+                "plan": plan,
+            },
+            webhook_url=webhook_url,
+        )
+        record.owner = self.owner_id
+        record.lease_expires_at = time.time() + self.job_lease_seconds
+        await self.jobs.create(record)
         
-        # Submit actual generation as background task (don't await)
+        # Queue actual generation for a worker (don't await)
         # This allows us to return immediately without blocking
         try:
-            asyncio.create_task(
-                self._generate_video_background(
-                    job_id=job_id,
-                    prompt=prompt,
-                    model=model,
-                    duration_seconds=duration_seconds,
-                    aspect_ratio=aspect_ratio,
-                    tenant_id=tenant_id,
-                )
-            )
+            self.video_pool.submit(record)
             logger.info(f"Video generation job submitted: {job_id}")
             return job_id
         except Exception as e:
-            JOB_STORAGE[job_id]["status"] = "failed"
-            JOB_STORAGE[job_id]["error"] = str(e)
+            await self._set_job_status(job_id, FAILED, error=str(e))
             logger.error(f"Failed to submit video generation: {str(e)}")
             raise
     
+    async def create_tracked_job(
+        self,
+        prefix: str,
+        model: str,
+        tenant_id: Optional[str],
+        webhook_url: Optional[str] = None,
+        result: Optional[dict] = None,
+        deadline_seconds: Optional[float] = None,
+    ) -> str:
+        """
+        Create a processing job whose work runs outside this provider (e.g.
+        a Celery bulk job), so it can be polled and notified like video jobs.
+        
+        The job is never resumed by this process; finish it with
+        finish_job(). With deadline_seconds, it gets a lease that is never
+        renewed: once it lapses, whichever process claims the job marks it
+        failed (see on_tracked_job_expired), so work that never reports
+        back does not leave the job processing forever.
+        
+        Returns:
+            Job ID ("<prefix>_<hex>")
+        """
+        record = JobRecord(
+            job_id=f"{prefix}_{uuid.uuid4().hex[:12]}",
+            tenant_id=tenant_id,
+            model=model,
+            status=PROCESSING,
+            webhook_url=webhook_url,
+        )
+        record.result = result
+        if deadline_seconds is not None:
+            record.owner = self.owner_id
+            record.lease_expires_at = record.created_at + deadline_seconds
+        await self.jobs.create(record)
+        return record.job_id
+    
+    def on_tracked_job_expired(
+        self,
+        prefix: str,
+        summarize: Callable[[JobRecord], Awaitable[Tuple[Optional[dict], str]]],
+    ) -> None:
+        """
+        Register how tracked jobs with a prefix are summarized once they pass
+        their deadline; summarize(record) returns the (result, error) the job
+        is failed with.
+        """
+        self._tracked_job_expiry[prefix] = summarize
+    
+    async def _expire_tracked_job(self, record: JobRecord) -> None:
+        """Fail a tracked job whose deadline lease lapsed without finish_job()"""
+        result = record.result
+        error = "Job did not finish before its deadline"
+        summarize = self._tracked_job_expiry.get(record.job_id.partition("_")[0])
+        if summarize is not None:
+            try:
+                result, error = await summarize(record)
+            except Exception as e:
+                logger.warning(f"Could not summarize expired job {record.job_id}: {str(e)}")
+        logger.error(f"Tracked job {record.job_id} passed its deadline: {error}")
+        await self._set_job_status(record.job_id, FAILED, result=result, error=error)
+    
+    async def finish_job(self, job_id: str, result: Optional[dict] = None, error: Optional[str] = None) -> bool:
+        """Record the final status of a tracked job (failed if error is set) and send its webhook"""
+        status = FAILED if error else COMPLETED
+        return await self._set_job_status(job_id, status, result=result, error=error)
+    
+    async def _set_job_status(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[dict] = None,
+        error: Optional[str] = None,
+    ) -> bool:
+        """Persist a job transition, wake local subscribers and queue the job's webhook once it finishes"""
+        updated = await self.jobs.update(job_id, status, result=result, error=error)
+        self.job_events.notify(job_id)
+        if updated and status in (COMPLETED, FAILED):
+            await self._send_job_webhook(job_id)
+        return updated
+    
+    async def _send_job_webhook(self, job_id: str) -> None:
+        """Queue the final status of a job for its webhook, if it has one"""
+        try:
+            job = await self.jobs.get(job_id)
+            if job is None or not job.webhook_url:
+                return
+            event = self._job_status(job_id, job)
+            event["tenant_id"] = job.tenant_id
+            await self.webhooks.send(job.webhook_url, event)
+        except Exception as e:
+            # The job status is already stored; clients can still poll for it
+            logger.error(f"Failed to queue webhook for job {job_id}: {str(e)}")
+    
+    async def _run_video_job(self, record: JobRecord) -> None:
+        """Video pool runner: generate a leased job's video"""
+        await self._generate_video_background(
+            job_id=record.job_id,
+            prompt=record.request["prompt"],
+            model=record.model,
+            duration_seconds=record.request["duration_seconds"],
+            aspect_ratio=record.request["aspect_ratio"],
+            tenant_id=record.tenant_id,
+        )
+    
+    async def _job_maintenance_loop(self) -> None:
+        """Renew leases on jobs queued, running or followed up here and resume jobs orphaned by dead processes"""
+        while True:
+            try:
+                await self.jobs.renew_leases(
+                    self.video_pool.job_ids() + self.video_followups.job_ids(),
+                    self.owner_id,
+                    self.job_lease_seconds,
+                )
+                await self._recover_jobs()
+            except Exception as e:
+                logger.warning(f"Job maintenance failed: {str(e)}")
+            await asyncio.sleep(self.job_lease_seconds / 3)
+    
+    async def _recover_jobs(self) -> None:
+        """Claim unfinished jobs whose owner stopped renewing its lease and queue them here"""
+        capacity = self.video_pool.capacity()
+        if capacity <= 0:
+            return
+        for record in await self.jobs.claim_orphans(self.owner_id, self.job_lease_seconds, limit=min(capacity, 10)):
+            if record.job_id in self.video_pool or record.job_id in self.video_followups:
+                # Our own lease lapsed (e.g. a stalled loop); the job is still here
+                continue
+            if record.request is None:
+                # Tracked job (work runs elsewhere) whose deadline passed
+                await self._expire_tracked_job(record)
+                continue
+            if record.result and record.request:
+                # Already started upstream; keep checking on it rather than regenerating
+                logger.warning(f"Resuming follow-up of orphaned video job {record.job_id}")
+                self.video_followups.track(record)
+                continue
+            if record.recoveries > self.job_max_recoveries or not record.request:
+                logger.error(f"Giving up on interrupted video job {record.job_id} after {record.recoveries} recoveries")
+                await self._set_job_status(record.job_id, FAILED, error="Job was interrupted and could not be resumed")
+                continue
+            logger.warning(f"Resuming orphaned video job {record.job_id} (recovery {record.recoveries})")
+            self.video_pool.submit(record)
+    
     async def _generate_video_background(
         self,
         job_id: str,
@@ -224,120 +709,146 @@ class PoeProvider(BaseProvider):
         """
         try:
             logger.info(f"Starting background video generation for job {job_id}")
-            JOB_STORAGE[job_id]["status"] = "processing"
-            
-            # Build enhanced prompt with aspect ratio and duration
-            enhanced_prompt = f"{prompt}"
-            if aspect_ratio:
-                enhanced_prompt = f"{enhanced_prompt} (aspect ratio: {aspect_ratio})"
+            await self._set_job_status(job_id, PROCESSING)
             
             # Map model to Poe bot
             bot_name = self._map_model_to_bot(model)
+            message = self._video_message(prompt, duration_seconds, aspect_ratio)
             
-            # Create message with custom parameters for video generation
-            # Duration is passed via the parameters field as per Poe API docs
-            # IMPORTANT: OpenAI Sora requires duration as STRING literal ('4', '8', '12'), not integer
-            message = fp.ProtocolMessage(
-                role="user",
-                content=enhanced_prompt,
-                parameters={
-                    "duration": str(duration_seconds),  # Convert to string for API compatibility
-                    "aspect_ratio": aspect_ratio,
-                }
-            )
-            
-            # Call Poe API (this may take 60+ seconds)
-            full_response = ""
-            async for partial in fp.get_bot_response(
-                messages=[message],
-                bot_name=bot_name,
-                api_key=self.poe_api_key
-            ):
-                full_response += partial.text
+            # Call Poe API (this may take 60+ seconds); stop as soon as a
+            # video URL or upstream job id has been streamed
+            scanner = AssetScanner(detect_job_id=True)
+            match = await self._scan_bot_response(bot_name, [message], scanner)
+            full_response = scanner.text
             
             logger.info(f"Poe API response received for job {job_id}: {full_response[:100]}")
             
-            # Extract result from response
-            import re
-            
-            # Check for URL pattern (video services often return URLs directly)
-            url_match = re.search(r'https?://[^\s\)]+', full_response)
-            if url_match:
-                url = url_match.group(0)
+            # Video services often return URLs directly
+            if match is not None and match.kind == AssetMatch.URL:
+                url = match.value
                 logger.info(f"Video generated successfully for job {job_id}: {url}")
-                JOB_STORAGE[job_id]["status"] = "completed"
-                JOB_STORAGE[job_id]["result"] = {"video_url": url}
+                await self._set_job_status(job_id, COMPLETED, result={"video_url": url})
                 return
             
-            # Check for job ID in response
-            job_id_match = re.search(r'job[_-]?id["\']?\s*[:=]\s*["\']?([a-zA-Z0-9\-]+)["\']?', full_response, re.IGNORECASE)
-            if job_id_match:
-                poe_job_id = job_id_match.group(1)
+            # Job queued at Poe
+            if match is not None and match.kind == AssetMatch.JOB_ID:
+                poe_job_id = match.value
                 logger.info(f"Video job queued at Poe for job {job_id}: {poe_job_id}")
-                JOB_STORAGE[job_id]["status"] = "processing"
-                JOB_STORAGE[job_id]["result"] = {"poe_job_id": poe_job_id}
+                await self._set_job_status(job_id, PROCESSING, result={"poe_job_id": poe_job_id})
+                await self._follow_up(job_id)
                 return
             
             # If we got here, it's still processing (Poe returns "Generating..." status updates)
             logger.info(f"Video generation in progress for job {job_id}")
-            JOB_STORAGE[job_id]["status"] = "processing"
-            JOB_STORAGE[job_id]["result"] = {"status_text": full_response[:200]}
+            await self._set_job_status(job_id, PROCESSING, result={"status_text": full_response[:200]})
+            await self._follow_up(job_id)
             
         except Exception as e:
             logger.error(f"Background video generation failed for job {job_id}: {str(e)}")
-            JOB_STORAGE[job_id]["status"] = "failed"
-            JOB_STORAGE[job_id]["error"] = str(e)
+            await self._set_job_status(job_id, FAILED, error=str(e))
+    
+    def _video_message(self, prompt: str, duration_seconds: int, aspect_ratio: str) -> fp.ProtocolMessage:
+        """Build the upstream video request message"""
+        # Build enhanced prompt with aspect ratio and duration
+        enhanced_prompt = f"{prompt}"
+        if aspect_ratio:
+            enhanced_prompt = f"{enhanced_prompt} (aspect ratio: {aspect_ratio})"
+        
+        # Create message with custom parameters for video generation
+        # Duration is passed via the parameters field as per Poe API docs
+        # IMPORTANT: OpenAI Sora requires duration as STRING literal ('4', '8', '12'), not integer
+        return fp.ProtocolMessage(
+            role="user",
+            content=enhanced_prompt,
+            parameters={
+                "duration": str(duration_seconds),  # Convert to string for API compatibility
+                "aspect_ratio": aspect_ratio,
+            }
+        )
+    
+    async def _follow_up(self, job_id: str) -> None:
+        """Hand a job still running upstream to the follow-up poller (keeps its lease)"""
+        record = await self.jobs.get(job_id)
+        if record is not None and not record.is_terminal:
+            self.video_followups.track(record)
+    
+    async def _check_video_job(self, record: JobRecord) -> bool:
+        """
+        Ask the bot whether a job left running upstream has produced its video.
+        
+        Poe has no job status API, so the bot is asked in a plain text turn
+        and the reply is scanned for a video URL. The original prompt and
+        its generation parameters are never resent (that could start another
+        paid render), and the check is admitted through a separate
+        concurrency pool so it does not take one of the bot's few render
+        slots. The poller gives up after VIDEO_FOLLOWUP_MAX_ATTEMPTS checks.
+        
+        Returns:
+            True if the job was completed
+        """
+        result = record.result or {}
+        poe_job_id = result.get("poe_job_id")
+        if poe_job_id:
+            previous = f"Video queued. job_id: {poe_job_id}"
+            question = f"Is video job {poe_job_id} ready? Reply with the video URL once it has finished."
+        else:
+            previous = result.get("status_text") or "Generating..."
+            question = "Is the video ready? Reply with the video URL once it has finished."
+        messages = [
+            fp.ProtocolMessage(role="bot", content=previous),
+            fp.ProtocolMessage(role="user", content=question),
+        ]
+        
+        bot_name = self._map_model_to_bot(record.model)
+        match = await self._scan_bot_response(
+            bot_name,
+            messages,
+            AssetScanner(),
+            slot=f"{bot_name}{FOLLOWUP_SLOT_SUFFIX}",
+        )
+        if match is None or match.kind != AssetMatch.URL:
+            logger.debug(f"Video job {record.job_id} still running upstream")
+            return False
+        logger.info(f"Video generated successfully for job {record.job_id} (follow-up): {match.value}")
+        await self._set_job_status(record.job_id, COMPLETED, result={"video_url": match.value})
+        return True
+    
+    async def _expire_video_job(self, record: JobRecord) -> None:
+        """Fail a job that did not finish upstream before its deadline or follow-up limit"""
+        await self._set_job_status(
+            record.job_id,
+            FAILED,
+            error=(
+                f"Video generation did not finish within {self.video_followups.deadline:.0f}s "
+                f"or {self.video_followups.max_attempts} status checks"
+            ),
+        )
     
-    async def get_job_status(self, job_id: str) -> dict:
+    async def get_job_status(self, job_id: str, wait: Optional[float] = None) -> dict:
         """
         Get status of async generation job.
         
         Args:
             job_id: Job ID from generation request
+            wait: If set and the job is unfinished, wait up to this many
+                seconds for its next state transition (long-poll)
         
         Returns:
             Job status dict: {status, progress, result?, error?}
         """
-        logger.info(f"Checking status of job {job_id}")
-        
         try:
-            # Look up job in storage
-            if job_id not in JOB_STORAGE:
-                logger.warning(f"Job {job_id} not found in storage")
-                return {
-                    "status": "failed",
-                    "error": f"Job {job_id} not found",
-                    "job_id": job_id,
-                }
-            
-            job = JOB_STORAGE[job_id]
-            status = job["status"]
-            
-            # Map internal status to progress percentage
-            progress_map = {
-                "pending": 10,
-                "processing": 50,
-                "completed": 100,
-                "failed": 0,
-            }
-            progress = progress_map.get(status, 0)
-            
-            response = {
-                "status": status,
-                "progress": progress,
-                "job_id": job_id,
-            }
-            
-            # Add result if completed
-            if status == "completed" and job["result"]:
-                response["result"] = job["result"]
-            
-            # Add error if failed
-            if status == "failed" and job["error"]:
-                response["error"] = job["error"]
-            
-            logger.info(f"Job {job_id} status: {status} ({progress}%)")
-            return response
+            # Look up job in storage (finished jobs expire after JOB_TTL_SECONDS)
+            if wait:
+                async with self.job_events.subscribe(job_id) as subscription:
+                    job = await subscription.next()
+                    if job is not None and not job.is_terminal:
+                        try:
+                            job = await subscription.next(timeout=wait)
+                        except asyncio.TimeoutError:
+                            pass
+            else:
+                job = await self.jobs.get(job_id)
+            return self._job_status(job_id, job)
         
         except Exception as e:
             logger.error(f"Failed to get job status for {job_id}: {str(e)}")
@@ -347,6 +858,139 @@ class PoeProvider(BaseProvider):
                 "job_id": job_id,
             }
     
+    async def get_job_statuses(self, job_ids: List[str]) -> List[dict]:
+        """
+        Get the status of several jobs with a single job store round-trip.
+        
+        Args:
+            job_ids: Job IDs from generation requests
+        
+        Returns:
+            Job status dicts in job_ids order, each with the owning
+            "tenant_id" (None for unknown jobs) for access checks
+        """
+        jobs = await self.jobs.get_many(job_ids)
+        statuses = []
+        for job_id in job_ids:
+            job = jobs.get(job_id)
+            status_info = self._job_status(job_id, job)
+            status_info["tenant_id"] = job.tenant_id if job is not None else None
+            statuses.append(status_info)
+        return statuses
+    
+    async def watch_job(self, job_id: str, heartbeat: float = 15.0) -> AsyncIterator[Optional[dict]]:
+        """
+        Stream a job's status on every state transition until it finishes.
+        
+        Args:
+            job_id: Job ID from generation request
+            heartbeat: Seconds without a transition after which None is yielded
+        
+        Yields:
+            Job status dicts (first the current state), or None as a heartbeat
+        """
+        async with self.job_events.subscribe(job_id) as subscription:
+            job = await subscription.next()
+            while True:
+                yield self._job_status(job_id, job)
+                if job is None or job.is_terminal:
+                    return
+                while True:
+                    try:
+                        job = await subscription.next(timeout=heartbeat)
+                        break
+                    except asyncio.TimeoutError:
+                        yield None
+    
+    def _job_status(self, job_id: str, job: Optional[JobRecord]) -> dict:
+        """Build the status dict for a job record (None if not found)"""
+        if job is None:
+            logger.debug(f"Job {job_id} not found in storage")
+            return {
+                "status": "failed",
+                "error": f"Job {job_id} not found",
+                "job_id": job_id,
+            }
+        
+        status = job.status
+        
+        # Map internal status to progress percentage
+        progress_map = {
+            PENDING: 10,
+            PROCESSING: 50,
+            COMPLETED: 100,
+            FAILED: 0,
+        }
+        
+        response = {
+            "status": status,
+            "progress": progress_map.get(status, 0),
+            "job_id": job_id,
+        }
+        
+        # Add result if completed
+        if status == COMPLETED and job.result:
+            response["result"] = job.result
+        
+        # Add error if failed
+        if status == FAILED and job.error:
+            response["error"] = job.error
+        
+        return response
+    
+    async def _scan_bot_response(
+        self,
+        bot_name: str,
+        messages: List[fp.ProtocolMessage],
+        scanner: AssetScanner,
+        slot: Optional[str] = None,
+    ) -> Optional[AssetMatch]:
+        """
+        Feed a bot stream into scanner, closing the stream at the first match.
+        
+        Returns:
+            First complete AssetMatch, or None if the response contained none
+        """
+        async with aclosing(self._stream_bot(bot_name, messages, slot=slot)) as stream:
+            async for partial in stream:
+                match = scanner.feed(partial.text)
+                if match is not None:
+                    return match
+        return scanner.finish()
+    
+    def _query(
+        self,
+        messages: List[fp.ProtocolMessage],
+        stop_sequences: Optional[List[str]] = None,
+    ) -> fp.QueryRequest:
+        """Build the query fp.get_bot_response would send (it does not expose num_tries)"""
+        params = {"stop_sequences": stop_sequences} if stop_sequences is not None else {}
+        return fp.QueryRequest(
+            query=messages,
+            user_id="",
+            conversation_id="",
+            message_id="",
+            version=PROTOCOL_VERSION,
+            type="query",
+            **params,
+        )
+    
+    def _variant_fields(self, variant: int) -> dict:
+        """Key fields for a variant (variant 0 shares keys with plain requests)"""
+        return {"variant": variant} if variant else {}
+    
+    def _stop_fields(self, stop_sequences: Optional[List[str]]) -> dict:
+        """Key fields for stop sequences (none shares keys with plain requests)"""
+        return {"stop_sequences": list(stop_sequences)} if stop_sequences else {}
+    
+    def _should_cache(self, temperature: float, use_cache: Optional[bool]) -> bool:
+        """Decide whether a text call is served from / stored in the cache"""
+        if not self.cache.enabled or use_cache is False:
+            return False
+        if use_cache is True:
+            return True
+        return temperature == 0
+    
     def _map_model_to_bot(self, model: str) -> str:
         """
         Map generic model names to Poe bot names.
@@ -375,3 +1019,20 @@ class PoeProvider(BaseProvider):
         bot_name = model_map.get(model, "GPT-4o")  # Default to GPT-4o
         logger.debug(f"Mapped model '{model}' to bot '{bot_name}'")
         return bot_name
+
+
+
+_provider: Optional[PoeProvider] = None
+
+
+def get_provider() -> PoeProvider:
+    """
+    Get the process-wide provider instance.
+    
+    Routers share one provider so the connection pool, cache, concurrency
+    limits and circuit breakers are shared across endpoints.
+    """
+    global _provider
+    if _provider is None:
+        _provider = PoeProvider()
+    return _provider
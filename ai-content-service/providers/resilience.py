@@ -0,0 +1,156 @@
+"""
+Retry and circuit breaker policies for upstream Poe calls.
+Jittered exponential backoff for transient errors; per-bot breakers fail fast while a bot is unhealthy.
+"""
+
+import os
+import time
+import random
+import logging
+from typing import Dict
+
+from .errors import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        """
+        Build policy from environment.
+
+        POE_RETRY_MAX_ATTEMPTS: total attempts including the first (default 3)
+        POE_RETRY_BASE_DELAY_SECONDS: backoff base (default 0.5)
+        POE_RETRY_MAX_DELAY_SECONDS: backoff cap (default 8)
+        """
+        return cls(
+            max_attempts=int(os.getenv("POE_RETRY_MAX_ATTEMPTS", "3")),
+            base_delay=float(os.getenv("POE_RETRY_BASE_DELAY_SECONDS", "0.5")),
+            max_delay=float(os.getenv("POE_RETRY_MAX_DELAY_SECONDS", "8")),
+        )
+
+    def delay(self, attempt: int) -> float:
+        """Backoff before retry number `attempt` (0-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a single bot.
+
+    closed: calls pass; consecutive transient failures are counted.
+    open: calls fail fast with CircuitOpenError until reset_timeout elapses.
+    half_open: one probe call is let through; success closes the circuit,
+        failure re-opens it. Other calls keep failing fast meanwhile.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self.opens = 0
+        self.short_circuited = 0
+
+    def before_call(self) -> None:
+        """
+        Admit or reject a call.
+
+        Raises:
+            CircuitOpenError: If the circuit is open (or half-open with a probe running)
+        """
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.short_circuited += 1
+                raise CircuitOpenError(f"Circuit open for {self.name}, failing fast")
+            self.state = self.HALF_OPEN
+            logger.info(f"Circuit half-open for {self.name}, sending probe")
+
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self.short_circuited += 1
+                raise CircuitOpenError(f"Circuit half-open for {self.name}, probe in progress")
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        """Upstream answered; close the circuit"""
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit closed for {self.name}")
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Transient upstream failure; open the circuit past the threshold"""
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opens += 1
+                logger.warning(
+                    f"Circuit opened for {self.name} after {self.consecutive_failures} consecutive failures"
+                )
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def release(self) -> None:
+        """Call ended without a health signal (e.g. cancelled); free the probe slot"""
+        self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        """Breaker state for monitoring"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "opens": self.opens,
+            "short_circuited": self.short_circuited,
+        }
+
+
+class CircuitBreakerRegistry:
+    """Per-bot circuit breakers"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreakerRegistry":
+        """
+        Build registry from environment.
+
+        POE_BREAKER_FAILURE_THRESHOLD: consecutive failures to open (default 5)
+        POE_BREAKER_RESET_SECONDS: open duration before a probe (default 30)
+        """
+        return cls(
+            failure_threshold=int(os.getenv("POE_BREAKER_FAILURE_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("POE_BREAKER_RESET_SECONDS", "30")),
+        )
+
+    def breaker(self, bot_name: str) -> CircuitBreaker:
+        """Get (or lazily create) the breaker for a bot"""
+        breaker = self._breakers.get(bot_name)
+        if breaker is None:
+            breaker = CircuitBreaker(bot_name, self.failure_threshold, self.reset_timeout)
+            self._breakers[bot_name] = breaker
+        return breaker
+
+    def stats(self) -> dict:
+        """Per-bot breaker state"""
+        return {bot: breaker.stats() for bot, breaker in self._breakers.items()}
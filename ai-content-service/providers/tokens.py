@@ -0,0 +1,134 @@
+"""
+Local token counting and output limits for streamed generations.
+A heuristic tokenizer (no model files, no network) counts tokens as text
+arrives so max_tokens and stop sequences can end a stream early.
+"""
+
+import re
+from typing import List, Optional
+
+# Scripts written without spaces between words (CJK ideographs, kana,
+# Hangul, fullwidth forms); BPE tokenizers spend about one token per char
+_CJK = (
+    "\u1100-\u11ff\u2e80-\u2fdf\u3040-\u30ff\u3130-\u318f\u3400-\u4dbf"
+    "\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef\U00020000-\U0002fa1f"
+)
+# Single CJK chars, other words, single punctuation marks, and whitespace runs
+_PIECE = re.compile(rf"[{_CJK}]|[^\W{_CJK}]+|[^\w\s]|\s+")
+# BPE vocabularies hold most English words whole (with their leading
+# space), so a word costs one token up to this length and splits about
+# every this many characters beyond it
+WORD_CHARS_PER_TOKEN = 6
+# Longest trailing word held back for the next chunk; a longer word cut
+# at the boundary is miscounted by at most one token
+MAX_HELD_CHARS = 32
+_WORD_TAIL = re.compile(rf"[^\W{_CJK}]{{1,{MAX_HELD_CHARS}}}$")
+
+LENGTH = "length"
+STOP = "stop"
+
+
+def _piece_tokens(piece: str) -> float:
+    """
+    Tokens of one piece: whitespace is free, a CJK char or punctuation mark
+    is one, a word is one or its length over WORD_CHARS_PER_TOKEN. Fractional
+    so long words are not each rounded up; round only the total.
+    """
+    if piece.isspace():
+        return 0
+    return max(1, len(piece) / WORD_CHARS_PER_TOKEN)
+
+
+def count_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text.
+
+    Within about 10-15% of OpenAI-style BPE counts for English prose and
+    close for CJK text (one token per character); good enough for limits
+    and accounting, not for billing reconciliation. Count a whole text at
+    once: summing the counts of its chunks rounds each chunk separately.
+    """
+    return round(sum(_piece_tokens(piece) for piece in _PIECE.findall(text)))
+
+
+class StreamLimiter:
+    """
+    Applies max_tokens and stop sequences to a text stream, chunk by chunk.
+
+    feed() returns the part of each chunk that may be forwarded. Text that
+    could still turn out to be the start of a stop sequence, or a word cut
+    by the chunk boundary, is held back until the next chunk (or flush()).
+    Once a limit is hit `finish_reason` is set ("length" or "stop") and the
+    caller should stop reading upstream.
+    """
+
+    def __init__(self, max_tokens: Optional[int] = None, stop_sequences: Optional[List[str]] = None):
+        self.max_tokens = max_tokens
+        self.stop_sequences = [stop for stop in stop_sequences or [] if stop]
+        self.tokens = 0.0
+        self.finish_reason: Optional[str] = None
+        self._pending = ""
+
+    def feed(self, chunk: str) -> str:
+        """Add a chunk; returns the text to forward"""
+        if self.finish_reason is not None:
+            return ""
+        text = self._pending + chunk
+        self._pending = ""
+
+        stop_at = self._find_stop(text)
+        if stop_at is not None:
+            return self._settle(text[:stop_at], STOP)
+
+        held = self._held_back(text)
+        if held:
+            text, self._pending = text[:-held], text[-held:]
+        return self._settle(text, None)
+
+    def flush(self) -> str:
+        """End of stream: returns the held-back text that is within limits"""
+        if self.finish_reason is not None:
+            return ""
+        text, self._pending = self._pending, ""
+        return self._settle(text, None)
+
+    def _find_stop(self, text: str) -> Optional[int]:
+        positions = [text.find(stop) for stop in self.stop_sequences]
+        positions = [position for position in positions if position >= 0]
+        return min(positions) if positions else None
+
+    def _held_back(self, text: str) -> int:
+        """Length of the suffix that must wait for the next chunk"""
+        held = 0
+        for stop in self.stop_sequences:
+            # Longest suffix of text that is a proper prefix of the stop sequence
+            for size in range(min(len(stop) - 1, len(text)), held, -1):
+                if stop.startswith(text[-size:]):
+                    held = size
+                    break
+        if self.max_tokens is not None:
+            # A word cut by the chunk boundary would be counted as two.
+            # CJK chars count alone, so they never need to wait
+            word = _WORD_TAIL.search(text)
+            if word is not None:
+                held = max(held, len(word.group()))
+        return held
+
+    def _settle(self, text: str, reason: Optional[str]) -> str:
+        """Count text into the budget, cutting it at the token limit"""
+        if self.max_tokens is None:
+            self.finish_reason = reason
+            return text
+        kept = []
+        for piece in _PIECE.findall(text):
+            tokens = _piece_tokens(piece)
+            if round(self.tokens + tokens) > self.max_tokens:
+                self.finish_reason = LENGTH
+                return "".join(kept)
+            self.tokens += tokens
+            kept.append(piece)
+        if round(self.tokens) >= self.max_tokens and reason is None:
+            self.finish_reason = LENGTH
+        else:
+            self.finish_reason = reason
+        return "".join(kept)
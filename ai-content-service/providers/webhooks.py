@@ -0,0 +1,383 @@
+"""
+Webhook delivery for job results.
+Events are written to a persistent SQLite outbox and delivered by an async
+dispatcher: pooled client, per-destination concurrency limit, optional
+batching of events per POST, exponential retry and HMAC-SHA256 signatures.
+"""
+
+import os
+import hmac
+import json
+import time
+import uuid
+import random
+import sqlite3
+import hashlib
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# 4xx statuses worth retrying (other 4xx will not succeed on retry)
+_RETRYABLE_STATUS = frozenset((408, 425, 429))
+
+
+def sign_payload(secret: str, timestamp: str, body: bytes) -> str:
+    """HMAC-SHA256 of "<timestamp>.<body>", hex encoded"""
+    message = timestamp.encode() + b"." + body
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+class WebhookOutbox:
+    """
+    Persistent queue of undelivered webhook events.
+
+    Safe to share between processes on one host (API workers and Celery
+    workers): due rows are claimed for `claim_seconds` under BEGIN IMMEDIATE,
+    so only one dispatcher sends them. A claimed row that is neither deleted
+    nor rescheduled (dispatcher died) becomes due again when the claim lapses.
+    The file is opened on first use (or open()), not on construction.
+    Methods are synchronous; async callers run them in a thread.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS webhook_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT NOT NULL,
+            event TEXT NOT NULL,
+            event_id TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            created_at REAL NOT NULL,
+            last_error TEXT,
+            dead INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS webhook_outbox_due ON webhook_outbox (dead, next_attempt_at);
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def open(self) -> sqlite3.Connection:
+        """Open the outbox file and create the schema, once"""
+        with self._open_lock:
+            if self._conn is None:
+                conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(self.SCHEMA)
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(webhook_outbox)")}
+                if "event_id" not in columns:
+                    # Outbox files created before events had a stable id
+                    conn.execute("ALTER TABLE webhook_outbox ADD COLUMN event_id TEXT")
+                self._conn = conn
+            return self._conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self.open()
+        with self._lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def add(self, url: str, event: dict) -> int:
+        """Queue an event for url with a new event id, kept across retries; returns its outbox id"""
+        now = time.time()
+        conn = self.open()
+        with self._lock:
+            cursor = conn.execute(
+                "INSERT INTO webhook_outbox (url, event, event_id, next_attempt_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                (url, json.dumps(event), uuid.uuid4().hex, now, now),
+            )
+        return cursor.lastrowid
+
+    def claim_due(self, limit: int, claim_seconds: float) -> List[Tuple[int, str, dict, str, int]]:
+        """
+        Claim up to limit due events, oldest first.
+
+        Returns:
+            (id, url, event, event_id, attempts) tuples
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT id, url, event, event_id, attempts FROM webhook_outbox "
+                "WHERE dead = 0 AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            if rows:
+                placeholders = ",".join("?" * len(rows))
+                conn.execute(
+                    f"UPDATE webhook_outbox SET next_attempt_at = ? WHERE id IN ({placeholders})",
+                    (now + claim_seconds, *(row[0] for row in rows)),
+                )
+        return [
+            (row_id, url, json.loads(event), event_id or f"outbox-{row_id}", attempts)
+            for row_id, url, event, event_id, attempts in rows
+        ]
+
+    def delete(self, ids: List[int]) -> None:
+        """Remove delivered events"""
+        placeholders = ",".join("?" * len(ids))
+        conn = self.open()
+        with self._lock:
+            conn.execute(f"DELETE FROM webhook_outbox WHERE id IN ({placeholders})", ids)
+
+    def reschedule(self, ids: List[int], next_attempt_at: float, error: str) -> None:
+        """Record a failed attempt and set the next one"""
+        placeholders = ",".join("?" * len(ids))
+        conn = self.open()
+        with self._lock:
+            conn.execute(
+                f"UPDATE webhook_outbox SET attempts = attempts + 1, next_attempt_at = ?, last_error = ? "
+                f"WHERE id IN ({placeholders})",
+                (next_attempt_at, error, *ids),
+            )
+
+    def bury(self, ids: List[int], error: str) -> None:
+        """Stop retrying events (kept for inspection)"""
+        placeholders = ",".join("?" * len(ids))
+        conn = self.open()
+        with self._lock:
+            conn.execute(
+                f"UPDATE webhook_outbox SET attempts = attempts + 1, dead = 1, last_error = ? "
+                f"WHERE id IN ({placeholders})",
+                (error, *ids),
+            )
+
+    def close(self) -> None:
+        with self._open_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class WebhookDispatcher:
+    """
+    Delivers outbox events over a shared keep-alive client.
+
+    Events for the same URL that are due together are sent as one POST of
+    `{"events": [...]}` when batching is enabled (batch_size > 1); otherwise
+    each event is POSTed as-is. At most `max_per_destination` POSTs are in
+    flight per host. Network errors, 5xx, 408, 425 and 429 are retried with
+    exponential backoff up to `max_attempts`; other 4xx are not retried.
+
+    Every POST carries X-Webhook-Id, X-Webhook-Timestamp and, when a secret
+    is configured, X-Webhook-Signature: sha256=HMAC(secret, "<timestamp>.<body>").
+    X-Webhook-Id is the event's id from the outbox, the same on every retry;
+    a batch also lists its events' ids in X-Webhook-Event-Ids and is
+    identified by a hash of them.
+    """
+
+    def __init__(
+        self,
+        outbox: WebhookOutbox,
+        secret: Optional[str] = None,
+        max_per_destination: int = 4,
+        batch_size: int = 1,
+        batch_window: float = 0.2,
+        max_attempts: int = 8,
+        base_delay: float = 5.0,
+        max_delay: float = 600.0,
+        timeout: float = 10.0,
+        poll_interval: float = 5.0,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.outbox = outbox
+        self.secret = secret
+        self.max_per_destination = max_per_destination
+        self.batch_size = max(1, batch_size)
+        self.batch_window = batch_window
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.client = client
+        self._owns_client = client is None
+        self._destinations: Dict[str, asyncio.Semaphore] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.posts = 0
+        self.delivered = 0
+        self.retried = 0
+        self.dead = 0
+        if not secret:
+            logger.warning("WEBHOOK_SECRET not configured, webhooks will be sent unsigned")
+
+    @classmethod
+    def from_env(cls) -> "WebhookDispatcher":
+        """
+        Build dispatcher from environment.
+
+        WEBHOOK_OUTBOX_PATH: SQLite outbox file opened in start(), shared by processes using the same path (default webhooks.db)
+        WEBHOOK_SECRET: HMAC signing secret (unsigned if unset)
+        WEBHOOK_MAX_PER_DESTINATION: concurrent POSTs per host (default 4)
+        WEBHOOK_BATCH_SIZE: max events per POST, 1 disables batching (default 1)
+        WEBHOOK_BATCH_WINDOW_SECONDS: wait for more events before sending (default 0.2)
+        WEBHOOK_MAX_ATTEMPTS: attempts before an event is given up (default 8)
+        WEBHOOK_RETRY_BASE_DELAY_SECONDS: first retry delay, doubled per attempt (default 5)
+        WEBHOOK_RETRY_MAX_DELAY_SECONDS: retry delay cap (default 600)
+        WEBHOOK_TIMEOUT_SECONDS: per-POST timeout (default 10)
+        WEBHOOK_POLL_INTERVAL_SECONDS: outbox scan for events queued by other processes (default 5)
+        """
+        return cls(
+            WebhookOutbox(os.getenv("WEBHOOK_OUTBOX_PATH", "webhooks.db")),
+            secret=os.getenv("WEBHOOK_SECRET") or None,
+            max_per_destination=int(os.getenv("WEBHOOK_MAX_PER_DESTINATION", "4")),
+            batch_size=int(os.getenv("WEBHOOK_BATCH_SIZE", "1")),
+            batch_window=float(os.getenv("WEBHOOK_BATCH_WINDOW_SECONDS", "0.2")),
+            max_attempts=int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "8")),
+            base_delay=float(os.getenv("WEBHOOK_RETRY_BASE_DELAY_SECONDS", "5")),
+            max_delay=float(os.getenv("WEBHOOK_RETRY_MAX_DELAY_SECONDS", "600")),
+            timeout=float(os.getenv("WEBHOOK_TIMEOUT_SECONDS", "10")),
+            poll_interval=float(os.getenv("WEBHOOK_POLL_INTERVAL_SECONDS", "5")),
+        )
+
+    async def send(self, url: str, event: dict) -> None:
+        """Queue an event for delivery (persisted before returning)"""
+        await asyncio.to_thread(self.outbox.add, url, event)
+        self.enqueued += 1
+        self._wake.set()
+
+    def start(self) -> None:
+        """Open the outbox, create the pooled client and start delivering (app lifespan)"""
+        self.outbox.open()
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_keepalive_connections=self.max_per_destination * 4),
+            )
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop delivering; undelivered events stay in the outbox"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.client is not None and self._owns_client:
+            await self.client.aclose()
+            self.client = None
+        self.outbox.close()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                # Let events finishing together land in the same batch
+                await asyncio.sleep(self.batch_window)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                while await self.deliver_due() > 0:
+                    pass
+            except Exception as e:
+                logger.warning(f"Webhook delivery pass failed: {str(e)}")
+
+    async def deliver_due(self, limit: int = 200) -> int:
+        """
+        Claim due events and deliver them, grouped by destination.
+
+        Returns:
+            Number of events claimed (limit means more may be due)
+        """
+        # Claimed rows reappear if this process dies before finishing them
+        claim_seconds = self.timeout * 2 + 30
+        rows = await asyncio.to_thread(self.outbox.claim_due, limit, claim_seconds)
+        by_url: Dict[str, List[Tuple[int, dict, str, int]]] = defaultdict(list)
+        for row_id, url, event, event_id, attempts in rows:
+            by_url[url].append((row_id, event, event_id, attempts))
+
+        posts = []
+        for url, events in by_url.items():
+            for start in range(0, len(events), self.batch_size):
+                posts.append(self._post(url, events[start:start + self.batch_size]))
+        await asyncio.gather(*posts)
+        return len(rows) if len(rows) >= limit else 0
+
+    def _semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        semaphore = self._destinations.get(host)
+        if semaphore is None:
+            semaphore = self._destinations[host] = asyncio.Semaphore(self.max_per_destination)
+        return semaphore
+
+    def _headers(self, body: bytes, event_ids: List[str]) -> Dict[str, str]:
+        timestamp = str(int(time.time()))
+        headers = {
+            "Content-Type": "application/json",
+            "X-Webhook-Timestamp": timestamp,
+        }
+        if self.batch_size > 1:
+            headers["X-Webhook-Id"] = hashlib.sha256(",".join(event_ids).encode()).hexdigest()[:32]
+            headers["X-Webhook-Event-Ids"] = ",".join(event_ids)
+        else:
+            headers["X-Webhook-Id"] = event_ids[0]
+        if self.secret:
+            headers["X-Webhook-Signature"] = f"sha256={sign_payload(self.secret, timestamp, body)}"
+        return headers
+
+    async def _post(self, url: str, events: List[Tuple[int, dict, str, int]]) -> None:
+        ids = [row_id for row_id, _, _, _ in events]
+        event_ids = [event_id for _, _, event_id, _ in events]
+        if self.batch_size > 1:
+            payload = {"events": [event for _, event, _, _ in events]}
+        else:
+            payload = events[0][1]
+        body = json.dumps(payload).encode()
+
+        retryable = True
+        async with self._semaphore(url):
+            self.posts += 1
+            try:
+                response = await self.client.post(url, content=body, headers=self._headers(body, event_ids))
+                if response.is_success:
+                    await asyncio.to_thread(self.outbox.delete, ids)
+                    self.delivered += len(ids)
+                    logger.info(f"Delivered {len(ids)} webhook event(s) to {url}")
+                    return
+                error = f"HTTP {response.status_code}"
+                retryable = response.status_code >= 500 or response.status_code in _RETRYABLE_STATUS
+            except httpx.HTTPError as e:
+                error = f"{type(e).__name__}: {str(e)}"
+
+        # Events in one POST share a fate; back off by the most-tried one
+        attempts = max(attempts for _, _, _, attempts in events) + 1
+        if not retryable or attempts >= self.max_attempts:
+            self.dead += len(ids)
+            logger.error(f"Giving up on {len(ids)} webhook event(s) to {url} after {attempts} attempts: {error}")
+            await asyncio.to_thread(self.outbox.bury, ids, error)
+            return
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1))) * random.uniform(0.8, 1.2)
+        self.retried += len(ids)
+        logger.warning(f"Webhook to {url} failed ({error}), retrying {len(ids)} event(s) in {delay:.1f}s")
+        await asyncio.to_thread(self.outbox.reschedule, ids, time.time() + delay, error)
+
+    def stats(self) -> dict:
+        """Delivery counters for monitoring"""
+        return {
+            "enqueued": self.enqueued,
+            "posts": self.posts,
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "dead": self.dead,
+            "destinations": len(self._destinations),
+        }
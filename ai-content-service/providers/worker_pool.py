@@ -0,0 +1,273 @@
+"""
+Supervised in-process worker pool for background generation jobs.
+Per-tenant queues served by weighted deficit round-robin with per-tenant
+in-flight caps, fixed worker count, task registry and graceful drain.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from .errors import ProviderOverloadedError
+from .fairness import TenantWeights
+from .job_store import JobRecord
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerPool:
+    """
+    Fixed number of workers fairly sharing queued jobs between tenants.
+
+    Each tenant has a FIFO queue. Free workers visit tenants with queued
+    jobs in round-robin order (deficit round-robin): on each visit a tenant
+    earns its weight in credit and starts one job per unit of credit, so
+    under contention tenants get throughput proportional to their weight
+    (plan or per-tenant override) no matter how many jobs they queued.
+    A tenant never has more than `max_in_flight_per_tenant` jobs running.
+
+    Every queued and running job is tracked so its lease can be renewed and
+    so drain() knows what to hand back. Workers that die unexpectedly are
+    restarted.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        runner: Callable[[JobRecord], Awaitable[None]],
+        workers: int = 4,
+        max_queue: int = 1000,
+        drain_timeout: float = 25.0,
+        weights: Optional[TenantWeights] = None,
+        max_in_flight_per_tenant: int = 0,
+    ):
+        self.name = name
+        self.runner = runner
+        self.workers = workers
+        self.max_queue = max_queue
+        self.drain_timeout = drain_timeout
+        self.weights = weights or TenantWeights()
+        # 0 disables the cap
+        self.max_in_flight_per_tenant = max_in_flight_per_tenant
+        self._tenant_queues: Dict[Optional[str], Deque[Tuple[float, JobRecord]]] = {}
+        # Tenants with queued jobs, in visiting order
+        self._round: Deque[Optional[str]] = deque()
+        self._deficit: Dict[Optional[str], float] = {}
+        self._in_flight: Dict[Optional[str], int] = {}
+        self._wakeup = asyncio.Event()
+        self._queued: Dict[str, JobRecord] = {}
+        self._running: Dict[str, float] = {}
+        self._workers: List[asyncio.Task] = []
+        self._accepting = True
+        self._stopping = False
+        self.submitted = 0
+        self.started = 0
+        self.rejected = 0
+        self.completed = 0
+        self.crashed = 0
+        self.restarts = 0
+        self.total_wait = 0.0
+
+    @classmethod
+    def from_env(cls, name: str, runner: Callable[[JobRecord], Awaitable[None]]) -> "WorkerPool":
+        """
+        Build pool from environment.
+
+        VIDEO_WORKERS: concurrent jobs per process (default 4)
+        VIDEO_QUEUE_MAX: queued jobs before submissions are rejected (default 1000)
+        VIDEO_DRAIN_TIMEOUT_SECONDS: shutdown wait for running jobs (default 25)
+        VIDEO_TENANT_MAX_IN_FLIGHT: running jobs per tenant, 0 for no cap
+            (default half the workers)
+        VIDEO_PLAN_WEIGHTS / VIDEO_TENANT_WEIGHTS / VIDEO_DEFAULT_WEIGHT:
+            fair-share weights (see TenantWeights.from_env)
+        """
+        workers = int(os.getenv("VIDEO_WORKERS", "4"))
+        return cls(
+            name=name,
+            runner=runner,
+            workers=workers,
+            max_queue=int(os.getenv("VIDEO_QUEUE_MAX", "1000")),
+            drain_timeout=float(os.getenv("VIDEO_DRAIN_TIMEOUT_SECONDS", "25")),
+            weights=TenantWeights.from_env("VIDEO"),
+            max_in_flight_per_tenant=int(os.getenv("VIDEO_TENANT_MAX_IN_FLIGHT", str(max(1, workers // 2)))),
+        )
+
+    def submit(self, record: JobRecord) -> None:
+        """
+        Queue a job for a worker.
+
+        Raises:
+            ProviderOverloadedError: If the pool is draining or the queue is full
+        """
+        if not self._accepting:
+            self.rejected += 1
+            raise ProviderOverloadedError(f"{self.name} pool is shutting down")
+        if len(self._queued) >= self.max_queue:
+            self.rejected += 1
+            raise ProviderOverloadedError(f"{self.name} queue is full ({self.max_queue} jobs)")
+        tenant = record.tenant_id
+        queue = self._tenant_queues.get(tenant)
+        if queue is None:
+            queue = self._tenant_queues[tenant] = deque()
+            self._round.append(tenant)
+            self._deficit[tenant] = 0.0
+        queue.append((time.monotonic(), record))
+        self._queued[record.job_id] = record
+        self.submitted += 1
+        self._wakeup.set()
+
+    def capacity(self) -> int:
+        """Jobs that can still be queued (0 while draining)"""
+        return self.max_queue - len(self._queued) if self._accepting else 0
+
+    def job_ids(self) -> List[str]:
+        """Jobs queued or running in this pool"""
+        return [*self._queued, *self._running]
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._queued or job_id in self._running
+
+    def start(self) -> None:
+        """Start the workers (app lifespan)"""
+        while len(self._workers) < self.workers:
+            self._spawn()
+
+    def _spawn(self) -> None:
+        task = asyncio.create_task(self._work())
+        task.add_done_callback(self._supervise)
+        self._workers.append(task)
+
+    def _supervise(self, task: asyncio.Task) -> None:
+        """Replace a worker that exited unexpectedly"""
+        if task in self._workers:
+            self._workers.remove(task)
+        if self._stopping or task.cancelled():
+            return
+        self.restarts += 1
+        logger.error(f"{self.name} worker exited unexpectedly ({task.exception()!r}), restarting")
+        self._spawn()
+
+    def _capped(self, tenant: Optional[str]) -> bool:
+        cap = self.max_in_flight_per_tenant
+        return cap > 0 and self._in_flight.get(tenant, 0) >= cap
+
+    def _next(self) -> Optional[Tuple[float, JobRecord]]:
+        """Pick the next job by deficit round-robin (None if nothing is runnable)"""
+        skipped = 0
+        while self._round and skipped < len(self._round):
+            tenant = self._round[0]
+            if self._capped(tenant):
+                # Capped tenants don't bank credit while they wait
+                self._round.rotate(-1)
+                skipped += 1
+                continue
+            if self._deficit[tenant] < 1:
+                self._deficit[tenant] += self.weights.weight_for(tenant, self._plan(tenant))
+                if self._deficit[tenant] < 1:
+                    # Weight below 1: served every few rounds
+                    self._round.rotate(-1)
+                    continue
+            self._deficit[tenant] -= 1
+            queue = self._tenant_queues[tenant]
+            item = queue.popleft()
+            if not queue:
+                self._round.popleft()
+                del self._tenant_queues[tenant]
+                del self._deficit[tenant]
+            elif self._deficit[tenant] < 1:
+                self._round.rotate(-1)
+            return item
+        return None
+
+    def _plan(self, tenant: Optional[str]) -> Optional[str]:
+        """Plan of a tenant's oldest queued job"""
+        _, record = self._tenant_queues[tenant][0]
+        return (record.request or {}).get("plan")
+
+    async def _work(self) -> None:
+        while True:
+            item = self._next()
+            if item is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            enqueued_at, record = item
+            if self._queued.pop(record.job_id, None) is None:
+                # Handed back during drain
+                continue
+            tenant = record.tenant_id
+            self._in_flight[tenant] = self._in_flight.get(tenant, 0) + 1
+            self.started += 1
+            self.total_wait += time.monotonic() - enqueued_at
+            self._running[record.job_id] = time.monotonic()
+            try:
+                await self.runner(record)
+                self.completed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # The runner records job failures itself; this is a bug guard
+                self.crashed += 1
+                logger.error(f"{self.name} job {record.job_id} crashed: {str(e)}")
+            finally:
+                self._running.pop(record.job_id, None)
+                self._in_flight[tenant] -= 1
+                if not self._in_flight[tenant]:
+                    del self._in_flight[tenant]
+                # A freed tenant slot may make a capped tenant runnable
+                self._wakeup.set()
+
+    async def drain(self, timeout: Optional[float] = None) -> List[str]:
+        """
+        Stop accepting jobs, let running jobs finish, then stop the workers.
+
+        Queued jobs are released immediately; running jobs get up to
+        `timeout` (default drain_timeout) seconds before being cancelled.
+
+        Returns:
+            IDs of jobs that were not finished here (to be re-queued elsewhere)
+        """
+        self._accepting = False
+        unfinished = list(self._queued)
+        self._queued.clear()
+        self._tenant_queues.clear()
+        self._round.clear()
+        self._deficit.clear()
+
+        timeout = self.drain_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while self._running and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+
+        interrupted = list(self._running)
+        if interrupted:
+            logger.warning(f"{self.name} drain timed out, interrupting {len(interrupted)} running jobs")
+        unfinished.extend(interrupted)
+
+        self._stopping = True
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        return unfinished
+
+    def stats(self) -> dict:
+        """Pool counters for monitoring"""
+        return {
+            "workers": len(self._workers),
+            "queued": len(self._queued),
+            "running": len(self._running),
+            "queued_tenants": len(self._round),
+            "running_tenants": len(self._in_flight),
+            "accepting": self._accepting,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "crashed": self.crashed,
+            "restarts": self.restarts,
+            "started": self.started,
+            "avg_queue_wait_ms": round(self.total_wait / self.started * 1000, 1) if self.started else 0.0,
+        }
@@ -0,0 +1,206 @@
+"""
+Bulk generation routes for AI content service.
+Handles POST /v1/generate/bulk, which fans campaign assets out to the Celery
+worker tier under one parent job, and GET /v1/generate/bulk/{job_id} for
+aggregate progress.
+"""
+
+import asyncio
+import os
+from fastapi import APIRouter, HTTPException, Query, Request
+import logging
+from models.requests import BulkGenerationItem, BulkGenerationRequest
+from models.responses import BulkGenerationResponse, BulkJobStatusResponse, ErrorResponse
+from providers.poe_provider import get_provider
+from middleware.tenant_isolation import enforce_tenant_isolation, get_tenant_plan, validate_tenant_access
+from routes.videos import validate_video_duration
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/v1", tags=["bulk"])
+provider = get_provider()
+
+BULK_JOB_PREFIX = "bulk"
+# A bulk job whose chord callback has not arrived by then is marked failed
+BULK_JOB_DEADLINE_SECONDS = float(os.getenv("BULK_JOB_DEADLINE_SECONDS", "7200"))
+
+try:
+    # Also registers the summary of bulk jobs that pass their deadline
+    import tasks.generation_tasks  # noqa: F401
+except ImportError:
+    # Without Celery, POST /v1/generate/bulk answers 503
+    pass
+
+
+def build_task_request(item: BulkGenerationItem, tenant_id: str, plan: str = None) -> dict:
+    """Map a bulk item to its Celery task's request_data"""
+    request_data = {
+        "prompt": item.prompt,
+        "model": item.model,
+        "tenant_id": tenant_id,
+        # Fair-share weight on the worker tier
+        "plan": plan,
+    }
+    if item.type == "text":
+        request_data.update(
+            system_prompt_type=item.system_prompt_type,
+            max_tokens=item.max_tokens,
+            temperature=item.temperature,
+        )
+    elif item.type == "image":
+        request_data.update(resolution=item.resolution, style=item.style)
+    else:
+        request_data.update(
+            duration_seconds=validate_video_duration(item.model, item.duration_seconds),
+            aspect_ratio=item.aspect_ratio,
+        )
+    return {"type": item.type, "request": request_data}
+
+
+@router.post(
+    "/generate/bulk",
+    response_model=BulkGenerationResponse,
+    responses={
+        401: {"model": ErrorResponse},
+        422: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
+    }
+)
+async def generate_bulk(request: BulkGenerationRequest, http_request: Request):
+    """
+    Generate up to MAX_BULK_ITEMS text, image and video assets as one job.
+
+    Items are enqueued as a Celery chord of generate_text_async /
+    generate_image_async (images queue) and generate_video_async (video
+    queue) tasks, so the worker tier parallelizes and throttles them and
+    shares its capacity fairly with other tenants' work. Failed
+    items are retried, then reported per item; they do not fail the job.
+    When every item has finished, the job completes and webhook_url (if set)
+    receives one event with all item results. If that has not happened
+    within BULK_JOB_DEADLINE_SECONDS (e.g. a task was killed), the job is
+    failed with the number of items that did complete.
+
+    The workers record the result in the job store, so it must be shared
+    (JOB_STORE sqlite, redis or mongo); with the in-process memory store
+    the request is refused with 503.
+
+    Example:
+        POST /v1/generate/bulk
+        {
+            "items": [
+                {"type": "text", "prompt": "Launch tweet", "model": "gpt-4o", "system_prompt_type": "social-post"},
+                {"type": "image", "prompt": "Hero banner", "model": "dall-e-3"},
+                {"type": "video", "prompt": "Product teaser", "model": "sora-2", "duration_seconds": 8}
+            ],
+            "tenant_id": "tenant_123",
+            "webhook_url": "https://myapp.com/webhooks/campaign-complete"
+        }
+
+    Returns:
+        BulkGenerationResponse with the bulk job_id; track it with
+        GET /v1/generate/bulk/{job_id} or the /v1/jobs endpoints
+    """
+    await validate_tenant_access(http_request, request.tenant_id)
+
+    try:
+        from tasks.generation_tasks import dispatch_bulk_job
+    except ImportError as e:
+        logger.error(f"Bulk generation unavailable: {str(e)}")
+        raise HTTPException(status_code=503, detail="Bulk generation requires the Celery worker tier")
+    if not provider.jobs.shared:
+        logger.error("Bulk generation unavailable: JOB_STORE is not shared with the Celery workers")
+        raise HTTPException(
+            status_code=503,
+            detail="Bulk generation requires a job store shared with the workers (JOB_STORE=sqlite, redis or mongo)",
+        )
+
+    try:
+        plan = get_tenant_plan(request.tenant_id)
+        items = [build_task_request(item, request.tenant_id, plan) for item in request.items]
+
+        job_id = await provider.create_tracked_job(
+            BULK_JOB_PREFIX,
+            model="bulk",
+            tenant_id=request.tenant_id,
+            webhook_url=request.webhook_url,
+            result={"total": len(items)},
+            deadline_seconds=BULK_JOB_DEADLINE_SECONDS,
+        )
+
+        try:
+            # Publishing to the broker is blocking I/O
+            await asyncio.to_thread(dispatch_bulk_job, job_id, items)
+        except Exception as e:
+            logger.error(f"Failed to enqueue bulk job {job_id}: {str(e)}")
+            await provider.finish_job(job_id, error=f"Failed to enqueue bulk job: {str(e)}")
+            raise HTTPException(status_code=503, detail="Task queue unavailable")
+
+        logger.info(f"Bulk job created for tenant {request.tenant_id}: job_id={job_id}, items={len(items)}")
+        return BulkGenerationResponse(job_id=job_id, total=len(items))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Bulk generation failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get(
+    "/generate/bulk/{job_id}",
+    response_model=BulkJobStatusResponse,
+    responses={
+        401: {"model": ErrorResponse},
+        404: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    }
+)
+async def get_bulk_status(
+    job_id: str,
+    http_request: Request,
+    tenant_id: str = Query(..., description="Tenant ID for isolation"),
+):
+    """
+    Get aggregate progress of a bulk job.
+
+    While running, progress is the share of items that have finished
+    (completed or failed). Once finished, result holds {total, succeeded,
+    failed, items: [{index, type, status, result | error}]}.
+
+    Example:
+        GET /v1/generate/bulk/bulk_3f2a9c1b7e4d?tenant_id=tenant_123
+    """
+    await validate_tenant_access(http_request, tenant_id)
+
+    job = await provider.jobs.get(job_id)
+    if job is None or not job_id.startswith(f"{BULK_JOB_PREFIX}_"):
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    try:
+        await enforce_tenant_isolation(tenant_id, job.tenant_id)
+    except HTTPException:
+        # Don't reveal that another tenant's job exists
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    try:
+        total = (job.result or {}).get("total", 0)
+        if job.is_terminal:
+            # A job failed at its deadline records how far it got
+            finished = (job.result or {}).get("finished", total)
+        else:
+            from tasks.generation_tasks import bulk_progress
+            # Reads the result backend (blocking)
+            finished = await asyncio.to_thread(bulk_progress, job_id)
+
+        return BulkJobStatusResponse(
+            job_id=job_id,
+            status=job.status,
+            total=total,
+            finished=finished,
+            progress=int(finished * 100 / total) if total else 0,
+            result=job.result if job.is_terminal else None,
+            error=job.error,
+        )
+
+    except Exception as e:
+        logger.error(f"Failed to get bulk status for {job_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
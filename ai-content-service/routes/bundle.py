@@ -0,0 +1,185 @@
+"""
+Campaign bundle routes for AI content service.
+Handles POST /v1/generate/bundle, which generates a campaign's copy and hero
+image concurrently and submits its teaser video in one call.
+"""
+
+import asyncio
+import time
+from fastapi import APIRouter, HTTPException, Request
+import logging
+from typing import Awaitable, Callable, Optional, Tuple
+from models.requests import BundleGenerationRequest
+from models.responses import BundleGenerationResponse, BundlePartResponse, ErrorResponse
+from providers.poe_provider import get_provider
+from providers.context import start_trace
+from providers.errors import ProviderUnavailableError
+from templates.prompts import get_system_prompt
+from middleware.tenant_isolation import get_tenant_plan, validate_tenant_access
+from routes.images import validate_image_resolution
+from routes.videos import validate_video_duration
+from routes.cancellation import run_cancellable
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/v1", tags=["bundle"])
+provider = get_provider()
+
+
+async def run_part(
+    name: str,
+    model: str,
+    generate: Callable[[], Awaitable[dict]],
+) -> Tuple[BundlePartResponse, Optional[Exception]]:
+    """
+    Run one part of a bundle, timing it and capturing its failure.
+
+    Args:
+        name: Part name, for logs
+        model: Model used by the part
+        generate: Returns the part's fields (content, url or job_id, ...)
+
+    Returns:
+        The part's response and the exception it failed with, if any
+    """
+    # Each part runs in its own task, so it gets its own trace
+    trace = start_trace()
+    started = time.perf_counter()
+    try:
+        fields = await generate()
+        status = "completed"
+        error = None
+    except Exception as e:
+        logger.warning(f"Bundle {name} failed: {str(e)}")
+        fields = {}
+        status = "failed"
+        error = e
+    part = BundlePartResponse(
+        status=fields.pop("status", status),
+        model=model,
+        error=str(error) if error is not None else None,
+        duration_ms=round((time.perf_counter() - started) * 1000, 1),
+        queue_time_ms=trace.queue_time_ms,
+        **fields,
+    )
+    return part, error
+
+
+@router.post(
+    "/generate/bundle",
+    response_model=BundleGenerationResponse,
+    responses={
+        401: {"model": ErrorResponse},
+        422: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
+    }
+)
+async def generate_bundle(request: BundleGenerationRequest, http_request: Request):
+    """
+    Generate a campaign card's assets from one brief in a single call.
+
+    The requested parts run concurrently through the shared provider: copy
+    and hero image are generated, the teaser video is submitted as a job
+    (track it with /v1/jobs; webhook_url is notified when it finishes). The
+    call takes about as long as the slowest part instead of the sum, and
+    the tenant is validated once.
+
+    Parts that fail are reported with their error while the others are
+    still returned (status "partial"). If every part fails the request
+    fails: 503 when the upstream was unavailable, 500 otherwise. Client
+    disconnects and the X-Request-Deadline / X-Request-Timeout deadline
+    (504) cancel the parts still running.
+
+    Example:
+        POST /v1/generate/bundle
+        {
+            "brief": "Launch of our eco-friendly water bottle, summer vibe",
+            "tenant_id": "tenant_123",
+            "text": {"system_prompt_type": "social-post"},
+            "image": {"style": "vivid"},
+            "video": {"model": "sora-2", "duration_seconds": 8}
+        }
+
+    Returns:
+        BundleGenerationResponse with one result per requested part, each
+        with its own duration_ms and queue_time_ms
+    """
+    await validate_tenant_access(http_request, request.tenant_id)
+
+    logger.info(
+        f"Bundle request for tenant {request.tenant_id}: "
+        f"text={request.text is not None}, image={request.image is not None}, video={request.video is not None}"
+    )
+
+    async def generate_copy() -> dict:
+        part = request.text
+        content = await provider.generate_text(
+            prompt=part.prompt or request.brief,
+            model=part.model,
+            system_prompt=get_system_prompt(part.system_prompt_type or "creative-copy", part.model),
+            max_tokens=part.max_tokens,
+            temperature=part.temperature,
+            tenant_id=request.tenant_id,
+        )
+        return {"content": content}
+
+    async def generate_image() -> dict:
+        part = request.image
+        url = await provider.generate_image(
+            prompt=part.prompt or request.brief,
+            model=part.model,
+            resolution=validate_image_resolution(part.model, part.resolution),
+            style=part.style,
+            tenant_id=request.tenant_id,
+        )
+        return {"url": url}
+
+    async def submit_video() -> dict:
+        part = request.video
+        duration = validate_video_duration(part.model, part.duration_seconds)
+        job_id = await provider.generate_video(
+            prompt=part.prompt or request.brief,
+            model=part.model,
+            duration_seconds=duration,
+            aspect_ratio=part.aspect_ratio,
+            tenant_id=request.tenant_id,
+            plan=get_tenant_plan(request.tenant_id),
+            webhook_url=request.webhook_url,
+        )
+        return {"status": "processing", "job_id": job_id, "duration_seconds": duration}
+
+    names = []
+    parts = []
+    if request.text is not None:
+        names.append("text")
+        parts.append(run_part("text", request.text.model, generate_copy))
+    if request.image is not None:
+        names.append("image")
+        parts.append(run_part("image", request.image.model, generate_image))
+    if request.video is not None:
+        names.append("video")
+        parts.append(run_part("video", request.video.model, submit_video))
+
+    started = time.perf_counter()
+    outcomes = dict(zip(names, await run_cancellable(http_request, asyncio.gather(*parts), "bundle")))
+    duration_ms = round((time.perf_counter() - started) * 1000, 1)
+    results = {name: part for name, (part, _) in outcomes.items()}
+
+    failed = [name for name, part in results.items() if part.status == "failed"]
+    if len(failed) == len(results):
+        errors = "; ".join(f"{name}: {part.error}" for name, part in results.items())
+        unavailable = all(isinstance(error, ProviderUnavailableError) for _, error in outcomes.values())
+        logger.error(f"Bundle failed for tenant {request.tenant_id}: {errors}")
+        raise HTTPException(status_code=503 if unavailable else 500, detail=errors)
+
+    logger.info(
+        f"Bundle generated for tenant {request.tenant_id} in {duration_ms}ms"
+        f"{f' (failed: {failed})' if failed else ''}"
+    )
+
+    return BundleGenerationResponse(
+        status="partial" if failed else "completed",
+        duration_ms=duration_ms,
+        **results,
+    )
@@ -0,0 +1,161 @@
+"""
+Request cancellation for generation routes.
+Stops upstream generation when the client disconnects or the request's
+deadline (X-Request-Deadline / X-Request-Timeout) passes, and counts both.
+"""
+
+import time
+import asyncio
+import logging
+from typing import AsyncIterator, Awaitable, Dict, Optional, TypeVar
+
+from fastapi import HTTPException, Request
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Absolute deadline, Unix time in seconds (e.g., 1767225600.5)
+DEADLINE_HEADER = "X-Request-Deadline"
+# Relative deadline in seconds from arrival (e.g., 20)
+TIMEOUT_HEADER = "X-Request-Timeout"
+# How often a waiting request checks whether its client is still connected
+DISCONNECT_POLL_SECONDS = 0.5
+
+DISCONNECTED = "disconnected"
+DEADLINE_EXCEEDED = "deadline_exceeded"
+
+# Non-standard status (nginx) for requests the client abandoned
+CLIENT_CLOSED_REQUEST = 499
+
+
+class CancellationCounters:
+    """Requests whose generation was cancelled, by reason and route"""
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {DISCONNECTED: 0, DEADLINE_EXCEEDED: 0}
+        self.by_route: Dict[str, int] = {}
+
+    def record(self, reason: str, route: str) -> None:
+        self.counts[reason] += 1
+        self.by_route[route] = self.by_route.get(route, 0) + 1
+        logger.info(f"Cancelled {route} request: {reason}")
+
+    def stats(self) -> dict:
+        """Cancellation counters for monitoring"""
+        return {**self.counts, "by_route": dict(self.by_route)}
+
+
+cancellations = CancellationCounters()
+
+
+def request_deadline(request: Request) -> Optional[float]:
+    """
+    Read the request's deadline from its headers.
+
+    Returns:
+        Deadline on the time.monotonic() clock, or None if not set
+
+    Raises:
+        HTTPException: 400 if a header is not a number
+    """
+    deadline = None
+    try:
+        if DEADLINE_HEADER in request.headers:
+            absolute = float(request.headers[DEADLINE_HEADER])
+            deadline = time.monotonic() + (absolute - time.time())
+        if TIMEOUT_HEADER in request.headers:
+            relative = time.monotonic() + float(request.headers[TIMEOUT_HEADER])
+            deadline = relative if deadline is None else min(deadline, relative)
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{DEADLINE_HEADER} must be Unix time and {TIMEOUT_HEADER} seconds",
+        )
+    return deadline
+
+
+def remaining(deadline: Optional[float]) -> Optional[float]:
+    """Seconds left until a deadline (None if there is none)"""
+    return None if deadline is None else deadline - time.monotonic()
+
+
+async def run_cancellable(request: Request, coro: Awaitable[T], route: str) -> T:
+    """
+    Await a generation, cancelling it if the client leaves or the deadline passes.
+
+    Cancelling the task unwinds the provider call down to the bot stream,
+    which frees its connection and upstream concurrency slot.
+
+    Raises:
+        HTTPException: 504 once the deadline passes, 499 if the client
+            disconnected
+    """
+    task = asyncio.ensure_future(coro)
+    try:
+        deadline = request_deadline(request)
+        while True:
+            timeout = DISCONNECT_POLL_SECONDS
+            if deadline is not None:
+                timeout = min(timeout, remaining(deadline))
+                if timeout <= 0:
+                    cancellations.record(DEADLINE_EXCEEDED, route)
+                    raise HTTPException(status_code=504, detail="Request deadline exceeded")
+            done, _ = await asyncio.wait({task}, timeout=timeout)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                cancellations.record(DISCONNECTED, route)
+                raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request")
+    finally:
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+async def iterate_until(stream: AsyncIterator[T], deadline: Optional[float]) -> AsyncIterator[T]:
+    """
+    Re-yield a stream, raising TimeoutError once the deadline passes.
+
+    The stream is consumed in its own task (bot streams must be closed by
+    the task that opened them) and cancelled on timeout or when the caller
+    stops iterating.
+    """
+    if deadline is None:
+        async for item in stream:
+            yield item
+        return
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+    done = object()
+
+    async def pump() -> None:
+        async for item in stream:
+            await queue.put(item)
+        await queue.put(done)
+
+    producer = asyncio.create_task(pump())
+    try:
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            finished, _ = await asyncio.wait({getter, producer}, timeout=remaining(deadline), return_when=asyncio.FIRST_COMPLETED)
+            if getter not in finished:
+                getter.cancel()
+                await asyncio.gather(getter, return_exceptions=True)
+            if getter.cancelled():
+                if queue.empty():
+                    if producer.done():
+                        # Stream failed before producing another item
+                        producer.result()
+                    raise TimeoutError("Request deadline exceeded")
+                # The stream delivered an item or finished just as the
+                # deadline passed; that is not a timeout
+                item = queue.get_nowait()
+            else:
+                item = getter.result()
+            if item is done:
+                return
+            yield item
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
@@ -6,14 +6,18 @@ Handles POST /v1/generate/image with various models and styles.
 from fastapi import APIRouter, HTTPException, Request
 import logging
 from models.requests import ImageGenerationRequest
-from models.responses import ImageGenerationResponse, ErrorResponse
-from providers.poe_provider import PoeProvider
+from models.responses import ImageGenerationResponse, VariantResult, ErrorResponse
+from providers.poe_provider import get_provider
+from providers.context import start_trace
+from providers.errors import ProviderUnavailableError
 from middleware.tenant_isolation import validate_tenant_access
+from routes.variants import best_outcome, run_variants
+from routes.cancellation import run_cancellable
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/v1", tags=["images"])
-provider = PoeProvider()
+provider = get_provider()
 
 
 def validate_image_resolution(model: str, resolution: str) -> str:
@@ -31,6 +35,8 @@ def validate_image_resolution(model: str, resolution: str) -> str:
         400: {"model": ErrorResponse},
         401: {"model": ErrorResponse},
         500: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
+        504: {"model": ErrorResponse},
     }
 )
 async def generate_image(request: ImageGenerationRequest, http_request: Request):
@@ -59,6 +65,15 @@ async def generate_image(request: ImageGenerationRequest, http_request: Request)
             "tenant_id": "tenant_123"
         }
     
+    Variants: n (up to 8) images are generated concurrently; first_k and
+    budget_ms return early and cancel the rest. `url` is the first image
+    that completed and `variants` lists every variant's outcome (504 if none
+    finished within budget_ms).
+    
+    Generation is cancelled upstream if the client disconnects, or with a
+    504 once the X-Request-Deadline (Unix time) / X-Request-Timeout
+    (seconds) header's deadline passes.
+    
     Returns:
         ImageGenerationResponse with image URL (stored in R2)
     """
@@ -75,13 +90,39 @@ async def generate_image(request: ImageGenerationRequest, http_request: Request)
         )
         
         # Generate image via provider
-        image_url = await provider.generate_image(
-            prompt=request.prompt,
-            model=request.model,
-            resolution=validated_resolution,
-            style=request.style,
-            tenant_id=request.tenant_id,
-        )
+        trace = start_trace()
+        
+        def generate(variant: int = 0):
+            return provider.generate_image(
+                prompt=request.prompt,
+                model=request.model,
+                resolution=validated_resolution,
+                style=request.style,
+                tenant_id=request.tenant_id,
+                variant=variant,
+            )
+        
+        variants = None
+        if request.n > 1 or request.budget_ms:
+            outcomes = await run_cancellable(
+                http_request,
+                run_variants(generate, request.n, request.first_k, request.budget_ms),
+                "image",
+            )
+            image_url = best_outcome(outcomes, request.budget_ms).value
+            if request.n > 1:
+                variants = [
+                    VariantResult(
+                        index=outcome.index,
+                        status=outcome.status,
+                        url=outcome.value,
+                        error=str(outcome.error) if outcome.error is not None else None,
+                        duration_ms=outcome.duration_ms,
+                    )
+                    for outcome in outcomes
+                ]
+        else:
+            image_url = await run_cancellable(http_request, generate(), "image")
         
         logger.info(f"Image generated for tenant {request.tenant_id}")
         
@@ -89,10 +130,15 @@ async def generate_image(request: ImageGenerationRequest, http_request: Request)
             url=image_url,
             model=request.model,
             resolution=validated_resolution,
+            queue_time_ms=trace.queue_time_ms,
+            variants=variants,
         )
     
     except HTTPException:
         raise
+    except ProviderUnavailableError as e:
+        logger.warning(f"Image generation rejected, upstream unavailable: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Image generation failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
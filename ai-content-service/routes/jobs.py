@@ -1,18 +1,34 @@
 """
 Job status and management routes for AI content service.
-Handles GET /v1/jobs/{job_id} for tracking async generation jobs.
+Handles GET /v1/jobs/{job_id} (with optional long-poll), an SSE event
+stream and batch status lookups for tracking async generation jobs.
 """
 
-from fastapi import APIRouter, HTTPException, Request
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 import logging
-from models.responses import JobStatusResponse, ErrorResponse
-from providers.poe_provider import PoeProvider
-from middleware.tenant_isolation import enforce_tenant_isolation
+from models.requests import JobStatusBatchRequest
+from models.responses import JobStatusResponse, JobStatusBatchResponse, ErrorResponse
+from providers.poe_provider import get_provider
+from middleware.tenant_isolation import enforce_tenant_isolation, validate_tenant_access
+from routes.streaming import (
+    NDJSON_MEDIA_TYPE,
+    SSE_MEDIA_TYPE,
+    STREAMING_HEADERS,
+    encode_frame,
+    wants_ndjson,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/v1", tags=["jobs"])
-provider = PoeProvider()
+provider = get_provider()
+
+# Upper bound for ?wait= so a long-poll never outlives typical proxy timeouts
+MAX_WAIT_SECONDS = 60
+# Idle interval after which the event stream sends a heartbeat frame
+HEARTBEAT_SECONDS = 15
 
 
 @router.get(
@@ -24,7 +40,16 @@ provider = PoeProvider()
         500: {"model": ErrorResponse},
     }
 )
-async def get_job_status(job_id: str, http_request: Request):
+async def get_job_status(
+    job_id: str,
+    http_request: Request,
+    wait: Optional[float] = Query(
+        None,
+        ge=0,
+        le=MAX_WAIT_SECONDS,
+        description="Long-poll: wait up to this many seconds for the job's next state change",
+    ),
+):
     """
     Get status of an async generation job.
     
@@ -32,6 +57,10 @@ async def get_job_status(job_id: str, http_request: Request):
     For completed jobs, returns the result data.
     For failed jobs, returns error message.
     
+    With ?wait=N, an unfinished job's status is returned as soon as it
+    changes, or after N seconds if it does not. Finished jobs return
+    immediately. Prefer this (or /events) over tight polling.
+    
     Status values:
     - pending: Job queued, waiting to start
     - processing: Job actively generating content
@@ -39,7 +68,7 @@ async def get_job_status(job_id: str, http_request: Request):
     - failed: Generation failed with error
     
     Example:
-        GET /v1/jobs/550e8400-e29b-41d4-a716-446655440000
+        GET /v1/jobs/550e8400-e29b-41d4-a716-446655440000?wait=30
     
     Response:
         {
@@ -51,12 +80,10 @@ async def get_job_status(job_id: str, http_request: Request):
         }
     """
     try:
-        logger.info(f"Checking status of job {job_id}")
-        
         # Get job status from provider
-        status_info = await provider.get_job_status(job_id)
+        status_info = await provider.get_job_status(job_id, wait=wait)
         
-        logger.info(
+        logger.debug(
             f"Job {job_id} status: {status_info.get('status')}, "
             f"progress: {status_info.get('progress')}%"
         )
@@ -76,6 +103,139 @@ async def get_job_status(job_id: str, http_request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post(
+    "/jobs/status",
+    response_model=JobStatusBatchResponse,
+    responses={
+        401: {"model": ErrorResponse},
+        422: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    }
+)
+async def get_job_statuses(request: JobStatusBatchRequest, http_request: Request):
+    """
+    Get the status of up to MAX_JOB_STATUS_BATCH jobs in one call.
+    
+    All jobs are read from the job store in a single round-trip. Statuses
+    are returned in request order; jobs that do not exist, have expired or
+    belong to another tenant are reported as not found.
+    
+    Example:
+        POST /v1/jobs/status
+        {
+            "job_ids": ["vid_3f2a9c1b7e4d", "vid_8d1e0b6a2c5f"],
+            "tenant_id": "tenant_123"
+        }
+    
+    Response:
+        {
+            "jobs": [
+                {"job_id": "vid_3f2a9c1b7e4d", "status": "completed", "progress": 100, "result": {...}},
+                {"job_id": "vid_8d1e0b6a2c5f", "status": "processing", "progress": 50}
+            ]
+        }
+    """
+    await validate_tenant_access(http_request, request.tenant_id)
+    
+    try:
+        # Duplicates are looked up once but answered in place
+        job_ids = list(dict.fromkeys(request.job_ids))
+        statuses = {
+            status_info["job_id"]: status_info
+            for status_info in await provider.get_job_statuses(job_ids)
+        }
+        
+        jobs = []
+        for job_id in request.job_ids:
+            status_info = statuses[job_id]
+            owner = status_info.get("tenant_id")
+            if owner is not None:
+                try:
+                    await enforce_tenant_isolation(request.tenant_id, owner)
+                except HTTPException:
+                    # Don't reveal that another tenant's job exists
+                    status_info = {"status": "failed", "error": f"Job {job_id} not found"}
+            jobs.append(JobStatusResponse(
+                job_id=job_id,
+                status=status_info.get("status", "unknown"),
+                progress=status_info.get("progress", 0),
+                result=status_info.get("result"),
+                error=status_info.get("error"),
+            ))
+        
+        logger.debug(f"Batch status lookup for tenant {request.tenant_id}: {len(job_ids)} jobs")
+        return JobStatusBatchResponse(jobs=jobs)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Batch job status lookup failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get(
+    "/jobs/{job_id}/events",
+    responses={
+        200: {"content": {SSE_MEDIA_TYPE: {}, NDJSON_MEDIA_TYPE: {}}},
+        401: {"model": ErrorResponse},
+        404: {"model": ErrorResponse},
+    }
+)
+async def stream_job_events(
+    job_id: str,
+    http_request: Request,
+    tenant_id: str = Query(..., description="Tenant that owns the job"),
+):
+    """
+    Stream job status changes until the job completes or fails.
+    
+    Subscribers to the same job share one watcher, so any number of
+    clients can follow a job for the cost of a single poller.
+    
+    Format is negotiated via the Accept header:
+    - text/event-stream (default): SSE frames
+    - application/x-ndjson: one JSON document per line
+    
+    Frames:
+    - status: {"job_id", "status", "progress", "result?", "error?"}, sent
+      immediately and on every state change; the stream ends after a
+      completed or failed status
+    - heartbeat: {} after HEARTBEAT_SECONDS without a change
+    
+    Jobs that do not exist, have expired or belong to another tenant
+    return 404 before the stream opens.
+    
+    Example:
+        GET /v1/jobs/vid_3f2a9c1b7e4d/events?tenant_id=tenant_123
+    """
+    await validate_tenant_access(http_request, tenant_id)
+    
+    owner = (await provider.get_job_statuses([job_id]))[0].get("tenant_id")
+    if owner is not None:
+        try:
+            await enforce_tenant_isolation(tenant_id, owner)
+        except HTTPException:
+            # Don't reveal that another tenant's job exists
+            owner = None
+    if owner is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    
+    ndjson = wants_ndjson(http_request)
+    
+    async def frames():
+        async for status_info in provider.watch_job(job_id, heartbeat=HEARTBEAT_SECONDS):
+            if status_info is None:
+                yield encode_frame("heartbeat", {}, ndjson)
+            else:
+                yield encode_frame("status", status_info, ndjson)
+    
+    return StreamingResponse(
+        frames(),
+        media_type=NDJSON_MEDIA_TYPE if ndjson else SSE_MEDIA_TYPE,
+        headers=STREAMING_HEADERS,
+    )
+
+
 @router.get("/health")
 async def health():
     """Health check endpoint"""
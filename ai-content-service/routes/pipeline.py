@@ -0,0 +1,181 @@
+"""
+Improve-then-generate pipeline routes for AI content service.
+Handles POST /v1/generate/pipeline, which improves a draft prompt with the
+prompt-improver template and generates an image or video from the result in
+one streamed request.
+"""
+
+import time
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+import logging
+from models.requests import PipelineGenerationRequest
+from models.responses import ErrorResponse
+from providers.poe_provider import get_provider
+from providers.context import start_trace
+from templates.prompts import get_system_prompt
+from middleware.tenant_isolation import get_tenant_plan, validate_tenant_access
+from routes.images import validate_image_resolution
+from routes.videos import validate_video_duration
+from routes.text import resolve_cache_policy
+from routes.streaming import (
+    NDJSON_MEDIA_TYPE,
+    SSE_MEDIA_TYPE,
+    STREAMING_HEADERS,
+    encode_frame,
+    wants_ndjson,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/v1", tags=["pipeline"])
+provider = get_provider()
+
+
+def elapsed_ms(started: float) -> float:
+    """Milliseconds since a time.perf_counter() reading"""
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+@router.post(
+    "/generate/pipeline",
+    responses={
+        200: {"content": {SSE_MEDIA_TYPE: {}, NDJSON_MEDIA_TYPE: {}}},
+        401: {"model": ErrorResponse},
+        422: {"model": ErrorResponse},
+    }
+)
+async def generate_pipeline(request: PipelineGenerationRequest, http_request: Request):
+    """
+    Improve a prompt, then generate an image or video from it, in one call.
+
+    Replaces calling /v1/improve-prompt and then /v1/generate/image or
+    /v1/generate/video: the improvement is streamed to the client while it
+    is written and the asset stage starts as soon as it is complete, with
+    no second round trip.
+
+    Format is negotiated via the Accept header:
+    - text/event-stream (default): SSE frames
+    - application/x-ndjson: one JSON document per line
+
+    Frames:
+    - improve_chunk: {"text": "..."} partials of the improved prompt
+    - improved: {"prompt", "duration_ms"}
+    - asset (image): {"type": "image", "url", "model", "resolution", "duration_ms", "queue_time_ms"}
+    - asset (video): {"type": "video", "job_id", "status": "processing", "model",
+      "duration_seconds", "duration_ms"} (track the job with /v1/jobs)
+    - done: {"improve_ms", "generate_ms", "duration_ms"}
+    - error: {"stage": "improve" | "generate", "error": "..."}
+
+    Example:
+        POST /v1/generate/pipeline
+        {
+            "prompt": "Make a video about AI",
+            "target": "video",
+            "model": "sora-2",
+            "duration_seconds": 8,
+            "tenant_id": "tenant_123"
+        }
+
+    Returns:
+        StreamingResponse of improvement frames, then the asset and done
+        (or error) frames
+    """
+    # Validate and normalize everything before streaming starts, so bad
+    # input is a plain HTTP error raised before the paid improvement call
+    await validate_tenant_access(http_request, request.tenant_id)
+    if request.target == "image":
+        resolution = validate_image_resolution(request.model, request.resolution)
+    else:
+        duration = validate_video_duration(request.model, request.duration_seconds)
+
+    logger.info(
+        f"Pipeline request for tenant {request.tenant_id}: "
+        f"target={request.target}, model={request.model}"
+    )
+
+    ndjson = wants_ndjson(http_request)
+
+    async def frames():
+        trace = start_trace()
+        started = time.perf_counter()
+
+        chunks = []
+        try:
+            async for chunk in provider.stream_text(
+                prompt=f"Improve this {request.target} prompt: {request.prompt}",
+                model=request.improver_model,
+                system_prompt=get_system_prompt("prompt-improver"),
+                tenant_id=request.tenant_id,
+                use_cache=resolve_cache_policy(request.cache, "prompt-improver"),
+            ):
+                chunks.append(chunk)
+                yield encode_frame("improve_chunk", {"text": chunk}, ndjson)
+        except Exception as e:
+            logger.error(f"Pipeline prompt improvement failed: {str(e)}")
+            yield encode_frame("error", {"stage": "improve", "error": str(e)}, ndjson)
+            return
+
+        improved = "".join(chunks).strip()
+        if not improved:
+            yield encode_frame("error", {"stage": "improve", "error": "Prompt improver returned no text"}, ndjson)
+            return
+        improve_ms = elapsed_ms(started)
+        yield encode_frame("improved", {"prompt": improved, "duration_ms": improve_ms}, ndjson)
+
+        generate_started = time.perf_counter()
+        # Report the asset stage's own wait for an upstream slot
+        trace.queue_time_ms = 0.0
+        try:
+            if request.target == "image":
+                url = await provider.generate_image(
+                    prompt=improved,
+                    model=request.model,
+                    resolution=resolution,
+                    style=request.style,
+                    tenant_id=request.tenant_id,
+                )
+                asset = {
+                    "type": "image",
+                    "url": url,
+                    "model": request.model,
+                    "resolution": resolution,
+                    "duration_ms": elapsed_ms(generate_started),
+                    "queue_time_ms": trace.queue_time_ms,
+                }
+            else:
+                job_id = await provider.generate_video(
+                    prompt=improved,
+                    model=request.model,
+                    duration_seconds=duration,
+                    aspect_ratio=request.aspect_ratio,
+                    tenant_id=request.tenant_id,
+                    plan=get_tenant_plan(request.tenant_id),
+                    webhook_url=request.webhook_url,
+                )
+                asset = {
+                    "type": "video",
+                    "job_id": job_id,
+                    "status": "processing",
+                    "model": request.model,
+                    "duration_seconds": duration,
+                    "duration_ms": elapsed_ms(generate_started),
+                }
+        except Exception as e:
+            logger.error(f"Pipeline {request.target} generation failed: {str(e)}")
+            yield encode_frame("error", {"stage": "generate", "error": str(e)}, ndjson)
+            return
+
+        logger.info(f"Pipeline {request.target} generated for tenant {request.tenant_id}")
+        yield encode_frame("asset", asset, ndjson)
+        yield encode_frame("done", {
+            "improve_ms": improve_ms,
+            "generate_ms": asset["duration_ms"],
+            "duration_ms": elapsed_ms(started),
+        }, ndjson)
+
+    return StreamingResponse(
+        frames(),
+        media_type=NDJSON_MEDIA_TYPE if ndjson else SSE_MEDIA_TYPE,
+        headers=STREAMING_HEADERS,
+    )
@@ -0,0 +1,60 @@
+"""
+Streaming response helpers for AI content service.
+Encodes frames as Server-Sent Events or newline-delimited JSON.
+"""
+
+import json
+from typing import Any, Optional
+
+from fastapi import Request
+
+SSE_MEDIA_TYPE = "text/event-stream"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Headers that stop proxies (nginx, Cloudflare) from buffering the stream
+STREAMING_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def wants_ndjson(request: Request) -> bool:
+    """Return True if the client asked for NDJSON instead of SSE"""
+    return NDJSON_MEDIA_TYPE in request.headers.get("Accept", "")
+
+
+def sse_event(event: str, data: Any) -> str:
+    """
+    Encode a single Server-Sent Event frame.
+
+    Args:
+        event: Event name (e.g., chunk, done, error)
+        data: JSON-serializable payload
+
+    Returns:
+        SSE frame terminated by a blank line
+    """
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def ndjson_line(data: Any, event: Optional[str] = None) -> str:
+    """
+    Encode a single NDJSON line.
+
+    Args:
+        data: JSON-serializable payload (dict payloads get an "event" key)
+        event: Optional event name merged into the payload
+
+    Returns:
+        JSON document terminated by a newline
+    """
+    if event is not None and isinstance(data, dict):
+        data = {"event": event, **data}
+    return json.dumps(data, default=str) + "\n"
+
+
+def encode_frame(event: str, data: Any, ndjson: bool) -> str:
+    """Encode a frame in the negotiated streaming format"""
+    if ndjson:
+        return ndjson_line(data, event=event)
+    return sse_event(event, data)
@@ -1,22 +1,66 @@
 """
 Text generation routes for AI content service.
 Handles POST /v1/generate/text with support for various prompt types.
-Includes prompt improvement via system_prompt_type="prompt-improver".
+Includes prompt improvement via system_prompt_type="prompt-improver" and
+batches of prompts via POST /v1/generate/text/batch.
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+import asyncio
 import logging
-from models.requests import TextGenerationRequest
-from models.responses import TextGenerationResponse, ErrorResponse
-from providers.poe_provider import PoeProvider
+import os
+import time
+from typing import Dict, Optional, Tuple
+from models.requests import TextBatchItem, TextBatchRequest, TextGenerationRequest
+from models.responses import TextGenerationResponse, VariantResult, ErrorResponse
+from providers.poe_provider import get_provider
+from providers.context import start_trace
+from providers.errors import ProviderUnavailableError
+from providers.tokens import count_tokens
 from templates.prompts import get_system_prompt, build_full_prompt
 from middleware.tenant_isolation import validate_tenant_access
 from fastapi import Request
+from routes.streaming import (
+    NDJSON_MEDIA_TYPE,
+    SSE_MEDIA_TYPE,
+    STREAMING_HEADERS,
+    encode_frame,
+    ndjson_line,
+    wants_ndjson,
+)
+from routes.variants import best_outcome, run_variants
+from routes.cancellation import (
+    DEADLINE_EXCEEDED,
+    DISCONNECTED,
+    cancellations,
+    iterate_until,
+    request_deadline,
+    run_cancellable,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/v1", tags=["text"])
-provider = PoeProvider()
+provider = get_provider()
+
+# Max items of one batch request generated at once
+TEXT_BATCH_CONCURRENCY = int(os.getenv("TEXT_BATCH_CONCURRENCY", "8"))
+
+
+def resolve_cache_policy(allow_cache: bool, system_prompt_type: str) -> Optional[bool]:
+    """
+    Map the per-request cache flag to the provider's use_cache argument.
+    
+    Prompt improvements are requested repeatedly with the same drafts, so they
+    are cached regardless of temperature. Other types are cached only when
+    deterministic (provider default).
+    """
+    if not allow_cache:
+        return False
+    if system_prompt_type == "prompt-improver":
+        return True
+    return None
 
 
 @router.post(
@@ -26,6 +70,8 @@ provider = PoeProvider()
         400: {"model": ErrorResponse},
         401: {"model": ErrorResponse},
         500: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
+        504: {"model": ErrorResponse},
     }
 )
 async def generate_text(request: TextGenerationRequest, http_request: Request):
@@ -58,6 +104,29 @@ async def generate_text(request: TextGenerationRequest, http_request: Request):
             "content_type": "video",
             "tenant_id": "tenant_123"
         }
+        
+        3. Four headline options, returned once the fastest two are ready:
+        POST /v1/generate/text
+        {
+            "prompt": "Headline for eco-friendly water bottles",
+            "model": "gpt-4o",
+            "n": 4,
+            "first_k": 2,
+            "tenant_id": "tenant_123"
+        }
+    
+    With n > 1 the variants are generated concurrently. first_k and
+    budget_ms return early and cancel the variants still running; every
+    variant's outcome is listed in `variants` and `content` holds the first
+    one that completed (504 if none finished within budget_ms).
+    
+    Output is cut at max_tokens and before the first of stop_sequences,
+    stopping the upstream stream as soon as a limit is hit. tokens_used is
+    estimated locally (prompt + completion) from the returned text.
+    
+    Generation is cancelled upstream if the client disconnects, or with a
+    504 once the X-Request-Deadline (Unix time) / X-Request-Timeout
+    (seconds) header's deadline passes.
     
     Returns:
         TextGenerationResponse with generated content
@@ -76,30 +145,287 @@ async def generate_text(request: TextGenerationRequest, http_request: Request):
         system_prompt = get_system_prompt(system_prompt_type, request.model)
         
         # Generate text via Poe provider
-        content = await provider.generate_text(
-            prompt=request.prompt,
-            model=request.model,
-            system_prompt=system_prompt,
-            max_tokens=request.max_tokens,
-            temperature=request.temperature,
-            tenant_id=request.tenant_id,
-        )
+        trace = start_trace()
+        
+        def generate(variant: int = 0):
+            return provider.generate_text(
+                prompt=request.prompt,
+                model=request.model,
+                system_prompt=system_prompt,
+                max_tokens=request.max_tokens,
+                temperature=request.temperature,
+                tenant_id=request.tenant_id,
+                use_cache=resolve_cache_policy(request.cache, system_prompt_type),
+                variant=variant,
+                stop_sequences=request.stop_sequences,
+            )
+        
+        variants = None
+        if request.n > 1 or request.budget_ms:
+            outcomes = await run_cancellable(
+                http_request,
+                run_variants(generate, request.n, request.first_k, request.budget_ms),
+                "text",
+            )
+            content = best_outcome(outcomes, request.budget_ms).value
+            if request.n > 1:
+                variants = [
+                    VariantResult(
+                        index=outcome.index,
+                        status=outcome.status,
+                        content=outcome.value,
+                        error=str(outcome.error) if outcome.error is not None else None,
+                        duration_ms=outcome.duration_ms,
+                    )
+                    for outcome in outcomes
+                ]
+        else:
+            content = await run_cancellable(http_request, generate(), "text")
         
         logger.info(f"Text generated for tenant {request.tenant_id}")
         
         return TextGenerationResponse(
             content=content,
             model=request.model,
-            tokens_used=None,  # Would be populated from API response
+            tokens_used=count_tokens(system_prompt) + count_tokens(request.prompt) + count_tokens(content),
+            queue_time_ms=trace.queue_time_ms,
+            variants=variants,
         )
     
     except HTTPException:
         raise
+    except ProviderUnavailableError as e:
+        logger.warning(f"Text generation rejected, upstream unavailable: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Text generation failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post(
+    "/generate/text/stream",
+    responses={
+        200: {"content": {SSE_MEDIA_TYPE: {}, NDJSON_MEDIA_TYPE: {}}},
+        400: {"model": ErrorResponse},
+        401: {"model": ErrorResponse},
+    }
+)
+async def stream_text(request: TextGenerationRequest, http_request: Request):
+    """
+    Stream text content as it is generated.
+    
+    Accepts the same body as /v1/generate/text (with n = 1). Partials are
+    forwarded as they arrive from the bot instead of after the full
+    response is built. max_tokens and stop_sequences are applied as the
+    text arrives and end the bot stream early. The bot stream is also
+    cancelled when the client
+    disconnects or the X-Request-Deadline / X-Request-Timeout deadline
+    passes (then an error frame is sent).
+    
+    Format is negotiated via the Accept header:
+    - text/event-stream (default): SSE frames
+    - application/x-ndjson: one JSON document per line
+    
+    Frames:
+    - chunk: {"text": "..."}
+    - done: {"model", "chars", "chunks", "tokens", "ttft_ms", "duration_ms", "queue_time_ms"}
+      (tokens: estimated completion tokens)
+    - error: {"error": "..."}
+    
+    Example:
+        POST /v1/generate/text/stream
+        {
+            "prompt": "Product: eco-friendly water bottles",
+            "model": "gpt-4o",
+            "system_prompt_type": "social-post",
+            "tenant_id": "tenant_123"
+        }
+    
+    Returns:
+        StreamingResponse of chunk frames followed by a done (or error) frame
+    """
+    # Validate before streaming starts so auth failures are plain HTTP errors
+    await validate_tenant_access(http_request, request.tenant_id)
+    if request.n > 1:
+        raise HTTPException(status_code=400, detail="n > 1 is not supported when streaming; use /v1/generate/text")
+    
+    logger.info(
+        f"Streaming text request for tenant {request.tenant_id}: "
+        f"type={request.system_prompt_type}, model={request.model}"
+    )
+    
+    system_prompt_type = request.system_prompt_type or "creative-copy"
+    system_prompt = get_system_prompt(system_prompt_type, request.model)
+    ndjson = wants_ndjson(http_request)
+    deadline = request_deadline(http_request)
+    
+    async def frames():
+        trace = start_trace()
+        started = time.perf_counter()
+        ttft_ms = None
+        chars = 0
+        chunk_count = 0
+        completion = []
+        try:
+            stream = provider.stream_text(
+                prompt=request.prompt,
+                model=request.model,
+                system_prompt=system_prompt,
+                max_tokens=request.max_tokens,
+                temperature=request.temperature,
+                tenant_id=request.tenant_id,
+                use_cache=resolve_cache_policy(request.cache, system_prompt_type),
+                stop_sequences=request.stop_sequences,
+            )
+            async for chunk in iterate_until(stream, deadline):
+                if ttft_ms is None:
+                    ttft_ms = round((time.perf_counter() - started) * 1000, 1)
+                chars += len(chunk)
+                chunk_count += 1
+                completion.append(chunk)
+                yield encode_frame("chunk", {"text": chunk}, ndjson)
+        except asyncio.CancelledError:
+            # Client went away; the response task is being torn down
+            cancellations.record(DISCONNECTED, "text_stream")
+            raise
+        except TimeoutError:
+            cancellations.record(DEADLINE_EXCEEDED, "text_stream")
+            yield encode_frame("error", {"error": "Request deadline exceeded"}, ndjson)
+            return
+        except Exception as e:
+            logger.error(f"Streaming text generation failed: {str(e)}")
+            yield encode_frame("error", {"error": str(e)}, ndjson)
+            return
+        
+        yield encode_frame("done", {
+            "model": request.model,
+            "chars": chars,
+            "chunks": chunk_count,
+            "tokens": count_tokens("".join(completion)),
+            "ttft_ms": ttft_ms,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "queue_time_ms": trace.queue_time_ms,
+        }, ndjson)
+    
+    return StreamingResponse(
+        frames(),
+        media_type=NDJSON_MEDIA_TYPE if ndjson else SSE_MEDIA_TYPE,
+        headers=STREAMING_HEADERS,
+    )
+
+
+@router.post(
+    "/generate/text/batch",
+    responses={
+        200: {"content": {NDJSON_MEDIA_TYPE: {}}},
+        401: {"model": ErrorResponse},
+        422: {"model": ErrorResponse},
+    }
+)
+async def generate_text_batch(request: TextBatchRequest, http_request: Request):
+    """
+    Generate several texts in one request, streaming each as it finishes.
+    
+    The tenant is validated and system prompts are resolved once for the
+    whole batch; items then run concurrently (at most `concurrency`, capped
+    by TEXT_BATCH_CONCURRENCY) through the shared provider, so they still
+    count against upstream limits, coalescing and the response cache. Item
+    fields left unset use the batch's model, system_prompt_type, max_tokens,
+    temperature and stop_sequences.
+    
+    Response is NDJSON, one line per finished item in completion order:
+    - result: {"index", "content", "model", "duration_ms", "queue_time_ms"}
+    - error: {"index", "error"} (other items keep going)
+    - done: {"total", "succeeded", "failed", "duration_ms"} (always last)
+    
+    Example:
+        POST /v1/generate/text/batch
+        {
+            "items": [
+                {"prompt": "Variant 1: eco-friendly water bottles"},
+                {"prompt": "Variant 2: eco-friendly water bottles", "temperature": 1.0}
+            ],
+            "model": "gpt-4o",
+            "system_prompt_type": "social-post",
+            "tenant_id": "tenant_123"
+        }
+    
+    Returns:
+        StreamingResponse of result/error lines followed by a done line
+    """
+    await validate_tenant_access(http_request, request.tenant_id)
+    
+    logger.info(
+        f"Batch text request for tenant {request.tenant_id}: "
+        f"items={len(request.items)}, type={request.system_prompt_type}, model={request.model}"
+    )
+    
+    # Resolve each distinct (type, model) system prompt once
+    system_prompts: Dict[Tuple[str, str], str] = {}
+    for item in request.items:
+        key = (item.system_prompt_type or request.system_prompt_type or "creative-copy", item.model or request.model)
+        if key not in system_prompts:
+            system_prompts[key] = get_system_prompt(*key)
+    
+    limit = min(request.concurrency or TEXT_BATCH_CONCURRENCY, TEXT_BATCH_CONCURRENCY)
+    semaphore = asyncio.Semaphore(limit)
+    
+    async def generate_item(index: int, item: TextBatchItem) -> dict:
+        async with semaphore:
+            # Each item runs in its own task, so it gets its own trace
+            trace = start_trace()
+            started = time.perf_counter()
+            system_prompt_type = item.system_prompt_type or request.system_prompt_type or "creative-copy"
+            model = item.model or request.model
+            try:
+                content = await provider.generate_text(
+                    prompt=item.prompt,
+                    model=model,
+                    system_prompt=system_prompts[(system_prompt_type, model)],
+                    max_tokens=item.max_tokens or request.max_tokens,
+                    temperature=item.temperature if item.temperature is not None else request.temperature,
+                    tenant_id=request.tenant_id,
+                    use_cache=resolve_cache_policy(request.cache, system_prompt_type),
+                    stop_sequences=item.stop_sequences if item.stop_sequences is not None else request.stop_sequences,
+                )
+            except Exception as e:
+                logger.warning(f"Batch item {index} failed for tenant {request.tenant_id}: {str(e)}")
+                return {"event": "error", "index": index, "error": str(e)}
+            return {
+                "event": "result",
+                "index": index,
+                "content": content,
+                "model": model,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+                "queue_time_ms": trace.queue_time_ms,
+            }
+    
+    async def lines():
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(generate_item(index, item)) for index, item in enumerate(request.items)]
+        failed = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                line = await next_done
+                if line["event"] == "error":
+                    failed += 1
+                yield ndjson_line(line)
+        finally:
+            # Client went away: stop generating for it
+            for task in tasks:
+                task.cancel()
+        
+        logger.info(f"Batch text done for tenant {request.tenant_id}: {len(tasks) - failed}/{len(tasks)} succeeded")
+        yield ndjson_line({
+            "total": len(tasks),
+            "succeeded": len(tasks) - failed,
+            "failed": failed,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }, event="done")
+    
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE, headers=STREAMING_HEADERS)
+
+
 @router.post(
     "/improve-prompt",
     response_model=TextGenerationResponse,
@@ -107,6 +433,7 @@ async def generate_text(request: TextGenerationRequest, http_request: Request):
         400: {"model": ErrorResponse},
         401: {"model": ErrorResponse},
         500: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
     }
 )
 async def improve_prompt(request_data: dict, http_request: Request):
@@ -120,7 +447,8 @@ async def improve_prompt(request_data: dict, http_request: Request):
     {
         "prompt": "Make a video about AI",
         "content_type": "video",  # text, image, or video
-        "tenant_id": "tenant_123"
+        "tenant_id": "tenant_123",
+        "cache": true  # optional, false bypasses the response cache
     }
     
     Returns:
@@ -130,6 +458,7 @@ async def improve_prompt(request_data: dict, http_request: Request):
         prompt = request_data.get("prompt")
         content_type = request_data.get("content_type", "text")
         tenant_id = request_data.get("tenant_id")
+        allow_cache = bool(request_data.get("cache", True))
         
         if not prompt or not tenant_id:
             raise HTTPException(status_code=400, detail="Missing prompt or tenant_id")
@@ -142,20 +471,33 @@ async def improve_prompt(request_data: dict, http_request: Request):
         # Generate improved prompt
         system_prompt = get_system_prompt("prompt-improver")
         
-        improved = await provider.generate_text(
-            prompt=f"Improve this {content_type} prompt: {prompt}",
-            model="gpt-4o",
-            system_prompt=system_prompt,
-            tenant_id=tenant_id,
+        improver_prompt = f"Improve this {content_type} prompt: {prompt}"
+        
+        trace = start_trace()
+        improved = await run_cancellable(
+            http_request,
+            provider.generate_text(
+                prompt=improver_prompt,
+                model="gpt-4o",
+                system_prompt=system_prompt,
+                tenant_id=tenant_id,
+                use_cache=resolve_cache_policy(allow_cache, "prompt-improver"),
+            ),
+            "improve_prompt",
         )
         
         return TextGenerationResponse(
             content=improved,
             model="gpt-4o",
+            tokens_used=count_tokens(system_prompt) + count_tokens(improver_prompt) + count_tokens(improved),
+            queue_time_ms=trace.queue_time_ms,
         )
     
     except HTTPException:
         raise
+    except ProviderUnavailableError as e:
+        logger.warning(f"Prompt improvement rejected, upstream unavailable: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Prompt improvement failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,109 @@
+"""
+Best-of-N variant fan-out for generation routes.
+Runs N alternatives of one request concurrently and stops early once enough
+are ready or the time budget is spent, cancelling the stragglers.
+"""
+
+import time
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class VariantOutcome:
+    """Result of one variant"""
+    __slots__ = ("index", "status", "value", "error", "duration_ms", "rank")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.status = CANCELLED
+        self.value: Optional[str] = None
+        self.error: Optional[BaseException] = None
+        self.duration_ms: Optional[float] = None
+        # Completion order among finished variants
+        self.rank: Optional[int] = None
+
+
+async def run_variants(
+    generate: Callable[[int], Awaitable[str]],
+    n: int,
+    first_k: Optional[int] = None,
+    budget_ms: Optional[int] = None,
+) -> List[VariantOutcome]:
+    """
+    Generate n variants concurrently.
+
+    Returns once every variant has finished, once first_k have completed,
+    or once budget_ms has passed, whichever comes first. Variants still
+    running then are cancelled, which cancels their upstream calls.
+
+    Args:
+        generate: Produces variant i (passed as the provider's variant index)
+        n: Number of variants
+        first_k: Return as soon as this many variants completed
+        budget_ms: Return after this long with whatever is ready
+
+    Returns:
+        One outcome per variant, in index order
+    """
+    started = time.perf_counter()
+    outcomes = [VariantOutcome(index) for index in range(n)]
+    needed = min(first_k or n, n)
+    deadline = started + budget_ms / 1000 if budget_ms else None
+
+    tasks = {asyncio.create_task(generate(index)): index for index in range(n)}
+    pending = set(tasks)
+    completed = 0
+    rank = 0
+    try:
+        while pending and completed < needed:
+            timeout = None if deadline is None else deadline - time.perf_counter()
+            if timeout is not None and timeout <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                outcome = outcomes[tasks[task]]
+                outcome.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+                outcome.rank = rank
+                rank += 1
+                if task.exception() is None:
+                    outcome.status = COMPLETED
+                    outcome.value = task.result()
+                    completed += 1
+                else:
+                    outcome.status = FAILED
+                    outcome.error = task.exception()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    if pending:
+        logger.info(f"Cancelled {len(pending)} of {n} variants ({completed} completed)")
+    return outcomes
+
+
+def best_outcome(outcomes: List[VariantOutcome], budget_ms: Optional[int] = None) -> VariantOutcome:
+    """
+    Pick the first variant that completed.
+
+    Raises:
+        Exception: The first variant's error, if every variant failed
+        HTTPException: 504 if nothing completed within budget_ms
+    """
+    completed = [outcome for outcome in outcomes if outcome.status == COMPLETED]
+    if completed:
+        return min(completed, key=lambda outcome: outcome.rank)
+    failed = [outcome for outcome in outcomes if outcome.status == FAILED]
+    if len(failed) == len(outcomes):
+        raise min(failed, key=lambda outcome: outcome.rank).error
+    raise HTTPException(status_code=504, detail=f"No variant finished within {budget_ms}ms")
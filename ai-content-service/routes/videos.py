@@ -7,13 +7,14 @@ from fastapi import APIRouter, HTTPException, Request
 import logging
 from models.requests import VideoGenerationRequest
 from models.responses import VideoGenerationResponse, ErrorResponse
-from providers.poe_provider import PoeProvider
-from middleware.tenant_isolation import validate_tenant_access
+from providers.poe_provider import get_provider
+from providers.errors import ProviderUnavailableError
+from middleware.tenant_isolation import get_tenant_plan, validate_tenant_access
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/v1", tags=["videos"])
-provider = PoeProvider()
+provider = get_provider()
 
 
 def validate_video_duration(model: str, requested_duration: int) -> int:
@@ -40,6 +41,7 @@ def validate_video_duration(model: str, requested_duration: int) -> int:
         400: {"model": ErrorResponse},
         401: {"model": ErrorResponse},
         500: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
     }
 )
 async def generate_video(request: VideoGenerationRequest, http_request: Request):
@@ -55,6 +57,14 @@ async def generate_video(request: VideoGenerationRequest, http_request: Request)
     - runway-gen3: Supports 1-60s durations
     - runway-gen2: Supports 1-60s durations
     
+    Jobs are queued for a bounded pool of video workers shared fairly
+    between tenants, weighted by the tenant's configured plan (enterprise,
+    pro, free; see TENANT_PLANS); 503 is returned while the queue is full or the service is
+    draining.
+    
+    If webhook_url is set, the job's final status is POSTed to it when the
+    job completes or fails (signed; see Webhooks in the README).
+    
     Example:
         POST /v1/generate/video
         {
@@ -88,6 +98,8 @@ async def generate_video(request: VideoGenerationRequest, http_request: Request)
             duration_seconds=validated_duration,
             aspect_ratio=request.aspect_ratio,
             tenant_id=request.tenant_id,
+            plan=get_tenant_plan(request.tenant_id),
+            webhook_url=request.webhook_url,
         )
         
         logger.info(
@@ -104,6 +116,9 @@ async def generate_video(request: VideoGenerationRequest, http_request: Request)
     
     except HTTPException:
         raise
+    except ProviderUnavailableError as e:
+        logger.warning(f"Video generation rejected: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Video generation submission failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
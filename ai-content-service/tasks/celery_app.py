@@ -1,16 +1,27 @@
 """
 Celery configuration for async task processing.
 Handles video and image generation as background jobs.
+
+Generation is network-bound, so workers use the threads pool: each task
+thread waits on a coroutine running on the process's shared event loop
+(tasks.runtime), and one process runs CELERY_CONCURRENCY generations:
+    celery -A tasks.celery_app worker --pool=threads --concurrency=32
+
+Generation tasks are routed to per-tenant lanes of the video and images
+queues (tasks.scheduling); without -Q a worker consumes every lane.
 """
 
 import os
 from celery import Celery
+from kombu import Queue
+from tasks.scheduling import TenantLaneRouter
 
 # Create Celery app
 celery_app = Celery(
     "ai_content_service",
     broker=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
-    backend=os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    backend=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+    include=["tasks.generation_tasks"],
 )
 
 # Celery configuration
@@ -25,17 +36,32 @@ celery_app.conf.update(
     task_time_limit=600,  # 10 minutes hard limit
     task_soft_time_limit=540,  # 9 minutes soft limit
     worker_prefetch_multiplier=1,
+    worker_pool="threads",
+    worker_concurrency=int(os.getenv("CELERY_CONCURRENCY", "32")),
     worker_max_tasks_per_child=1000,
 )
 
-# Task routing
-celery_app.conf.task_routes = {
-    'tasks.generation_tasks.generate_video_async': {'queue': 'video'},
-    'tasks.generation_tasks.generate_image_async': {'queue': 'images'},
-}
+# Task routing: generation tasks go to their tenant's lanes, the rest by name
+lane_router = TenantLaneRouter.from_env()
+celery_app.conf.task_routes = [
+    lane_router,
+    {
+        'tasks.generation_tasks.generate_video_async': {'queue': 'video'},
+        'tasks.generation_tasks.generate_image_async': {'queue': 'images'},
+        'tasks.generation_tasks.generate_text_async': {'queue': 'images'},
+        'tasks.generation_tasks.finish_bulk_job': {'queue': 'images'},
+    },
+]
+
+# Lanes plus the plain queues (bookkeeping tasks, messages sent before lanes)
+celery_app.conf.task_queues = [
+    Queue(name)
+    for name in ['video', 'images', *lane_router.queues('video'), *lane_router.queues('images')]
+]
 
 # Task time limits
 celery_app.conf.task_time_limits = {
     'tasks.generation_tasks.generate_video_async': (600, 540),  # 10min hard, 9min soft
     'tasks.generation_tasks.generate_image_async': (300, 270),  # 5min hard, 4.5min soft
+    'tasks.generation_tasks.generate_text_async': (300, 270),  # 5min hard, 4.5min soft
 }
@@ -1,16 +1,44 @@
 """
 Async generation tasks for Celery worker.
 Handles long-running video and image generation with webhook callbacks.
+Tasks run provider coroutines on the process's shared event loop (see tasks.runtime).
 """
 
-import httpx
+import random
+import asyncio
 import logging
-from celery import Task
+from contextlib import aclosing
+from typing import List, Optional, Tuple
+from celery import Task, chord
+from celery.exceptions import Retry
+from celery.result import GroupResult
+from celery.signals import worker_process_shutdown, worker_shutdown
 from tasks.celery_app import celery_app
-from providers.poe_provider import PoeProvider
+from tasks.runtime import get_runtime, shutdown_runtime
+from tasks.scheduling import TenantSlots
+from providers.job_store import FAILED, TERMINAL_STATUSES, JobRecord
+from providers.poe_provider import get_provider
+from templates.prompts import get_system_prompt
 
 logger = logging.getLogger(__name__)
 
+# Upper bounds for a task's coroutine; keep below the Celery time limits
+VIDEO_TASK_TIMEOUT_SECONDS = 540
+IMAGE_TASK_TIMEOUT_SECONDS = 270
+TEXT_TASK_TIMEOUT_SECONDS = 270
+
+# Per-tenant cap on running generation tasks, shared by all workers
+tenant_slots = TenantSlots.from_env()
+# Delay before a task of a tenant at its cap is tried again
+TENANT_DEFER_SECONDS = 5
+
+
+@worker_shutdown.connect
+@worker_process_shutdown.connect
+def _stop_runtime(**kwargs):
+    """Drain video jobs, flush webhooks and close connections on worker exit"""
+    shutdown_runtime()
+
 
 class CallbackTask(Task):
     """Base task with webhook callback support"""
@@ -37,27 +65,88 @@ class CallbackTask(Task):
     
     def send_webhook(self, url: str, data: dict):
         """
-        Send HTTP POST to webhook URL.
+        Queue a webhook event in the persistent outbox.
+        
+        Delivery (pooling, batching, retry, signing) is done by the
+        process's WebhookDispatcher, so the task never blocks on the
+        receiver and failed deliveries are retried instead of dropped.
         
         Args:
             url: Webhook URL
             data: Payload to send
         """
         try:
-            logger.info(f"Sending webhook to {url}")
-            httpx.post(url, json=data, timeout=10)
+            runtime = get_runtime()
+            runtime.run(runtime.provider.webhooks.send(url, data), timeout=10)
+            logger.info(f"Queued webhook to {url}")
         except Exception as e:
-            logger.error(f"Webhook failed for {url}: {str(e)}")
+            logger.error(f"Failed to queue webhook for {url}: {str(e)}")
+
+
+def _acquire_tenant_slot(task: Task, request_data: dict) -> None:
+    """
+    Take one of the tenant's in-flight slots, or put the task back on its
+    lane for later without using up one of its error retries.
+    
+    Raises:
+        Retry: The tenant is at its cap and the task was re-queued
+    """
+    if task.request.called_directly:
+        return
+    if tenant_slots.acquire(request_data.get('tenant_id'), task.request.id):
+        return
+    # Jitter so deferred tasks don't all come back at once
+    countdown = TENANT_DEFER_SECONDS * random.uniform(0.5, 1.5)
+    sig = task.signature_from_request(countdown=countdown)
+    sig.apply_async()
+    raise Retry(f"Tenant {request_data.get('tenant_id')} at its task cap", when=countdown, sig=sig)
 
 
-@celery_app.task(bind=True, base=CallbackTask, max_retries=3, queue='video')
-def generate_video_async(self, request_data: dict, webhook_url: str = None):
+def _release_tenant_slot(task: Task, request_data: dict) -> None:
+    if not task.request.called_directly:
+        tenant_slots.release(request_data.get('tenant_id'), task.request.id)
+
+
+def _retry_or_capture(task: Task, exc: Exception, countdown: int, capture_errors: bool) -> dict:
+    """
+    Retry a failed task; once retries are exhausted, return the error as the
+    result if capture_errors is set, so a bulk chord still completes.
+    """
+    if capture_errors and task.request.retries >= task.max_retries:
+        return {'error': str(exc)}
+    raise task.retry(exc=exc, countdown=countdown)
+
+
+async def _generate_video(provider, request_data: dict) -> dict:
+    """Queue a video job on the shared provider and wait until it finishes"""
+    job_id = await provider.generate_video(
+        prompt=request_data['prompt'],
+        model=request_data['model'],
+        duration_seconds=request_data.get('duration_seconds', 8),
+        aspect_ratio=request_data.get('aspect_ratio', '16:9'),
+        tenant_id=request_data.get('tenant_id'),
+        plan=request_data.get('plan'),
+    )
+    status = None
+    async with aclosing(provider.watch_job(job_id, heartbeat=60)) as statuses:
+        async for status in statuses:
+            if status is not None and status['status'] in TERMINAL_STATUSES:
+                break
+    if status['status'] == FAILED:
+        raise RuntimeError(status.get('error') or f"Video job {job_id} failed")
+    return {'job_id': job_id, 'url': status['result']['video_url']}
+
+
+@celery_app.task(bind=True, base=CallbackTask, max_retries=3)
+def generate_video_async(self, request_data: dict, webhook_url: str = None, capture_errors: bool = False):
     """
     Long-running video generation task with progress tracking.
     
     Args:
         request_data: Video generation request parameters
         webhook_url: Optional webhook for completion callback
+        capture_errors: Return {'error': ...} instead of failing once
+            retries are exhausted (bulk jobs)
     
     Returns:
         Dict with video URL and metadata
@@ -73,7 +162,8 @@ def generate_video_async(self, request_data: dict, webhook_url: str = None):
             webhook_url='https://myapp.com/webhooks/video-complete'
         )
     """
-    provider = PoeProvider()
+    runtime = get_runtime()
+    _acquire_tenant_slot(self, request_data)
     
     # Update task state for progress tracking
     self.update_state(state='PROCESSING', meta={'progress': 10})
@@ -81,13 +171,10 @@ def generate_video_async(self, request_data: dict, webhook_url: str = None):
     try:
         logger.info(f"Starting video generation: {request_data['prompt'][:50]}...")
         
-        # Call Poe API for video generation
-        result = await provider.generate_video(
-            prompt=request_data['prompt'],
-            model=request_data['model'],
-            duration_seconds=request_data.get('duration_seconds', 8),
-            aspect_ratio=request_data.get('aspect_ratio', '16:9'),
-            tenant_id=request_data.get('tenant_id'),
+        # Runs on the shared loop; this thread only waits for the result
+        result = runtime.run(
+            _generate_video(runtime.provider, request_data),
+            timeout=VIDEO_TASK_TIMEOUT_SECONDS,
         )
         
         # Update progress
@@ -96,26 +183,31 @@ def generate_video_async(self, request_data: dict, webhook_url: str = None):
         logger.info(f"Video generation completed: {result}")
         
         return {
-            'url': result.get('url'),
-            'duration': result.get('duration'),
-            'model': result.get('model'),
+            'url': result['url'],
+            'duration': request_data.get('duration_seconds', 8),
+            'model': request_data['model'],
             'prompt': request_data['prompt']
         }
     
     except Exception as exc:
         logger.error(f"Video generation failed: {str(exc)}")
         # Retry with exponential backoff
-        raise self.retry(exc=exc, countdown=30)
+        return _retry_or_capture(self, exc, 30, capture_errors)
+    
+    finally:
+        _release_tenant_slot(self, request_data)
 
 
-@celery_app.task(bind=True, base=CallbackTask, max_retries=2, queue='images')
-def generate_image_async(self, request_data: dict, webhook_url: str = None):
+@celery_app.task(bind=True, base=CallbackTask, max_retries=2)
+def generate_image_async(self, request_data: dict, webhook_url: str = None, capture_errors: bool = False):
     """
     Async image generation task (for batch processing).
     
     Args:
         request_data: Image generation request parameters
         webhook_url: Optional webhook for completion callback
+        capture_errors: Return {'error': ...} instead of failing once
+            retries are exhausted (bulk jobs)
     
     Returns:
         Dict with image URL
@@ -130,19 +222,23 @@ def generate_image_async(self, request_data: dict, webhook_url: str = None):
             }
         )
     """
-    provider = PoeProvider()
+    runtime = get_runtime()
+    _acquire_tenant_slot(self, request_data)
     
     try:
         logger.info(f"Starting image generation: {request_data['prompt'][:50]}...")
         
         self.update_state(state='PROCESSING', meta={'progress': 50})
         
-        result = provider.generate_image(
-            prompt=request_data['prompt'],
-            model=request_data['model'],
-            resolution=request_data.get('resolution', '1024x1024'),
-            style=request_data.get('style'),
-            tenant_id=request_data.get('tenant_id'),
+        result = runtime.run(
+            runtime.provider.generate_image(
+                prompt=request_data['prompt'],
+                model=request_data['model'],
+                resolution=request_data.get('resolution', '1024x1024'),
+                style=request_data.get('style'),
+                tenant_id=request_data.get('tenant_id'),
+            ),
+            timeout=IMAGE_TASK_TIMEOUT_SECONDS,
         )
         
         logger.info(f"Image generation completed: {result}")
@@ -155,4 +251,172 @@ def generate_image_async(self, request_data: dict, webhook_url: str = None):
     
     except Exception as exc:
         logger.error(f"Image generation failed: {str(exc)}")
-        raise self.retry(exc=exc, countdown=20)
+        return _retry_or_capture(self, exc, 20, capture_errors)
+    
+    finally:
+        _release_tenant_slot(self, request_data)
+
+
+@celery_app.task(bind=True, base=CallbackTask, max_retries=2)
+def generate_text_async(self, request_data: dict, webhook_url: str = None, capture_errors: bool = False):
+    """
+    Async text generation task (for batch processing).
+    
+    Args:
+        request_data: Text generation request parameters
+        webhook_url: Optional webhook for completion callback
+        capture_errors: Return {'error': ...} instead of failing once
+            retries are exhausted (bulk jobs)
+    
+    Returns:
+        Dict with generated content
+    
+    Example:
+        task = generate_text_async.delay(
+            {
+                'prompt': 'Product: eco-friendly water bottles',
+                'model': 'gpt-4o',
+                'system_prompt_type': 'social-post',
+                'tenant_id': 'tenant_123'
+            }
+        )
+    """
+    runtime = get_runtime()
+    _acquire_tenant_slot(self, request_data)
+    
+    try:
+        logger.info(f"Starting text generation: {request_data['prompt'][:50]}...")
+        
+        system_prompt_type = request_data.get('system_prompt_type') or 'creative-copy'
+        content = runtime.run(
+            runtime.provider.generate_text(
+                prompt=request_data['prompt'],
+                model=request_data['model'],
+                system_prompt=get_system_prompt(system_prompt_type, request_data['model']),
+                max_tokens=request_data.get('max_tokens', 2000),
+                temperature=request_data.get('temperature', 0.7),
+                tenant_id=request_data.get('tenant_id'),
+                stop_sequences=request_data.get('stop_sequences'),
+            ),
+            timeout=TEXT_TASK_TIMEOUT_SECONDS,
+        )
+        
+        logger.info(f"Text generation completed ({len(content)} chars)")
+        
+        return {
+            'content': content,
+            'model': request_data['model'],
+        }
+    
+    except Exception as exc:
+        logger.error(f"Text generation failed: {str(exc)}")
+        return _retry_or_capture(self, exc, 20, capture_errors)
+    
+    finally:
+        _release_tenant_slot(self, request_data)
+
+
+BULK_TASKS = {
+    'text': generate_text_async,
+    'image': generate_image_async,
+    'video': generate_video_async,
+}
+
+
+@celery_app.task(queue='images')
+def finish_bulk_job(results: List[dict], parent_job_id: str, item_types: List[str]):
+    """
+    Chord callback: record a bulk job's aggregate result.
+    
+    The parent job completes (failing only if every item failed), which
+    sends its single completion webhook.
+    
+    Args:
+        results: Child task results, in item order
+        parent_job_id: Bulk job ID
+        item_types: Item types, in item order
+    """
+    items = []
+    for index, (item_type, result) in enumerate(zip(item_types, results)):
+        if result.get('error') is not None:
+            items.append({'index': index, 'type': item_type, 'status': 'failed', 'error': result['error']})
+        else:
+            items.append({'index': index, 'type': item_type, 'status': 'completed', 'result': result})
+    failed = sum(1 for item in items if item['status'] == 'failed')
+    summary = {
+        'total': len(items),
+        'succeeded': len(items) - failed,
+        'failed': failed,
+        'items': items,
+    }
+    error = f"All {len(items)} items failed" if items and failed == len(items) else None
+    
+    runtime = get_runtime()
+    if runtime.run(runtime.provider.finish_job(parent_job_id, result=summary, error=error), timeout=30):
+        logger.info(f"Bulk job {parent_job_id} finished: {summary['succeeded']}/{len(items)} succeeded")
+    else:
+        logger.warning(f"Bulk job {parent_job_id} already failed at its deadline; late result not recorded")
+    return summary
+
+
+def dispatch_bulk_job(parent_job_id: str, items: List[dict]) -> None:
+    """
+    Fan a bulk job out as a chord of per-item tasks on their tenant's lanes.
+    
+    Args:
+        parent_job_id: Bulk job ID (already created in the job store)
+        items: [{'type': 'text'|'image'|'video', 'request': request_data}, ...]
+    
+    The item group reuses the bulk job ID, so its progress can be read back
+    from the result backend with bulk_progress(parent_job_id).
+    """
+    header = [BULK_TASKS[item['type']].s(item['request'], capture_errors=True) for item in items]
+    callback = finish_bulk_job.s(parent_job_id, [item['type'] for item in items])
+    # The chord's task_id option names the header group; the callback gets its own
+    result = chord(header, callback, task_id=parent_job_id).apply_async(task_id=f"{parent_job_id}_finish")
+    result.parent.save()
+
+
+def bulk_progress(parent_job_id: str) -> int:
+    """Number of a bulk job's item tasks that have finished"""
+    group_result = GroupResult.restore(parent_job_id, app=celery_app)
+    if group_result is None:
+        return 0
+    return sum(1 for result in group_result.results if result.ready())
+
+
+def bulk_item_counts(parent_job_id: str) -> Tuple[int, int]:
+    """(finished, succeeded) item tasks of a bulk job, read from the result backend"""
+    group_result = GroupResult.restore(parent_job_id, app=celery_app)
+    if group_result is None:
+        return 0, 0
+    finished = [result for result in group_result.results if result.ready()]
+    succeeded = sum(
+        1 for result in finished
+        if result.successful() and not (isinstance(result.result, dict) and result.result.get('error') is not None)
+    )
+    return len(finished), succeeded
+
+
+async def expire_bulk_job(record: JobRecord) -> Tuple[Optional[dict], str]:
+    """
+    Summarize a bulk job whose chord callback never arrived (an item task
+    died past its time limit, a worker crashed) before its deadline.
+    
+    Returns:
+        The job's partial result and its failure message
+    """
+    total = (record.result or {}).get('total', 0)
+    # Reads the result backend (blocking)
+    finished, succeeded = await asyncio.to_thread(bulk_item_counts, record.job_id)
+    summary = {
+        'total': total,
+        'finished': finished,
+        'succeeded': succeeded,
+        'failed': finished - succeeded,
+    }
+    return summary, f"Bulk job did not finish before its deadline ({succeeded}/{total} items completed)"
+
+
+# Whichever process claims an expired bulk job (API or worker) reports counts
+get_provider().on_tracked_job_expired('bulk', expire_bulk_job)
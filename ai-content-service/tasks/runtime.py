@@ -0,0 +1,87 @@
+"""
+Persistent event loop for Celery worker processes.
+Task threads submit provider coroutines to one long-lived loop per process,
+which owns a single shared PoeProvider (connection pool, cache, job workers).
+"""
+
+import os
+import asyncio
+import logging
+import threading
+from typing import Awaitable, Optional, TypeVar
+
+from providers.poe_provider import PoeProvider, get_provider
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncRuntime:
+    """
+    Event loop running in a daemon thread, plus the provider bound to it.
+
+    With the threads pool, every Celery task thread blocks in run() while its
+    coroutine executes on the shared loop, so one process serves
+    --concurrency generations over one connection pool. Under prefork each
+    child process gets its own runtime on first use.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="celery-asyncio", daemon=True)
+        self._thread.start()
+        self.provider: PoeProvider = self.run(self._start_provider())
+        logger.info(f"Started Celery event loop for process {os.getpid()}")
+
+    async def _start_provider(self) -> PoeProvider:
+        provider = get_provider()
+        await provider.startup()
+        return provider
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """
+        Run a coroutine on the shared loop and wait for its result.
+
+        Raises:
+            TimeoutError: If it did not finish within timeout (it is cancelled)
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def close(self, timeout: float = 30.0) -> None:
+        """Drain the provider and stop the loop"""
+        try:
+            self.run(self.provider.aclose(), timeout=timeout)
+        except Exception as e:
+            logger.warning(f"Provider shutdown failed: {str(e)}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        self.loop.close()
+
+
+_runtime: Optional[AsyncRuntime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime() -> AsyncRuntime:
+    """Get this process's runtime, starting it on first use"""
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = AsyncRuntime()
+    return _runtime
+
+
+def shutdown_runtime() -> None:
+    """Stop this process's runtime, if it was started"""
+    global _runtime
+    with _runtime_lock:
+        if _runtime is not None:
+            _runtime.close()
+            _runtime = None
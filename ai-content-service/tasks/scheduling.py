@@ -0,0 +1,156 @@
+"""
+Fair scheduling of generation tasks across tenants.
+Tasks are spread over per-tenant lanes (queues) that workers consume round-robin,
+and a shared counter caps how many tasks one tenant runs at once.
+"""
+
+import os
+import time
+import zlib
+import random
+import logging
+from typing import Dict, List, Optional
+
+from providers.fairness import TenantWeights
+
+logger = logging.getLogger(__name__)
+
+# Task name -> base queue of its lanes
+LANE_QUEUES: Dict[str, str] = {
+    "tasks.generation_tasks.generate_video_async": "video",
+    "tasks.generation_tasks.generate_image_async": "images",
+    "tasks.generation_tasks.generate_text_async": "images",
+}
+
+
+class TenantLaneRouter:
+    """
+    Celery router sending each tenant's tasks to a few of N lanes per queue.
+
+    Brokers deliver a queue in FIFO order, so one tenant's burst of 500 tasks
+    would delay everyone queued behind it. Instead, `video` and `images` are
+    split into `video.0` ... `video.{N-1}` lanes and a tenant hashes onto
+    as many lanes as its weight (stochastic fair queuing). Workers consume
+    all lanes and the Redis transport rotates between non-empty ones, so a
+    backlog only delays tenants that hash onto the same lanes.
+    """
+
+    def __init__(self, lanes: int = 16, weights: Optional[TenantWeights] = None):
+        self.lanes = max(1, lanes)
+        self.weights = weights or TenantWeights()
+
+    @classmethod
+    def from_env(cls) -> "TenantLaneRouter":
+        """
+        Build router from environment.
+
+        CELERY_FAIR_LANES: lanes per queue (default 16)
+        CELERY_PLAN_WEIGHTS / CELERY_TENANT_WEIGHTS / CELERY_DEFAULT_WEIGHT:
+            lanes per tenant (see TenantWeights.from_env)
+        """
+        return cls(
+            lanes=int(os.getenv("CELERY_FAIR_LANES", "16")),
+            weights=TenantWeights.from_env("CELERY"),
+        )
+
+    def queues(self, base: str) -> List[str]:
+        """All lanes of a base queue"""
+        return [f"{base}.{lane}" for lane in range(self.lanes)]
+
+    def lane_for(self, base: str, tenant_id: Optional[str], plan: Optional[str]) -> str:
+        """Pick one of the tenant's lanes (weight 3 -> one of 3 lanes)"""
+        shares = min(self.lanes, max(1, round(self.weights.weight_for(tenant_id, plan))))
+        key = f"{tenant_id}:{random.randrange(shares)}"
+        return f"{base}.{zlib.crc32(key.encode()) % self.lanes}"
+
+    def __call__(self, name, args, kwargs, options, task=None, **kw) -> Optional[dict]:
+        base = LANE_QUEUES.get(name)
+        if base is None:
+            return None
+        if options.get("queue"):
+            # Explicit queue wins
+            return None
+        request_data = (args[0] if args else (kwargs or {}).get("request_data")) or {}
+        return {"queue": self.lane_for(base, request_data.get("tenant_id"), request_data.get("plan"))}
+
+
+class TenantSlots:
+    """
+    Cluster-wide cap on the tasks one tenant runs at once.
+
+    Running tasks are members of a per-tenant Redis sorted set scored by
+    start time. Entries older than `ttl` (a task killed without releasing
+    its slot) are ignored, so a crashed worker can't leak slots. If Redis
+    is unavailable the cap fails open.
+    """
+
+    ACQUIRE_SCRIPT = """
+        redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+        if redis.call('ZSCORE', KEYS[1], ARGV[3]) then
+            return 1
+        end
+        if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[2]) then
+            return 0
+        end
+        redis.call('ZADD', KEYS[1], ARGV[4], ARGV[3])
+        redis.call('EXPIRE', KEYS[1], ARGV[5])
+        return 1
+    """
+
+    def __init__(self, url: str, limit: int = 16, ttl: float = 900.0, prefix: str = "celery:tenant-slots"):
+        self.limit = limit
+        self.ttl = ttl
+        self.prefix = prefix
+        self._client = None
+        self._acquire = None
+        if limit <= 0:
+            return
+        try:
+            # Imported lazily so redis is only required when the cap is enabled
+            import redis
+            self._client = redis.Redis.from_url(url, decode_responses=True)
+            self._acquire = self._client.register_script(self.ACQUIRE_SCRIPT)
+        except ImportError:
+            logger.warning("redis not installed, per-tenant task cap disabled")
+
+    @classmethod
+    def from_env(cls) -> "TenantSlots":
+        """
+        Build cap from environment.
+
+        CELERY_TENANT_MAX_IN_FLIGHT: running tasks per tenant across all
+            workers, 0 for no cap (default 16)
+        CELERY_TENANT_SLOT_TTL_SECONDS: age after which a slot is considered
+            leaked (default 900, above the longest task time limit)
+        """
+        return cls(
+            url=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            limit=int(os.getenv("CELERY_TENANT_MAX_IN_FLIGHT", "16")),
+            ttl=float(os.getenv("CELERY_TENANT_SLOT_TTL_SECONDS", "900")),
+        )
+
+    def _key(self, tenant_id: Optional[str]) -> str:
+        return f"{self.prefix}:{tenant_id}"
+
+    def acquire(self, tenant_id: Optional[str], task_id: str) -> bool:
+        """Take a slot for a task; False if the tenant is at its cap"""
+        if self._acquire is None:
+            return True
+        now = time.time()
+        try:
+            return bool(self._acquire(
+                keys=[self._key(tenant_id)],
+                args=[now - self.ttl, self.limit, task_id, now, int(self.ttl)],
+            ))
+        except Exception as e:
+            logger.warning(f"Per-tenant task cap unavailable: {str(e)}")
+            return True
+
+    def release(self, tenant_id: Optional[str], task_id: str) -> None:
+        """Give a task's slot back"""
+        if self._client is None:
+            return
+        try:
+            self._client.zrem(self._key(tenant_id), task_id)
+        except Exception as e:
+            logger.warning(f"Failed to release task slot of tenant {tenant_id}: {str(e)}")
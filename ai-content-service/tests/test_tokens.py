@@ -0,0 +1,32 @@
+"""Token estimates against known cl100k_base counts"""
+
+from providers.tokens import LENGTH, StreamLimiter, count_tokens
+
+# English prose with its cl100k_base token counts
+SAMPLES = [
+    ("The quick brown fox jumps over the lazy dog.", 10),
+    ("Hello, world!", 4),
+    ("It was the best of times, it was the worst of times.", 14),
+    ("To be, or not to be, that is the question.", 13),
+]
+
+
+def test_count_tokens_matches_bpe_on_english():
+    for text, expected in SAMPLES:
+        assert abs(count_tokens(text) - expected) <= 1, text
+
+    text = " ".join(text for text, _ in SAMPLES)
+    expected = sum(expected for _, expected in SAMPLES)
+    assert abs(count_tokens(text) - expected) <= 0.15 * expected
+
+
+def test_count_tokens_cjk_is_one_per_char():
+    assert count_tokens("今日は良い天気") == 7
+
+
+def test_stream_limiter_keeps_max_tokens_of_english():
+    limiter = StreamLimiter(max_tokens=10)
+    chunks = ["The qui", "ck brown fox ju", "mps over the lazy dog. And then"]
+    out = "".join(limiter.feed(chunk) for chunk in chunks) + limiter.flush()
+    assert out.rstrip() == "The quick brown fox jumps over the lazy dog."
+    assert limiter.finish_reason == LENGTH